@@ -1,4 +1,4 @@
 import logging
 
 logger = logging.getLogger('dopus')
-logger.setLevel(logging.DEBUG)
\ No newline at end of file
+logger.addHandler(logging.NullHandler())
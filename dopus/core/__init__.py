@@ -1,7 +1,17 @@
 from .provider import Provider
 from .tool_registry import tool_registry
+from .tracing import Tracer, InMemorySink, JsonlSink, OpenTelemetrySink
+from .profiler import Profiler
+from .action_log import ActionLog
+from .executor import ProcessToolExecutor
+from .metrics import LatencyHistogram
+from .budget import Budget
+from .loop_guard import LoopGuard
+from .events import EventBus
+from .result_store import ResultStore
 
 from .convo import Convo
 from .tool_runner import ToolRunner
 from .tool import tool
-from .agent import Agent
\ No newline at end of file
+from .agent import Agent
+from .session import SessionManager
@@ -0,0 +1,139 @@
+import collections
+import json
+import os
+import threading
+import uuid
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_SPILL_LOCK = threading.Lock()
+
+
+class ActionLog(Sequence):
+    """
+    A bounded log of the actions taken by a ToolRunner.
+
+    The log keeps the most recent ``max_actions`` entries in memory. Older
+    entries are dropped or, when a ``spill_path`` is set, appended to a JSON
+    lines file, so memory stays flat over long runs. The spill file is only
+    ever appended to, so several logs may share it; each line is tagged with
+    the log that wrote it and ``read_spilled`` only returns this log's entries.
+
+    The log is a read-only sequence: entries are added with ``append`` or
+    ``extend`` only, so every entry goes through the bound. Use ``to_list``
+    to get a plain list, for instance to serialize it with ``json.dumps``.
+
+    Attributes:
+        max_actions (int): Maximum number of entries kept in memory, or None for no limit.
+        spill_path (str): File that evicted entries are appended to, or None to drop them.
+        evicted (int): Number of entries evicted from memory so far.
+    """
+
+    def __init__(self, max_actions: Optional[int] = None, spill_path: Optional[str] = None):
+        """
+        Initialize the ActionLog.
+
+        Args:
+            max_actions (int, optional): Maximum number of entries kept in memory.
+            spill_path (str, optional): File that evicted entries are appended to.
+        """
+        if max_actions is not None and max_actions < 1:
+            raise ValueError("max_actions must be at least 1")
+        self.max_actions = max_actions
+        self.spill_path = spill_path
+        self.evicted = 0
+        self.__id = uuid.uuid4().hex
+        self.__entries = collections.deque()
+        self.__lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        """
+        Number of entries appended since the log was created or cleared, including evicted ones.
+        """
+        return self.evicted + len(self.__entries)
+
+    def append(self, action: Optional[Dict[str, Any]]) -> None:
+        """
+        Add an action, evicting the oldest one if the log is full.
+
+        Args:
+            action (dict): The action log entry.
+        """
+        with self.__lock:
+            self.__entries.append(action)
+            if self.max_actions is not None and len(self.__entries) > self.max_actions:
+                self.__spill(self.__entries.popleft())
+
+    def extend(self, actions: Iterable[Optional[Dict[str, Any]]]) -> None:
+        """
+        Add several actions in order, evicting the oldest ones if the log is full.
+
+        Args:
+            actions (iterable): The action log entries.
+        """
+        for action in actions:
+            self.append(action)
+
+    def clear(self) -> None:
+        """
+        Remove all in-memory entries. Spilled entries are kept on disk.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.evicted = 0
+
+    def to_list(self) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get the in-memory entries as a plain list.
+
+        Returns:
+            list: The most recent entries, oldest first.
+        """
+        with self.__lock:
+            return list(self.__entries)
+
+    def read_spilled(self) -> Iterator[Dict[str, Any]]:
+        """
+        Read the entries this log spilled to disk.
+
+        Returns:
+            iterator: The spilled entries, oldest first.
+        """
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry.get("log") == self.__id:
+                        yield entry["action"]
+
+    def __spill(self, action):
+        self.evicted += 1
+        if self.spill_path:
+            line = json.dumps({"log": self.__id, "action": action}, default=str) + "\n"
+            with _SPILL_LOCK, open(self.spill_path, "a", encoding="utf-8") as file:
+                file.write(line)
+
+    def __getitem__(self, index):
+        with self.__lock:
+            if isinstance(index, slice):
+                return list(self.__entries)[index]
+            return self.__entries[index]
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __eq__(self, other):
+        if isinstance(other, ActionLog):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ActionLog({self.to_list()!r})"
@@ -2,8 +2,11 @@ from abc import ABC, abstractmethod
 from . import Convo, ToolRunner, tool_registry, Provider
 import inspect
 import json
+from types import MappingProxyType
 from .. import logger
 from ..util import get_tool_str
+from .tracing import tracer as default_tracer
+from .sub_agent import sub_agent_tool
 
 class Agent(ABC):
     """
@@ -20,24 +23,41 @@ class Agent(ABC):
         tool_manager (ToolRunner): Manager that handles tool execution and lifecycle events.
     """
     
-    def __init__(self, provider: Provider, name: str = "Agent", convo: Convo = None, registry: dict = None, tool_manager: ToolRunner = None):
+    __tool_manifest = MappingProxyType({})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.__tool_manifest = cls.__build_tool_manifest()
+
+    def __init__(self, provider: Provider, name: str = "Agent", convo: Convo = None, registry: dict = None, tool_manager: ToolRunner = None, tracer=None, budget=None, loop_guard=None, result_store=None):
         """
         Initializes the agent with a name and an optional language model (LLM).
         
         Args:
             name (str): Name of the agent.
             provider (Provider): language model provider instance.
+            tracer (Tracer, optional): Tracer to record spans with. Defaults to the global tracer.
+            budget (Budget, optional): Token, cost and step limits of the tool loop.
+            loop_guard (LoopGuard, optional): Protection of the tool loop against runs that never end.
+            result_store (ResultStore, optional): Store for large tool results, read back with the ``read_result`` tool.
         """
         self.__name = name
         self.__provider = provider
         self.__convo = convo or Convo()
         self.__registry = registry or tool_registry
-        self.__tool_manager = tool_manager or ToolRunner(registry=self.__registry)
+        self.__tracer = tracer or default_tracer
+        self.__tool_manager = tool_manager or ToolRunner(registry=self.__registry, tracer=self.__tracer)
+        if budget is not None:
+            self.__tool_manager.budget = budget
+        if loop_guard is not None:
+            self.__tool_manager.loop_guard = loop_guard
+        if result_store is not None:
+            self.__tool_manager.set_result_store(result_store)
         self.__tool_manager.on_event(ToolRunner.Event.STOP, self.__on_stop)
         self.__tool_manager.on_event(ToolRunner.Event.TOOL_FAILED, self.__on_tool_failed)
         self.__tool_manager.on_event(ToolRunner.Event.TOOL_CALL_COMPLETED, self.__post_tool_call_callback)
         self.__tool_manager.on_event(ToolRunner.Event.PRE_TOOL_CALL, self.__pre_tool_call_callback)
-        self.__add_tools_in_class()
+        self.__tool_manager.add_bound_tools(self.__tool_manifest, self)
 
     def get_actions(self):
         """
@@ -45,6 +65,134 @@ class Agent(ABC):
         """
         return self.__tool_manager.actions
 
+    @classmethod
+    def as_tool(cls, provider: Provider, name: str = None, description: str = None, registry: dict = None, **kwargs):
+        """
+        Registers this agent class as a tool that other agents can delegate tasks to.
+        Every call runs a fresh instance on its own conversation, so calls made
+        in the same turn run concurrently. The sub-agent's actions and token usage
+        are recorded in the parent's action log under ``sub_agents``.
+
+        Args:
+            provider (Provider): language model provider of the sub-agent.
+            name (str, optional): Tool name. Defaults to the class name followed by ``_agent``.
+            description (str, optional): What the agent does. Defaults to the first line of the class docstring.
+            registry (dict, optional): Registry to add the tool to. Defaults to the global registry.
+            **kwargs: Further arguments for the sub-agent's constructor.
+
+        Returns:
+            str: The tool name, to pass to ``add_tool``.
+        """
+        if description is None:
+            description = inspect.cleandoc(cls.__doc__).split("\n")[0] if cls.__doc__ else ""
+        return sub_agent_tool(
+            lambda: cls(provider, registry=registry, **kwargs),
+            name or f"{cls.__name__}_agent",
+            description,
+            registry,
+        )
+
+    def get_usage(self, total: bool = False) -> dict:
+        """
+        Get the tokens the agent spent, including those of its sub-agents.
+
+        Args:
+            total (bool): Sum over every run of the agent instead of only the last one.
+
+        Returns:
+            dict: Prompt, completion, cached and total tokens, and the cost if the budget has prices.
+        """
+        runner = self.__tool_manager
+        usage = dict(runner.total_usage if total else runner.usage)
+        cost = runner.total_cost if total else runner.cost
+        if cost:
+            usage["cost"] = cost
+        return usage
+
+    def get_stop_reason(self):
+        """
+        Get why the last run stopped.
+
+        Returns:
+            dict: ``{"reason": "stopped"}`` when a tool stopped the run, otherwise why the budget
+                or the loop guard stopped it. None while no run finished.
+        """
+        return self.__tool_manager.stop_reason
+
+    def get_profile(self):
+        """
+        Get the profile recorded by the last run started with ``profile`` enabled.
+
+        Returns:
+            Profiler: The profiler of the last profiled run, or None.
+        """
+        return self.__tool_manager.profile
+
+    def get_size(self) -> int:
+        """
+        Get the estimated size of the agent's conversation.
+
+        Returns:
+            int: The size in bytes of the messages serialized as JSON, tracked as they are added.
+        """
+        return self.__convo.size
+
+    def get_state(self) -> dict:
+        """
+        Get the state needed to restore the agent later.
+
+        Results kept in a result store are not part of the state; after a restore,
+        handles in the conversation that refer to them read as unknown.
+
+        Returns:
+            dict: The conversation messages, the actions of the last run and the runner's
+                usage, cost and step counters and stop reason.
+        """
+        runner = self.__tool_manager
+        return {
+            "messages": list(self.__convo.get_messages()),
+            "actions": list(runner.actions),
+            "runner": {
+                "usage": dict(runner.usage),
+                "total_usage": dict(runner.total_usage),
+                "cost": runner.cost,
+                "total_cost": runner.total_cost,
+                "steps": runner.steps,
+                "total_steps": runner.total_steps,
+                "stop_reason": runner.stop_reason,
+            },
+        }
+
+    def load_state(self, state: dict):
+        """
+        Restore state previously returned by ``get_state``.
+
+        Args:
+            state (dict): The saved state.
+        """
+        runner = self.__tool_manager
+        self.__convo.set_messages(state.get("messages", []))
+        runner.actions.clear()
+        for action in state.get("actions", []):
+            runner.actions.append(action)
+        saved = state.get("runner", {})
+        runner.usage = dict(saved.get("usage", {}))
+        runner.total_usage = dict(saved.get("total_usage", {}))
+        runner.cost = saved.get("cost", 0.0)
+        runner.total_cost = saved.get("total_cost", 0.0)
+        runner.steps = saved.get("steps", 0)
+        runner.total_steps = saved.get("total_steps", 0)
+        runner.stop_reason = saved.get("stop_reason")
+
+    def close(self, timeout=None):
+        """
+        Releases the background threads of the agent's tool runner, such as those of async event callbacks.
+
+        Args:
+            timeout (float, optional): Longest wait per thread in seconds.
+        """
+        self.__tool_manager.close(timeout)
+
     def reset(self):
         """
         Resets the conversation context for the agent. 
@@ -52,20 +200,23 @@ class Agent(ABC):
         """
         self.__convo.clear()
 
-    def run(self, message : str = None):
+    def run(self, message : str = None, profile=False):
         """
         Runs the agent, initiating a conversation or tool execution loop. 
         If a message is provided, it appends it to the conversation.
         
         Args:
             message (str, optional): Message from the user to be processed by the agent.
+            profile (bool | Profiler, optional): Record a per-phase and per-tool cost breakdown
+                of the run, available afterwards from ``get_profile``.
         
         Returns:
             Result of the tool execution loop managed by the tool manager.
         """
-        if message is not None:
-            self.__convo.append("user", message)
-        return self.__tool_manager.loop(self.__convo, self.__provider, self)
+        with self.__tracer.span("agent.run", agent=self.__name):
+            if message is not None:
+                self.__convo.append("user", message)
+            return self.__tool_manager.loop(self.__convo, self.__provider, self, profile=profile)
 
     def stop(self, result=None):
         """
@@ -121,15 +272,23 @@ class Agent(ABC):
     def __pre_tool_call_callback(self, tool_call):
         pass
 
-    def __add_tools_in_class(self):
-        for name, method in inspect.getmembers(self, predicate=inspect.ismethod):
-            if hasattr(method, "is_tool"):
-                self.add_tool(method.tool_name)
+    @classmethod
+    def __build_tool_manifest(cls):
+        # Tool names of the class's tool methods, mapped to the method names; computed once per class.
+        methods = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                function = value.__func__ if isinstance(value, classmethod) else value
+                if hasattr(function, "is_tool") and inspect.isfunction(function):
+                    methods[name] = function.tool_name
+                else:
+                    methods.pop(name, None)
+        return MappingProxyType({tool_name: name for name, tool_name in methods.items()})
     
     def __on_tool_failed(self, name: str, args: dict, msg: str):
         err = f"Error calling tool: {name}. Are you sure the tool is loaded?"
         return err
 
     def __post_tool_call_callback(self, result, metadata):
-        logger.debug(f"{metadata}\nResult: {result})")
+        logger.debug("%s\nResult: %s", metadata, result)
         self.__convo.add_tool_call(metadata, result)
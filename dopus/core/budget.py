@@ -0,0 +1,108 @@
+from typing import Any, Dict, Optional
+from .. import logger
+
+
+def add_usage(totals: Dict[str, float], usage: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Add token counts to running totals.
+
+    Args:
+        totals (dict): The totals, updated in place.
+        usage (dict): Token counts keyed by kind.
+
+    Returns:
+        dict: The updated totals.
+    """
+    for key, value in (usage or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+class Budget:
+    """
+    Limits on what a run of the tool loop may spend.
+
+    ToolRunner checks the budget after every step and stops the loop with a
+    structured reason once a limit is exceeded. Limits apply to a single run;
+    with ``cumulative`` they apply to everything the runner spent across runs,
+    which caps long sessions.
+
+    Prices are in currency units per million tokens, keyed by model name, for
+    example ``{"gpt-4o": {"prompt": 2.5, "cached": 1.25, "completion": 10.0}}``.
+    Cached prompt tokens are charged at the ``cached`` price when given and at
+    the ``prompt`` price otherwise.
+
+    Attributes:
+        max_tokens (int): Maximum total tokens, or None for no limit.
+        max_cost (float): Maximum cost, or None for no limit.
+        max_steps (int): Maximum provider requests, or None for no limit.
+        prices (dict): Prices per million tokens keyed by model.
+        cumulative (bool): Whether limits apply across runs instead of per run.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None, max_steps: Optional[int] = None,
+                 prices: Optional[Dict[str, Dict[str, float]]] = None, cumulative: bool = False):
+        """
+        Initialize the Budget.
+
+        Args:
+            max_tokens (int, optional): Maximum total tokens.
+            max_cost (float, optional): Maximum cost, computed with ``prices``.
+            max_steps (int, optional): Maximum provider requests.
+            prices (dict, optional): Prices per million tokens keyed by model.
+            cumulative (bool): Apply the limits across runs instead of per run.
+        """
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.max_steps = max_steps
+        self.prices = dict(prices or {})
+        self.cumulative = cumulative
+        self.__unpriced = set()
+
+    def cost(self, model: str, usage: Dict[str, Any]) -> float:
+        """
+        Compute the cost of a request.
+
+        Args:
+            model (str): The model that served the request.
+            usage (dict): The token usage of the request.
+
+        Returns:
+            float: The cost, 0 if the model has no price.
+        """
+        price = self.prices.get(model)
+        if price is None:
+            if self.max_cost is not None and model not in self.__unpriced:
+                self.__unpriced.add(model)
+                logger.warning(f"No price for model {model}; its requests do not count towards the cost budget")
+            return 0.0
+        cached = usage.get("cached_tokens", 0) or 0
+        prompt = (usage.get("prompt_tokens", 0) or 0) - cached
+        completion = usage.get("completion_tokens", 0) or 0
+        return (
+            prompt * price.get("prompt", 0.0)
+            + cached * price.get("cached", price.get("prompt", 0.0))
+            + completion * price.get("completion", 0.0)
+        ) / 1_000_000
+
+    def check(self, usage: Dict[str, float], cost: float, steps: int) -> Optional[Dict[str, Any]]:
+        """
+        Check spending against the limits.
+
+        Args:
+            usage (dict): Token counts spent so far.
+            cost (float): Cost spent so far.
+            steps (int): Provider requests made so far.
+
+        Returns:
+            dict: The exceeded limit as ``reason``, ``limit`` and ``used``, or None within budget.
+        """
+        if self.max_steps is not None and steps >= self.max_steps:
+            return {"reason": "max_steps", "limit": self.max_steps, "used": steps}
+        tokens = usage.get("total_tokens", 0)
+        if self.max_tokens is not None and tokens >= self.max_tokens:
+            return {"reason": "max_tokens", "limit": self.max_tokens, "used": tokens}
+        if self.max_cost is not None and cost >= self.max_cost:
+            return {"reason": "max_cost", "limit": self.max_cost, "used": cost}
+        return None
@@ -1,4 +1,5 @@
 import datetime
+import json
 from typing import List, Dict, Any, Optional
 from .. import logger
 
@@ -8,20 +9,40 @@ class Convo:
 
     Attributes:
         __messages (List[Dict[str, Any]]): A list of messages.
+        size (int): Estimated size in bytes of the messages serialized as JSON, kept up to date
+            as messages are added and removed.
     """
 
-    def __init__(self):
+    def __init__(self, messages: Optional[List[Dict[str, Any]]] = None):
         """
         Initializes the Convo instance.
+
+        Args:
+            messages (List[Dict[str, Any]], optional): Messages to start from, such as
+                those of a previously saved conversation.
         """
         self.__messages = []
+        self.size = 0
         self.clear()
+        if messages:
+            self.set_messages(messages)
 
     def clear(self) -> None:
         """
         Clears all messages in the conversation.
         """
         self.__messages = []
+        self.size = 0
+
+    def set_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Replaces all messages in the conversation.
+
+        Args:
+            messages (List[Dict[str, Any]]): The new messages.
+        """
+        self.__messages = list(messages)
+        self.size = sum(map(_size, self.__messages))
 
     def add_tool_call(self, metadata: Dict[str, Any], result: Any) -> None:
         """
@@ -53,7 +74,9 @@ class Convo:
             msg_type (str): The type of the message. Defaults to "default".
         """
         timestamp = datetime.datetime.now().isoformat()
-        self.__messages.append(self._create_message(role, message, timestamp, msg_type))
+        created = self._create_message(role, message, timestamp, msg_type)
+        self.__messages.append(created)
+        self.size += _size(created)
 
     def get_all_of_type(self, msg_type: str) -> List[Dict[str, Any]]:
         """
@@ -75,6 +98,7 @@ class Convo:
             msg_type (str): The type of messages to remove.
         """
         self.__messages = [message for message in self.__messages if message['type'] != msg_type]
+        self.size = sum(map(_size, self.__messages))
 
     def get_messages(self) -> List[Dict[str, Any]]:
         """
@@ -104,3 +128,7 @@ class Convo:
             "timestamp": timestamp,
             "type": msg_type
         }
+
+
+def _size(message):
+    return len(json.dumps(message, default=str))
@@ -0,0 +1,285 @@
+import asyncio
+import inspect
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from .metrics import LatencyHistogram
+from .. import logger
+
+DELIVERY_MODES = ("sync", "async")
+FULL_POLICIES = ("drop", "block")
+
+_CLOSE = object()
+
+
+class _Subscription:
+    """
+    A callback registered for an event, with its own queue and worker thread when delivered asynchronously.
+    The worker exits once its queue stayed empty for ``idle_timeout`` and is started again by the next event.
+    """
+
+    def __init__(self, event, callback, mode, max_queue, on_full, block_timeout, idle_timeout):
+        self.event = event
+        self.callback = callback
+        self.mode = mode
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.idle_timeout = idle_timeout
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.abandoned = 0
+        self.lag = LatencyHistogram(min_value=0.00001, window=1000) if mode == "async" else None
+        self.__queue = queue.Queue(max_queue) if mode == "async" else None
+        self.__worker = None
+        self.__stop = None
+        self.__lock = threading.Lock()
+        self.__loop = None
+
+    def deliver(self, args, kwargs):
+        if self.mode == "sync":
+            self.__call(args, kwargs)
+            self.delivered += 1
+            return
+        item = (time.perf_counter(), args, kwargs)
+        try:
+            if self.on_full == "block":
+                self.__queue.put(item, timeout=self.block_timeout)
+            else:
+                self.__queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Event queue of {self.name} is full; {self.dropped} events dropped")
+        # Started after the put, so an idle worker about to exit either sees the event or is replaced.
+        self.__start()
+
+    @property
+    def name(self):
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+    @property
+    def queued(self):
+        return self.__queue.qsize() if self.__queue is not None else 0
+
+    def join(self):
+        if self.__queue is not None and self.__worker is not None:
+            self.__queue.join()
+
+    def close(self, timeout):
+        with self.__lock:
+            worker, self.__worker = self.__worker, None
+            stop = self.__stop
+        if worker is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self.__queue.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            pass
+        worker.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if worker.is_alive():
+            # The worker stops after the callback in progress and abandons the rest.
+            stop.set()
+            logger.warning(f"Event worker of {self.name} did not finish within {timeout}s; stopping it")
+
+    def __start(self):
+        if self.__worker is not None:
+            return
+        with self.__lock:
+            if self.__worker is None:
+                self.__stop = threading.Event()
+                self.__worker = threading.Thread(target=self.__work, args=(self.__stop,), name=f"dopus-events-{self.name}", daemon=True)
+                self.__worker.start()
+
+    def __work(self, stop):
+        while not stop.is_set():
+            try:
+                item = self.__queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self.__lock:
+                    if self.__queue.qsize():
+                        continue
+                    if self.__stop is stop:
+                        self.__worker = None
+                break
+            try:
+                if item is _CLOSE:
+                    break
+                queued_at, args, kwargs = item
+                self.lag.record(time.perf_counter() - queued_at)
+                try:
+                    self.__call(args, kwargs)
+                    self.delivered += 1
+                except Exception:
+                    self.errors += 1
+                    logger.exception(f"Event callback {self.name} failed")
+            finally:
+                self.__queue.task_done()
+        if stop.is_set():
+            self.__abandon()
+        if self.__loop is not None:
+            self.__loop.close()
+            self.__loop = None
+
+    def __abandon(self):
+        abandoned = 0
+        while True:
+            try:
+                item = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _CLOSE:
+                abandoned += 1
+            self.__queue.task_done()
+        if abandoned:
+            logger.warning(f"Abandoned {abandoned} queued events of {self.name}")
+        self.abandoned += abandoned
+
+    def __call(self, args, kwargs):
+        if self.mode == "async" and inspect.iscoroutinefunction(self.callback):
+            if self.__loop is None:
+                self.__loop = asyncio.new_event_loop()
+            return self.__loop.run_until_complete(self.callback(*args, **kwargs))
+        return self.callback(*args, **kwargs)
+
+
+class EventBus:
+    """
+    A dispatcher of events to callbacks with a delivery mode per callback.
+
+    ``"sync"`` callbacks run on the publishing thread before ``publish``
+    returns, and their exceptions propagate to the publisher. ``"async"``
+    callbacks get a bounded queue and a worker thread of their own, so a slow
+    observer neither delays the publisher nor the other observers. Idle
+    workers exit after ``idle_timeout`` seconds and restart on the next event. When a
+    queue is full the event is dropped or the publisher waits, depending on
+    the policy. Exceptions of async callbacks are logged and counted.
+    Coroutine functions are run on an event loop owned by their worker.
+
+    Attributes:
+        max_queue (int): Default capacity of an async callback's queue.
+        on_full (str): Default policy for a full queue: ``"drop"`` or ``"block"``.
+        block_timeout (float): Longest wait of the ``"block"`` policy in seconds before
+            the event is dropped, or None to wait indefinitely.
+        idle_timeout (float): Seconds a worker thread waits for events before it exits.
+    """
+
+    def __init__(self, max_queue: int = 1000, on_full: str = "drop", block_timeout: Optional[float] = None,
+                 idle_timeout: float = 5.0):
+        """
+        Initialize the EventBus.
+
+        Args:
+            max_queue (int): Default capacity of an async callback's queue.
+            on_full (str): Default policy for a full queue, ``"drop"`` or ``"block"``.
+            block_timeout (float, optional): Longest wait of the ``"block"`` policy in seconds.
+            idle_timeout (float): Seconds a worker thread waits for events before it exits.
+        """
+        if on_full not in FULL_POLICIES:
+            raise ValueError(f"Unknown full queue policy: {on_full}")
+        self.max_queue = max_queue
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.idle_timeout = idle_timeout
+        self.__subscriptions: Dict[Hashable, List[_Subscription]] = {}
+        self.__lock = threading.Lock()
+
+    def subscribe(self, event: Hashable, callback: Callable, mode: str = "sync", max_queue: Optional[int] = None,
+                  on_full: Optional[str] = None):
+        """
+        Register a callback for an event.
+
+        Args:
+            event (hashable): The event to listen for.
+            callback (callable): The function to call with the event's arguments.
+            mode (str): ``"sync"`` to call it on the publishing thread, ``"async"`` to call it on a worker thread.
+            max_queue (int, optional): Capacity of the callback's queue. Defaults to the bus's ``max_queue``.
+            on_full (str, optional): Policy for a full queue. Defaults to the bus's ``on_full``.
+        """
+        if mode not in DELIVERY_MODES:
+            raise ValueError(f"Unknown delivery mode: {mode}")
+        on_full = on_full or self.on_full
+        if on_full not in FULL_POLICIES:
+            raise ValueError(f"Unknown full queue policy: {on_full}")
+        subscription = _Subscription(event, callback, mode, max_queue or self.max_queue, on_full, self.block_timeout, self.idle_timeout)
+        with self.__lock:
+            # Copy on write so publishing never iterates a list being changed.
+            self.__subscriptions[event] = self.__subscriptions.get(event, []) + [subscription]
+
+    def unsubscribe(self, event: Hashable, callback: Callable):
+        """
+        Remove a callback from an event. Events already queued for it are still delivered.
+
+        Args:
+            event (hashable): The event.
+            callback (callable): The callback to remove.
+        """
+        with self.__lock:
+            subscriptions = self.__subscriptions.get(event, [])
+            removed = [s for s in subscriptions if s.callback == callback]
+            self.__subscriptions[event] = [s for s in subscriptions if s.callback != callback]
+        for subscription in removed:
+            subscription.close(None)
+
+    def publish(self, event: Hashable, *args, **kwargs):
+        """
+        Deliver an event to its callbacks.
+
+        Args:
+            event (hashable): The event.
+            *args: Positional arguments to pass to the callbacks.
+            **kwargs: Keyword arguments to pass to the callbacks.
+        """
+        for subscription in self.__subscriptions.get(event, ()):
+            subscription.deliver(args, kwargs)
+
+    def flush(self):
+        """
+        Wait until every queued event has been delivered.
+        """
+        for subscription in self.__all():
+            subscription.join()
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Deliver the queued events and stop the worker threads.
+
+        A worker still busy after the timeout finishes the callback in progress
+        and then drops its remaining events, which are logged and counted as ``abandoned``.
+
+        Args:
+            timeout (float, optional): Longest wait per worker in seconds, or None to wait until every event is delivered.
+        """
+        for subscription in self.__all():
+            subscription.close(timeout)
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """
+        Get delivery counts and lag per callback.
+
+        Lag is the time an event spent queued before its callback started.
+
+        Returns:
+            list: One dict per callback with ``event``, ``callback``, ``mode``, ``delivered``,
+                ``dropped``, ``errors``, ``abandoned``, ``queued`` and, for async callbacks, ``lag`` (count, mean and percentiles).
+        """
+        return [
+            {
+                "event": getattr(s.event, "name", s.event),
+                "callback": s.name,
+                "mode": s.mode,
+                "delivered": s.delivered,
+                "dropped": s.dropped,
+                "errors": s.errors,
+                "abandoned": s.abandoned,
+                "queued": s.queued,
+                "lag": s.lag.snapshot() if s.lag is not None else None,
+            }
+            for s in self.__all()
+        ]
+
+    def __all(self):
+        with self.__lock:
+            return [s for subscriptions in self.__subscriptions.values() for s in subscriptions]
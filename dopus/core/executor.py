@@ -0,0 +1,337 @@
+import asyncio
+import atexit
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Optional
+from .. import logger
+
+EXECUTORS = (None, "inline", "process")
+SHARED_MEMORY_THRESHOLD = 1 << 20
+
+
+class ToolProcessCrashed(RuntimeError):
+    """Raised when the worker process running a tool dies."""
+
+
+class ToolTimeout(Exception):
+    """
+    Raised when a tool exceeds its deadline.
+
+    Attributes:
+        timeout (float): The deadline in seconds.
+    """
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Tool did not finish within {timeout}s")
+        self.timeout = timeout
+
+
+def run_with_timeout(func: Callable, kwargs: Dict[str, Any], timeout: float, stats: Optional[Dict[str, float]] = None):
+    """
+    Run a function in a daemon thread and wait for it up to a deadline.
+    Threads cannot be interrupted, so a function that misses the deadline
+    is abandoned and left to finish in the background.
+
+    Args:
+        func (callable): The function to run.
+        kwargs (dict): Its keyword arguments.
+        timeout (float): The deadline in seconds.
+        stats (dict, optional): Receives the CPU seconds the function used, under ``cpu``,
+            if it finishes in time.
+
+    Returns:
+        any: The function's return value. Raises ToolTimeout if the deadline passes.
+    """
+    outcome = {}
+    context = contextvars.copy_context()
+
+    def target():
+        start = time.thread_time()
+        try:
+            outcome["result"] = context.run(func, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            outcome["cpu"] = time.thread_time() - start
+
+    thread = threading.Thread(target=target, name=f"dopus-tool-{getattr(func, '__name__', 'tool')}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise ToolTimeout(timeout)
+    if stats is not None:
+        stats["cpu"] = outcome["cpu"]
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+def run_coroutine(func: Callable, kwargs: Dict[str, Any], timeout: Optional[float] = None):
+    """
+    Run an async function to completion on a new event loop.
+    The coroutine is cancelled if it misses the deadline. When the calling
+    thread already runs an event loop, which cannot be nested, the new loop
+    runs in a helper thread and the caller blocks until it finishes.
+
+    Args:
+        func (callable): The async function to run.
+        kwargs (dict): Its keyword arguments.
+        timeout (float, optional): The deadline in seconds.
+
+    Returns:
+        any: The function's return value. Raises ToolTimeout if the deadline passes.
+    """
+    async def main():
+        task = asyncio.ensure_future(func(**kwargs))
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise ToolTimeout(timeout)
+        return task.result()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(main())
+    outcome = {}
+    context = contextvars.copy_context()
+
+    def target():
+        try:
+            outcome["result"] = context.run(asyncio.run, main())
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name=f"dopus-tool-{getattr(func, '__name__', 'tool')}", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+class _SharedBuffer:
+    """A picklable handle to a large str or bytes argument placed in shared memory."""
+
+    def __init__(self, name: str, size: int, text: bool):
+        self.name = name
+        self.size = size
+        self.text = text
+
+    def load(self):
+        shm = shared_memory.SharedMemory(name=self.name)
+        # The creating process owns the segment; stop the worker's tracker from unlinking it too.
+        resource_tracker.unregister(shm._name, "shared_memory")
+        try:
+            data = bytes(shm.buf[:self.size])
+        finally:
+            shm.close()
+        return data.decode("utf-8") if self.text else data
+
+
+def _share(value, segments):
+    text = isinstance(value, str)
+    data = value.encode("utf-8") if text else value
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    shm.buf[:len(data)] = data
+    segments.append(shm)
+    return _SharedBuffer(shm.name, len(data), text)
+
+
+def _warm():
+    return os.getpid()
+
+
+def _run_tool(func: Callable, kwargs: Dict[str, Any]):
+    kwargs = {name: value.load() if isinstance(value, _SharedBuffer) else value for name, value in kwargs.items()}
+    return func(None, **kwargs)
+
+
+def _run_tool_timed(func: Callable, kwargs: Dict[str, Any]):
+    start = time.thread_time()
+    result = _run_tool(func, kwargs)
+    return result, time.thread_time() - start
+
+
+class ProcessToolExecutor:
+    """
+    Runs CPU-bound tools in a pool of worker processes.
+
+    Tools opt in with ``@tool(executor="process")``. Arguments are pickled and
+    sent to a warm worker, except large ``str`` and ``bytes`` arguments which
+    are passed through shared memory. Process tools run detached from the
+    agent: their ``self`` argument is None in the worker.
+
+    A worker crash breaks the whole pool, failing every call in flight. The
+    pool is then replaced and ``run`` retries each of those calls once in a
+    process of its own, so only the call that crashes again fails; process
+    tools must be safe to run twice. A call that misses its deadline after it
+    started has its pool's workers terminated, so a runaway tool does not hold
+    a worker forever; the other calls in flight are retried likewise.
+
+    Attributes:
+        max_workers (int): Number of worker processes.
+        shared_memory_threshold (int): Size in bytes above which arguments go through shared memory.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, shared_memory_threshold: int = SHARED_MEMORY_THRESHOLD):
+        """
+        Initialize the ProcessToolExecutor.
+
+        Args:
+            max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            shared_memory_threshold (int): Size in bytes above which arguments go through shared memory.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shared_memory_threshold = shared_memory_threshold
+        self.__pool = None
+        self.__lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def start(self) -> None:
+        """
+        Create the pool and wait until every worker has started, so the first
+        tool call does not pay for process startup.
+        """
+        pool = self.__get_pool()
+        futures = [pool.submit(_warm) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, func: Callable, kwargs: Dict[str, Any]):
+        """
+        Schedule a tool function in a worker process.
+
+        Args:
+            func (callable): The tool function. Must be importable by its qualified name.
+            kwargs (dict): The arguments of the tool, excluding ``self``.
+
+        Returns:
+            Future: A future whose result is the tool's return value. It raises
+                BrokenProcessPool if a worker dies; unlike ``run``, the call is not retried.
+        """
+        return self.__submit(_run_tool, func, kwargs)[0]
+
+    def __submit(self, runner, func, kwargs, pool=None):
+        segments = []
+        shipped = {
+            name: _share(value, segments)
+            if isinstance(value, (str, bytes)) and len(value) >= self.shared_memory_threshold else value
+            for name, value in kwargs.items()
+        }
+        if pool is None:
+            pool = self.__get_pool()
+        try:
+            future = pool.submit(runner, func, shipped)
+        except BrokenProcessPool:
+            # Broken by another call; this one never ran, so it goes to a fresh pool.
+            self.__reset(pool)
+            pool = self.__get_pool()
+            try:
+                future = pool.submit(runner, func, shipped)
+            except BrokenProcessPool:
+                self.__release(segments)
+                raise ToolProcessCrashed(f"Worker pool for tool {func.__qualname__} is broken")
+        future.add_done_callback(lambda f: self.__on_done(f, pool, segments))
+        return future, pool
+
+    def run(self, func: Callable, kwargs: Dict[str, Any], timeout: Optional[float] = None, stats: Optional[Dict[str, float]] = None):
+        """
+        Run a tool function in a worker process and wait for its result.
+
+        Args:
+            func (callable): The tool function. Must be importable by its qualified name.
+            kwargs (dict): The arguments of the tool, excluding ``self``.
+            timeout (float, optional): Seconds to wait for the result, retry included. A tool
+                that misses the deadline is cancelled if it has not started yet; otherwise its
+                workers are terminated.
+            stats (dict, optional): Receives the CPU seconds the tool used in the worker, under ``cpu``.
+
+        Returns:
+            any: The tool's return value. Raises ToolTimeout if the deadline passes and
+                ToolProcessCrashed if the retry crashes too.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            return self.__run(self.__submit(_run_tool_timed, func, kwargs), func, timeout, deadline, stats)
+        except BrokenProcessPool:
+            logger.warning(f"Worker pool broke while running tool {func.__qualname__}, retrying in a process of its own")
+        # The retry gets a pool of its own, so a call that crashes again cannot fail other calls.
+        isolated = ProcessPoolExecutor(max_workers=1)
+        try:
+            return self.__run(self.__submit(_run_tool_timed, func, kwargs, isolated), func, timeout, deadline, stats)
+        except BrokenProcessPool:
+            raise ToolProcessCrashed(f"Worker process crashed while running tool {func.__qualname__}")
+        finally:
+            isolated.shutdown(wait=False, cancel_futures=True)
+
+    def __run(self, submitted, func, timeout, deadline, stats):
+        future, pool = submitted
+        try:
+            result, cpu = future.result(None if deadline is None else max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            if not future.cancel():
+                self.__recycle(pool, func)
+            raise ToolTimeout(timeout)
+        if stats is not None:
+            stats["cpu"] = cpu
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop all worker processes.
+
+        Args:
+            wait (bool): Wait for running tools to finish.
+        """
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def __get_pool(self):
+        with self.__lock:
+            if self.__pool is None:
+                self.__pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.__pool
+
+    def __reset(self, pool):
+        with self.__lock:
+            current = self.__pool is pool
+            if current:
+                self.__pool = None
+        if current:
+            logger.error("Tool worker process crashed, replacing the pool")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def __recycle(self, pool, func):
+        with self.__lock:
+            if self.__pool is pool:
+                self.__pool = None
+        logger.error(f"Tool {func.__qualname__} missed its deadline, terminating its worker pool")
+        # ProcessPoolExecutor cannot stop a single task; terminating the workers breaks the
+        # pool, which fails and thereby retries the other calls in flight.
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def __on_done(self, future, pool, segments):
+        self.__release(segments)
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self.__reset(pool)
+
+    @staticmethod
+    def __release(segments):
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+process_executor = ProcessToolExecutor()
@@ -0,0 +1,257 @@
+import ast
+import io
+import json
+import threading
+import tokenize
+from typing import Any, Dict, List, Tuple
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class RepairStats:
+    """
+    Counts how often tool arguments needed repair.
+
+    Attributes:
+        parsed (int): Arguments that were valid JSON.
+        repaired (int): Arguments that were malformed but repaired locally.
+        invalid (int): Repaired arguments that still failed schema validation.
+        failed (int): Arguments that could not be repaired.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Set all counters to zero.
+        """
+        with self.__lock:
+            self.parsed = 0
+            self.repaired = 0
+            self.invalid = 0
+            self.failed = 0
+            self.fixes = {}
+
+    def record(self, outcome: str, fixes: List[str] = ()) -> None:
+        """
+        Count one parse.
+
+        Args:
+            outcome (str): One of ``"parsed"``, ``"repaired"``, ``"invalid"`` or ``"failed"``.
+            fixes (list): The fixes applied to repaired arguments.
+        """
+        with self.__lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            for fix in fixes:
+                self.fixes[fix] = self.fixes.get(fix, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarize the counters.
+
+        Returns:
+            dict: The counters, the applied fixes and the share of malformed arguments that were
+                repaired into valid calls (``repair_rate``).
+        """
+        with self.__lock:
+            malformed = self.repaired + self.failed
+            return {
+                "parsed": self.parsed,
+                "repaired": self.repaired,
+                "invalid": self.invalid,
+                "failed": self.failed,
+                "fixes": dict(self.fixes),
+                "repair_rate": (self.repaired - self.invalid) / malformed if malformed else None,
+            }
+
+
+repair_stats = RepairStats()
+
+
+def parse_arguments(text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Parse the JSON arguments of a tool call, repairing common defects.
+
+    Outcomes are counted in ``repair_stats``.
+
+    Args:
+        text (str): The raw arguments produced by the model.
+
+    Returns:
+        tuple: The arguments and the list of fixes applied, empty if the text was valid JSON.
+
+    Raises:
+        ValueError: If the text cannot be repaired into a JSON object.
+    """
+    try:
+        args, fixes = repair_json(text)
+        if not isinstance(args, dict):
+            raise ValueError(f"expected an object, got {type(args).__name__}")
+    except ValueError:
+        repair_stats.record("failed")
+        raise
+    repair_stats.record("repaired" if fixes else "parsed", fixes)
+    return args, fixes
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    Parse JSON, repairing the defects models commonly produce: trailing commas,
+    missing closing brackets of truncated output, single-quoted strings,
+    unquoted keys, Python literals, invalid escapes and text around the JSON value.
+
+    Repairs never change or drop content: an unterminated string or an element
+    that is incomplete or lacks its separator is rejected rather than guessed at.
+
+    Args:
+        text (str): The text to parse.
+
+    Returns:
+        tuple: The parsed value and the list of fixes applied.
+
+    Raises:
+        ValueError: If the text cannot be repaired.
+    """
+    if text is None or not text.strip():
+        return {}, ["empty arguments"]
+    try:
+        return json.loads(text), []
+    except ValueError:
+        pass
+    fixes = []
+    pieces, stack = _normalize(text, fixes)
+    if stack:
+        _drop_trailing_comma(pieces, fixes)
+        _add(fixes, "truncated")
+    try:
+        return json.loads("".join(pieces) + _close(stack)), fixes
+    except ValueError:
+        pass
+    try:
+        if not _joins_strings(text.strip()):
+            value = ast.literal_eval(text.strip())
+            return json.loads(json.dumps(value)), ["python literal"]
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError, tokenize.TokenError):
+        pass
+    raise ValueError(f"Could not repair JSON: {text[:200]!r}")
+
+
+def _joins_strings(text):
+    # Python concatenates adjacent string literals, which would merge elements missing a comma.
+    previous = None
+    for token in tokenize.generate_tokens(io.StringIO(text).readline):
+        if token.type in (tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT):
+            continue
+        if token.type == tokenize.STRING and previous == tokenize.STRING:
+            return True
+        previous = token.type
+    return False
+
+
+def _close(stack):
+    return "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def _normalize(text, fixes):
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError(f"No JSON value in {text[:200]!r}")
+    if text[:start].strip():
+        fixes.append("surrounding text")
+    pieces = []
+    stack = []
+    i, n = start, len(text)
+    while i < n:
+        c = text[i]
+        if c in "\"'":
+            i = _read_string(text, i, pieces, fixes)
+        elif c in "{[":
+            stack.append(c)
+            pieces.append(c)
+            i += 1
+        elif c in "}]":
+            _drop_trailing_comma(pieces, fixes)
+            opener = "{" if c == "}" else "["
+            if opener in stack:
+                while stack[-1] != opener:
+                    pieces.append(_CLOSERS[stack.pop()])
+                    _add(fixes, "mismatched brackets")
+                stack.pop()
+                pieces.append(c)
+            else:
+                _add(fixes, "mismatched brackets")
+            i += 1
+            if not stack:
+                if text[i:].strip():
+                    _add(fixes, "surrounding text")
+                break
+        elif c.isalpha() or c == "_":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            rest = text[j:].lstrip()
+            if rest.startswith(":"):
+                pieces.append(json.dumps(word))
+                _add(fixes, "unquoted key")
+            elif word in _LITERALS:
+                pieces.append(_LITERALS[word])
+                _add(fixes, "python literal")
+            else:
+                pieces.append(word)
+            i = j
+        else:
+            pieces.append(c)
+            i += 1
+    return pieces, stack
+
+
+def _read_string(text, i, pieces, fixes):
+    quote = text[i]
+    chars = []
+    j, n = i + 1, len(text)
+    while j < n:
+        c = text[j]
+        if c == "\\":
+            if j + 1 >= n:
+                break
+            escaped = text[j + 1]
+            if escaped == "'":
+                chars.append("'")
+                if quote == '"':
+                    _add(fixes, "invalid escape")
+            else:
+                chars.append(c + escaped)
+            j += 2
+            continue
+        if c == quote:
+            pieces.append('"' + "".join(chars) + '"')
+            if quote == "'":
+                _add(fixes, "single quotes")
+            return j + 1
+        if c == '"':
+            chars.append('\\"')
+        elif c == "\n":
+            chars.append("\\n")
+            _add(fixes, "control character")
+        else:
+            chars.append(c)
+        j += 1
+    raise ValueError(f"Unterminated string in {text[:200]!r}")
+
+
+def _drop_trailing_comma(pieces, fixes):
+    k = len(pieces) - 1
+    while k >= 0 and pieces[k].isspace():
+        k -= 1
+    if k >= 0 and pieces[k] == ",":
+        del pieces[k]
+        _add(fixes, "trailing comma")
+
+
+def _add(fixes, fix):
+    if fix not in fixes:
+        fixes.append(fix)
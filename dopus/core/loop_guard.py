@@ -0,0 +1,68 @@
+from typing import Optional
+
+EMPTY_POLICIES = ("stop", "reprompt", "backoff")
+REPEAT_POLICIES = ("reuse", "stop")
+
+
+class LoopGuard:
+    """
+    Protection of the tool loop against runs that never end.
+
+    ToolRunner consults the guard after every step. It handles responses
+    without tool calls by stopping, re-prompting the model or backing off, and
+    detects a tool called again with the same arguments. Every intervention is
+    recorded in the action log. The number of steps is limited by
+    ``Budget.max_steps``.
+
+    Attributes:
+        on_empty (str): What to do when a response has no tool call: ``"stop"``,
+            ``"reprompt"`` (append ``reprompt_message`` and ask again) or ``"backoff"``
+            (wait, doubling the delay each time, and ask again).
+        max_empty (int): Consecutive responses without tool calls after which the run stops.
+        reprompt_message (str): The user message appended by ``"reprompt"``.
+        backoff (float): First delay of ``"backoff"`` in seconds.
+        max_backoff (float): Longest delay of ``"backoff"`` in seconds.
+        on_repeat (str): What to do when a call repeats the previous one more than ``max_repeats``
+            times: ``"reuse"`` returns the previous result without running the tool, ``"stop"``
+            stops the run. None disables repeat detection.
+        max_repeats (int): Identical consecutive calls tolerated before ``on_repeat`` applies.
+    """
+
+    def __init__(self, on_empty: str = "reprompt", max_empty: int = 3,
+                 reprompt_message: str = "Respond by calling one of the available tools.",
+                 backoff: float = 1.0, max_backoff: float = 30.0, on_repeat: Optional[str] = "stop", max_repeats: int = 5):
+        """
+        Initialize the LoopGuard.
+
+        Args:
+            on_empty (str): Policy for responses without tool calls.
+            max_empty (int): Consecutive responses without tool calls after which the run stops.
+            reprompt_message (str): The user message appended by the ``"reprompt"`` policy.
+            backoff (float): First delay of the ``"backoff"`` policy in seconds.
+            max_backoff (float): Longest delay of the ``"backoff"`` policy in seconds.
+            on_repeat (str, optional): Policy for repeated identical calls, or None to allow them.
+            max_repeats (int): Identical consecutive calls tolerated before the policy applies.
+        """
+        if on_empty not in EMPTY_POLICIES:
+            raise ValueError(f"Unknown empty response policy: {on_empty}")
+        if on_repeat is not None and on_repeat not in REPEAT_POLICIES:
+            raise ValueError(f"Unknown repeated call policy: {on_repeat}")
+        self.on_empty = on_empty
+        self.max_empty = max_empty
+        self.reprompt_message = reprompt_message
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.on_repeat = on_repeat
+        self.max_repeats = max_repeats
+
+    def backoff_delay(self, empty_count: int) -> float:
+        """
+        Get the delay before asking again.
+
+        Args:
+            empty_count (int): Consecutive responses without tool calls so far.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return min(self.backoff * 2 ** (empty_count - 1), self.max_backoff)
@@ -0,0 +1,104 @@
+import bisect
+import math
+import threading
+from typing import Dict, List, Optional
+
+
+class LatencyHistogram:
+    """
+    A histogram of latencies with logarithmic buckets.
+
+    Recording and percentile queries cost O(number of buckets) regardless of
+    how many samples were recorded. With a ``window``, counts are halved every
+    ``window`` samples so the distribution follows recent behaviour.
+
+    Attributes:
+        count (float): Number of samples currently weighted in the histogram.
+        total (int): Number of samples ever recorded.
+    """
+
+    def __init__(self, min_value: float = 0.001, max_value: float = 600.0, growth: float = 1.15, window: Optional[int] = None):
+        """
+        Initialize the LatencyHistogram.
+
+        Args:
+            min_value (float): Upper bound of the smallest bucket in seconds.
+            max_value (float): Upper bound of the largest bucket in seconds. Larger samples are clamped.
+            growth (float): Ratio between consecutive bucket bounds, which bounds the relative error.
+            window (int, optional): Number of samples after which older samples lose half their weight.
+        """
+        steps = int(math.ceil(math.log(max_value / min_value, growth)))
+        self.__bounds = [min_value * growth ** i for i in range(steps + 1)]
+        self.__counts = [0.0] * len(self.__bounds)
+        self.__window = window
+        self.__since_decay = 0
+        self.__sum = 0.0
+        self.__lock = threading.Lock()
+        self.count = 0.0
+        self.total = 0
+
+    def record(self, seconds: float) -> None:
+        """
+        Record a sample.
+
+        Args:
+            seconds (float): The measured latency.
+        """
+        index = min(bisect.bisect_left(self.__bounds, seconds), len(self.__bounds) - 1)
+        with self.__lock:
+            self.__counts[index] += 1
+            self.__sum += seconds
+            self.count += 1
+            self.total += 1
+            self.__since_decay += 1
+            if self.__window and self.__since_decay >= self.__window:
+                self.__counts = [c / 2 for c in self.__counts]
+                self.__sum /= 2
+                self.count /= 2
+                self.__since_decay = 0
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Estimate a percentile.
+
+        Args:
+            p (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The upper bound of the bucket containing the percentile, or None without samples.
+        """
+        with self.__lock:
+            if self.count <= 0:
+                return None
+            target = self.count * p / 100
+            cumulative = 0.0
+            for bound, count in zip(self.__bounds, self.__counts):
+                cumulative += count
+                if count and cumulative >= target:
+                    return bound
+            return self.__bounds[-1]
+
+    def mean(self) -> Optional[float]:
+        """
+        Get the weighted mean latency.
+
+        Returns:
+            float: The mean in seconds, or None without samples.
+        """
+        with self.__lock:
+            return self.__sum / self.count if self.count > 0 else None
+
+    def snapshot(self, percentiles: List[float] = (50, 95, 99)) -> Dict[str, float]:
+        """
+        Summarize the histogram.
+
+        Args:
+            percentiles (list): The percentiles to include.
+
+        Returns:
+            dict: The sample count, mean and requested percentiles keyed as ``p50`` etc.
+        """
+        summary = {"count": self.total, "mean": self.mean()}
+        for p in percentiles:
+            summary[f"p{p:g}"] = self.percentile(p)
+        return summary
@@ -0,0 +1,171 @@
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+from .tracing import SpanSink, Span
+
+PHASES = {
+    "provider.format_messages": "format_messages",
+    "provider.get_tools": "get_tools",
+    "provider.request": "request",
+    "provider.extract_tool_call_data": "extract_tool_call_data",
+    "tool.call": "_call_tool",
+}
+
+
+class Profiler(SpanSink):
+    """
+    Records wall time, CPU time and optionally memory allocations per phase
+    of the agent loop and per tool.
+
+    The profiler consumes the spans emitted by ``ToolRunner`` and providers,
+    so it measures exactly the stages that tracing covers. CPU time is measured
+    on the thread that runs each span; for tools running on a worker thread
+    (a ``timeout``) or in a worker process (``executor="process"``), the CPU
+    time the tool used there is added to its ``tool.call`` span. Pass ``profile=True``
+    or a ``Profiler`` instance to ``Agent.run`` or ``ToolRunner.loop`` to use it.
+
+    Attributes:
+        trace_memory (bool): Whether allocation deltas are measured with tracemalloc.
+        collapsed_path (str): File to write collapsed stacks to when the run finishes.
+    """
+
+    def __init__(self, trace_memory: bool = False, collapsed_path: Optional[str] = None):
+        """
+        Initialize the Profiler.
+
+        Args:
+            trace_memory (bool): Measure allocation deltas with tracemalloc.
+            collapsed_path (str, optional): File to write collapsed stacks to when the run finishes.
+        """
+        self.trace_memory = trace_memory
+        self.collapsed_path = collapsed_path
+        self.__lock = threading.Lock()
+        self.__open = {}
+        self.__phases = {}
+        self.__tools = {}
+        self.__stacks = {}
+        self.__started_tracemalloc = False
+
+    def start(self) -> None:
+        """
+        Start profiling. Enables tracemalloc if memory tracing is requested.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+
+    def finish(self) -> None:
+        """
+        Stop profiling and write the collapsed stacks if a path was given.
+        """
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+        if self.collapsed_path:
+            self.write_collapsed(self.collapsed_path)
+
+    def on_start(self, span: Span) -> None:
+        with self.__lock:
+            parent = self.__open.get(span.parent_id)
+        frame = span.name
+        if span.name == "tool.call":
+            frame = f"tool.call[{span.attributes.get('tool')}]"
+        record = {
+            "stack": f"{parent['stack']};{frame}" if parent else frame,
+            "cpu": time.thread_time(),
+            "memory": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+            "children": 0.0,
+        }
+        with self.__lock:
+            self.__open[span.span_id] = record
+
+    def on_end(self, span: Span) -> None:
+        cpu = time.thread_time()
+        memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        with self.__lock:
+            record = self.__open.pop(span.span_id, None)
+            if record is None:
+                return
+            parent = self.__open.get(span.parent_id)
+            if parent is not None:
+                parent["children"] += span.duration
+            sample = {
+                "wall": span.duration,
+                "self": max(span.duration - record["children"], 0.0),
+                "cpu": cpu - record["cpu"] + span.attributes.get("worker_cpu", 0.0),
+                "memory": memory - record["memory"] if memory is not None and record["memory"] is not None else 0,
+            }
+            self.__stacks[record["stack"]] = self.__stacks.get(record["stack"], 0.0) + sample["self"]
+            phase = PHASES.get(span.name)
+            if phase:
+                self.__add(self.__phases, phase, sample)
+            if span.name == "tool.call":
+                self.__add(self.__tools, span.attributes.get("tool"), sample)
+
+    def phases(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the totals of each phase.
+
+        Returns:
+            dict: Calls, wall, self, CPU time in seconds and allocated bytes keyed by phase.
+        """
+        with self.__lock:
+            return {name: dict(stats) for name, stats in self.__phases.items()}
+
+    def tools(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the totals of each tool.
+
+        Returns:
+            dict: Calls, wall, self, CPU time in seconds and allocated bytes keyed by tool name.
+        """
+        with self.__lock:
+            return {name: dict(stats) for name, stats in self.__tools.items()}
+
+    def collapsed(self) -> List[str]:
+        """
+        Get the self time of every span stack in collapsed-stack format.
+
+        Returns:
+            list: Lines of ``frame;frame;frame microseconds``, as consumed by flamegraph tools.
+        """
+        with self.__lock:
+            stacks = dict(self.__stacks)
+        return [f"{stack} {int(round(seconds * 1e6))}" for stack, seconds in sorted(stacks.items())]
+
+    def write_collapsed(self, path: str) -> None:
+        """
+        Write the collapsed stacks to a file.
+
+        Args:
+            path (str): The output file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            for line in self.collapsed():
+                file.write(line + "\n")
+
+    def summary(self) -> str:
+        """
+        Format the phase and tool totals as a table.
+
+        Returns:
+            str: A plain text table.
+        """
+        header = f"{'name':<32} {'calls':>6} {'wall ms':>10} {'self ms':>10} {'cpu ms':>10} {'alloc KiB':>10}"
+        lines = [header, "-" * len(header)]
+        for title, stats in (("phase", self.phases()), ("tool", self.tools())):
+            for name, entry in sorted(stats.items(), key=lambda item: -item[1]["wall"]):
+                lines.append(
+                    f"{(title + ':' + str(name))[:32]:<32} {entry['calls']:>6} "
+                    f"{entry['wall'] * 1e3:>10.2f} {entry['self'] * 1e3:>10.2f} "
+                    f"{entry['cpu'] * 1e3:>10.2f} {entry['memory'] / 1024:>10.1f}"
+                )
+        return "\n".join(lines)
+
+    @staticmethod
+    def __add(table, name, sample):
+        entry = table.setdefault(name, {"calls": 0, "wall": 0.0, "self": 0.0, "cpu": 0.0, "memory": 0})
+        entry["calls"] += 1
+        for key, value in sample.items():
+            entry[key] += value
@@ -1,7 +1,8 @@
 import os
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from .convo import Convo
+from . import tracing
 from ..util import strip_array
 
 class Provider(ABC):
@@ -24,6 +25,13 @@ class Provider(ABC):
         """
         self._model = model
 
+    @property
+    def model(self) -> str:
+        """
+        The model used by the provider.
+        """
+        return self._model
+
     @abstractmethod
     def request(self, messages: List[Dict[str, Any]], registry: Any, tools: Optional[List[Any]] = None, system_prompt: str = "") -> Any:
         """
@@ -81,6 +89,36 @@ class Provider(ABC):
         """
         raise NotImplementedError("Subclasses must implement get_tool_calls method")
 
+    def get_usage(self, response: Any) -> Dict[str, int]:
+        """
+        Get the token usage of a response.
+
+        :param response: The response object.
+        :return: Token counts keyed by kind, or an empty dict if the provider does not report usage.
+        """
+        return {}
+
+    def get_model(self, response: Any) -> str:
+        """
+        Get the model that served a response.
+
+        :param response: The response object.
+        :return: The model name.
+        """
+        return self.model
+
+    def get_charges(self, response: Any) -> List[Tuple[str, Dict[str, int]]]:
+        """
+        Get the token usage of a response per model that was billed for it.
+
+        Providers that make several requests for one response, such as hedged or
+        cascaded requests, report every one of them.
+
+        :param response: The response object.
+        :return: ``(model, usage)`` pairs.
+        """
+        return [(self.get_model(response), self.get_usage(response))]
+
     def on_stop(self, convo: Convo, result: Optional[Any] = None) -> None:
         """
         Handle when the agentic loop stops.
@@ -97,20 +135,21 @@ class Provider(ABC):
         :param messages: List of message dictionaries.
         :return: List of formatted message dictionaries.
         """
-        formatted_messages = []
-        for message in messages:
-            if 'type' in message:
-                if message['type'] == "tool_call":
-                    formatted_message = self._create_tool_call_message(message)
-                elif message['type'] == "tool_result":
-                    formatted_message = self._create_tool_result_message(message)
+        with tracing.span("provider.format_messages", messages=len(messages)):
+            formatted_messages = []
+            for message in messages:
+                if 'type' in message:
+                    if message['type'] == "tool_call":
+                        formatted_message = self._create_tool_call_message(message)
+                    elif message['type'] == "tool_result":
+                        formatted_message = self._create_tool_result_message(message)
+                    else:
+                        formatted_message = message
                 else:
                     formatted_message = message
-            else:
-                formatted_message = message
-            if formatted_message:
-                formatted_messages.append(formatted_message)
-        return strip_array(formatted_messages, ["type", "timestamp"])
+                if formatted_message:
+                    formatted_messages.append(formatted_message)
+            return strip_array(formatted_messages, ["type", "timestamp"])
 
     @abstractmethod
     def _create_tool(self, name: Optional[str] = None, description: Optional[str] = None, parameters: Optional[Dict[str, Any]] = None, required: Optional[List[str]] = None) -> Any:
@@ -0,0 +1,250 @@
+import json
+import mmap
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from .. import logger
+
+READ_RESULT_TOOL = "read_result"
+
+
+def read_result_tool() -> Dict[str, Any]:
+    """
+    Build the registry entry of the built-in tool that reads stored results.
+
+    Returns:
+        dict: The registry entry. ToolRunner attaches the callback of its own store.
+    """
+    return {
+        "name": READ_RESULT_TOOL,
+        "description": "Read part of a large tool result that was stored instead of being returned in full.",
+        "properties": {
+            "handle": {"type": "string", "description": "The handle of the stored result"},
+            "offset": {"type": "integer", "description": "Byte offset to start reading at, 0 for the beginning"},
+            "length": {"type": "integer", "description": "Number of bytes to read"},
+        },
+        "required": ["handle", "offset", "length"],
+        "function": None,
+        "executor": None,
+        "timeout": None,
+    }
+
+
+class ResultStore:
+    """
+    Storage for tool results too large to keep in the conversation.
+
+    Results whose serialized size exceeds ``threshold`` bytes are stored and
+    replaced by a handle with a preview, so later requests do not send them
+    again. The model reads them in pages with the built-in ``read_result``
+    tool. Results live in memory, or with a ``directory`` in files that are
+    memory-mapped for reading, and the least recently used ones are evicted
+    once the store holds more than ``max_bytes``.
+
+    Attributes:
+        threshold (int): Serialized size in bytes above which a result is stored.
+        page_size (int): Largest page ``read_result`` returns, in bytes.
+        preview_chars (int): Length of the preview kept in the conversation, at most ``threshold``.
+        max_bytes (int): Total size of stored results before the oldest are evicted.
+        directory (str): Where results are written, or None to keep them in memory.
+    """
+
+    def __init__(self, threshold: int = 16_000, page_size: Optional[int] = None, preview_chars: int = 1000,
+                 max_bytes: int = 256 * 1024 * 1024, directory: Optional[str] = None):
+        """
+        Initialize the ResultStore.
+
+        Args:
+            threshold (int): Serialized size in bytes above which a result is stored.
+            page_size (int, optional): Largest page ``read_result`` returns. Defaults to ``threshold``.
+            preview_chars (int): Length of the preview kept in the conversation, at most ``threshold``.
+            max_bytes (int): Total size of stored results before the oldest are evicted.
+            directory (str, optional): Directory for memory-mapped result files.
+        """
+        self.threshold = threshold
+        self.page_size = page_size or threshold
+        self.preview_chars = preview_chars
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__blobs = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        self.stored = 0
+        self.evicted = 0
+
+    def offload(self, tool_name: str, result: Any) -> Any:
+        """
+        Store a result if it is too large and get what the conversation keeps instead.
+
+        Args:
+            tool_name (str): The tool that produced the result.
+            result (any): The result.
+
+        Returns:
+            any: The result itself if it is small enough, otherwise a dict with the handle and a preview.
+        """
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        if len(text) <= self.threshold // 4:
+            return result
+        data = text.encode("utf-8")
+        if len(data) <= self.threshold:
+            return result
+        handle = self.put(data)
+        stored = {
+            "stored_result": handle,
+            "size": len(data),
+            "preview": text[:min(self.preview_chars, self.threshold)],
+            "message": f"The result of {tool_name} is {len(data)} bytes, too large to include. "
+                       f"It is stored as {handle}; call {READ_RESULT_TOOL} with this handle to read it "
+                       f"in pages of up to {self.page_size} bytes.",
+        }
+        if isinstance(result, (list, tuple)):
+            stored["structure"] = {"type": "array", "items": len(result)}
+        elif isinstance(result, dict):
+            stored["structure"] = {"type": "object", "keys": list(result)[:50]}
+        return stored
+
+    def put(self, data: bytes) -> str:
+        """
+        Store data.
+
+        Args:
+            data (bytes): The serialized result.
+
+        Returns:
+            str: The handle to read it with.
+        """
+        handle = f"result_{uuid.uuid4().hex[:12]}"
+        if self.directory:
+            with open(self.__path(handle), "wb") as f:
+                f.write(data)
+            blob = None
+        else:
+            blob = data
+        with self.__lock:
+            self.__blobs[handle] = (len(data), blob)
+            self.__size += len(data)
+            self.stored += 1
+            while self.__size > self.max_bytes and len(self.__blobs) > 1:
+                self.__evict()
+        return handle
+
+    def read(self, handle: str, offset: int = 0, length: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Read a page of a stored result.
+
+        Offsets are in bytes of the UTF-8 encoded result; pages are cut at character boundaries.
+
+        Args:
+            handle (str): The handle returned by ``put``.
+            offset (int): Where to start.
+            length (int, optional): How many bytes to read, at most ``page_size``.
+
+        Returns:
+            dict: The ``content`` with ``offset``, ``size`` and ``next_offset`` (None at the end),
+                or an ``error`` if the handle is unknown or was evicted.
+        """
+        with self.__lock:
+            entry = self.__blobs.get(handle)
+            if entry is not None:
+                self.__blobs.move_to_end(handle)
+        if entry is None:
+            return self.__unknown(handle)
+        size, blob = entry
+        length = min(length or self.page_size, self.page_size)
+        offset = max(0, min(offset, size))
+        if blob is not None or not size:
+            return self.__page(blob or b"", size, offset, length)
+        try:
+            with open(self.__path(handle), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return self.__page(mapped, size, offset, length)
+        except OSError:
+            # Evicted by another thread since the lookup.
+            return self.__unknown(handle)
+
+    @staticmethod
+    def __unknown(handle):
+        return {
+            "error": "unknown_handle",
+            "message": f"No stored result {handle}; it may have been evicted. Call the original tool again.",
+        }
+
+    @staticmethod
+    def __page(data, size, offset, length):
+        start = offset
+        while start < size and start > 0 and (data[start] & 0xC0) == 0x80:
+            start -= 1
+        end = min(start + length, size)
+        while start < end < size and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        if end == start < size:
+            # A page shorter than one character still returns that character.
+            end += 1
+            while end < size and (data[end] & 0xC0) == 0x80:
+                end += 1
+        return {
+            "content": bytes(data[start:end]).decode("utf-8"),
+            "offset": start,
+            "size": size,
+            "next_offset": end if end < size else None,
+        }
+
+    def remove(self, handle: str):
+        """
+        Delete a stored result.
+
+        Args:
+            handle (str): The handle of the result.
+        """
+        with self.__lock:
+            entry = self.__blobs.pop(handle, None)
+            if entry is not None:
+                self.__size -= entry[0]
+        if entry is not None and self.directory:
+            self.__unlink(handle)
+
+    def clear(self):
+        """
+        Delete all stored results.
+        """
+        with self.__lock:
+            handles = list(self.__blobs)
+            self.__blobs.clear()
+            self.__size = 0
+        if self.directory:
+            for handle in handles:
+                self.__unlink(handle)
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the stored results in bytes.
+        """
+        return self.__size
+
+    def __contains__(self, handle):
+        return handle in self.__blobs
+
+    def __len__(self):
+        return len(self.__blobs)
+
+    def __evict(self):
+        handle, (size, _) = self.__blobs.popitem(last=False)
+        self.__size -= size
+        self.evicted += 1
+        logger.debug(f"Evicted stored result {handle} ({size} bytes)")
+        if self.directory:
+            self.__unlink(handle)
+
+    def __unlink(self, handle):
+        try:
+            os.remove(self.__path(handle))
+        except OSError:
+            pass
+
+    def __path(self, handle):
+        return os.path.join(self.directory, f"{handle}.json")
@@ -0,0 +1,251 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from .. import logger
+
+
+class _Session:
+    __slots__ = ("agent", "lock", "users", "last_used", "size")
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.users = 0
+        self.last_used = time.monotonic()
+        self.size = 0
+
+
+class SessionManager:
+    """
+    Keeps a bounded number of agent sessions in memory and parks the rest on disk.
+
+    Sessions are created with ``factory`` and kept in least-recently-used order.
+    When the number of sessions or their estimated size exceeds the budget,
+    or a session stays idle past ``idle_timeout``, the least recently used idle
+    session is saved to ``store_dir`` (its conversation, last actions, usage and
+    cost totals and stop reason) and dropped from memory. The next ``run`` or
+    ``get`` of that session restores it. Results held in an agent's result
+    store are not saved.
+
+    Attributes:
+        store_dir (str): Directory evicted sessions are saved to.
+        max_sessions (int): Maximum number of sessions in memory, or None for no limit.
+        max_memory (int): Maximum size in bytes of the conversations of the sessions in memory, as
+            estimated by ``Agent.get_size``, or None for no limit.
+        idle_timeout (float): Seconds after which an idle session is evicted by ``sweep``, or None.
+        evictions (int): Number of sessions evicted so far.
+        restores (int): Number of sessions restored from disk so far.
+    """
+
+    def __init__(self, factory: Callable[[str], Any], store_dir: str, max_sessions: Optional[int] = None, max_memory: Optional[int] = None, idle_timeout: Optional[float] = None):
+        """
+        Initialize the SessionManager.
+
+        Args:
+            factory (callable): Creates the agent of a session from its id.
+            store_dir (str): Directory evicted sessions are saved to.
+            max_sessions (int, optional): Maximum number of sessions in memory.
+            max_memory (int, optional): Maximum size in bytes of the conversations of the sessions in memory.
+            idle_timeout (float, optional): Seconds after which an idle session is evicted by ``sweep``.
+        """
+        self.factory = factory
+        self.store_dir = store_dir
+        self.max_sessions = max_sessions
+        self.max_memory = max_memory
+        self.idle_timeout = idle_timeout
+        self.evictions = 0
+        self.restores = 0
+        self.__sessions = OrderedDict()
+        self.__saving = {}
+        self.__memory = 0
+        self.__lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def run(self, session_id: str, message: str = None, **kwargs):
+        """
+        Run the agent of a session, restoring it from disk if it was evicted.
+        Runs of the same session are serialized; different sessions run concurrently.
+
+        Args:
+            session_id (str): The session id.
+            message (str, optional): Message from the user.
+            **kwargs: Further arguments for ``Agent.run``.
+
+        Returns:
+            The result of ``Agent.run``.
+        """
+        session = self.__acquire(session_id)
+        try:
+            with session.lock:
+                return session.agent.run(message, **kwargs)
+        finally:
+            self.__release(session_id, session)
+
+    @contextlib.contextmanager
+    def session(self, session_id: str):
+        """
+        Hold the agent of a session, restoring it from disk if it was evicted.
+        The session is neither run by others nor evicted until the block exits::
+
+            with manager.session("alice") as agent:
+                state = agent.get_state()
+
+        Args:
+            session_id (str): The session id.
+
+        Yields:
+            Agent: The session's agent.
+        """
+        held = self.__acquire(session_id)
+        try:
+            with held.lock:
+                yield held.agent
+        finally:
+            self.__release(session_id, held)
+
+    def evict(self, session_id: str) -> bool:
+        """
+        Save a session to disk and drop it from memory.
+
+        Args:
+            session_id (str): The session id.
+
+        Returns:
+            bool: Whether the session was evicted. Sessions in use are not evicted.
+        """
+        with self.__lock:
+            session = self.__sessions.get(session_id)
+            if session is None or session.users:
+                return False
+            self.__drop(session_id, session)
+        self.__save(session_id, session)
+        return True
+
+    def sweep(self) -> int:
+        """
+        Evict sessions idle for longer than ``idle_timeout``.
+
+        Returns:
+            int: The number of evicted sessions.
+        """
+        if self.idle_timeout is None:
+            return 0
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.__lock:
+            idle = [sid for sid, s in self.__sessions.items() if not s.users and s.last_used < cutoff]
+        return sum(self.evict(session_id) for session_id in idle)
+
+    def close(self) -> None:
+        """
+        Save every session in memory to disk.
+        """
+        with self.__lock:
+            session_ids = list(self.__sessions)
+        for session_id in session_ids:
+            self.evict(session_id)
+
+    def in_memory(self):
+        """
+        Get the ids of the sessions in memory.
+
+        Returns:
+            list: Session ids from least to most recently used.
+        """
+        with self.__lock:
+            return list(self.__sessions)
+
+    def __acquire(self, session_id):
+        with self.__lock:
+            session = self.__sessions.get(session_id)
+            if session is None and session_id in self.__saving:
+                # A session still being written to disk is simply taken back.
+                session = self.__saving[session_id]
+                self.__sessions[session_id] = session
+                self.__memory += session.size
+            if session is not None:
+                self.__sessions.move_to_end(session_id)
+                session.users += 1
+                return session
+        session = _Session(self.factory(session_id))
+        state = self.__load(session_id)
+        if state is not None:
+            session.agent.load_state(state)
+        with self.__lock:
+            # Another thread may have restored the same session meanwhile.
+            existing = self.__sessions.get(session_id)
+            if existing is not None:
+                session = existing
+            else:
+                if state is not None:
+                    self.restores += 1
+                self.__sessions[session_id] = session
+            self.__sessions.move_to_end(session_id)
+            session.users += 1
+            return session
+
+    def __release(self, session_id, session):
+        size = session.agent.get_size() if self.max_memory is not None else 0
+        with self.__lock:
+            session.users -= 1
+            session.last_used = time.monotonic()
+            if self.__sessions.get(session_id) is session:
+                self.__memory += size - session.size
+                session.size = size
+            victims = self.__over_budget()
+        for victim_id, victim in victims:
+            self.__save(victim_id, victim)
+
+    def __over_budget(self):
+        victims = []
+        # The most recently used session always stays, even if it alone exceeds the memory budget.
+        for session_id, session in list(self.__sessions.items())[:-1]:
+            over_count = self.max_sessions is not None and len(self.__sessions) > self.max_sessions
+            over_memory = self.max_memory is not None and self.__memory > self.max_memory
+            if not (over_count or over_memory):
+                break
+            if session.users:
+                continue
+            self.__drop(session_id, session)
+            victims.append((session_id, session))
+        return victims
+
+    def __drop(self, session_id, session):
+        del self.__sessions[session_id]
+        self.__saving[session_id] = session
+        self.__memory -= session.size
+        self.evictions += 1
+
+    def __path(self, session_id):
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.store_dir, f"{digest}.json")
+
+    def __save(self, session_id, session):
+        path = self.__path(session_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with session.lock:
+            state = session.agent.get_state()
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"session_id": session_id, "state": state}, file, default=str)
+        os.replace(tmp_path, path)
+        with self.__lock:
+            dropped = self.__saving.get(session_id) is session
+            if dropped:
+                del self.__saving[session_id]
+        if dropped:
+            session.agent.close()
+
+    def __load(self, session_id):
+        path = self.__path(session_id)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file)["state"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to restore session {session_id}: {e}")
+            return None
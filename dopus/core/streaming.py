@@ -0,0 +1,98 @@
+import json
+import threading
+from typing import Any, Callable, Optional
+
+
+class ChunkCollector:
+    """
+    Collects the chunks a generator tool yields, forwards each to a callback
+    and tells the consumer when to stop.
+
+    Attributes:
+        chunks (list): The chunks kept so far.
+        chars (int): Their total size in characters, JSON-encoded for non-strings.
+        stopped (str): Why collection stopped early (``"max_chars"``, ``"max_chunks"`` or
+            ``"timeout"``), or None.
+    """
+
+    def __init__(self, tool_name: str, on_chunk: Callable[[str, Any, int], None], max_chars: Optional[int] = None,
+                 max_chunks: Optional[int] = None):
+        """
+        Initialize the ChunkCollector.
+
+        Args:
+            tool_name (str): The tool producing the chunks.
+            on_chunk (callable): Called with the tool name, every chunk and its index.
+            max_chars (int, optional): Size after which collection stops.
+            max_chunks (int, optional): Number of chunks after which collection stops.
+        """
+        self.tool_name = tool_name
+        self.on_chunk = on_chunk
+        self.max_chars = max_chars
+        self.max_chunks = max_chunks
+        self.chunks = []
+        self.chars = 0
+        self.stopped = None
+        self.__lock = threading.Lock()
+
+    def add(self, chunk: Any) -> bool:
+        """
+        Keep a chunk and forward it.
+
+        Args:
+            chunk (any): The chunk.
+
+        Returns:
+            bool: Whether the consumer should ask for more.
+        """
+        with self.__lock:
+            if self.stopped:
+                return False
+            size = len(chunk) if isinstance(chunk, str) else len(json.dumps(chunk, default=str))
+            if self.max_chars is not None and self.chars + size > self.max_chars:
+                if isinstance(chunk, str) and self.chars < self.max_chars:
+                    chunk = chunk[:self.max_chars - self.chars]
+                    size = len(chunk)
+                else:
+                    self.stopped = "max_chars"
+                    return False
+            self.chunks.append(chunk)
+            self.chars += size
+            index = len(self.chunks) - 1
+            if self.max_chars is not None and self.chars >= self.max_chars:
+                self.stopped = "max_chars"
+            elif self.max_chunks is not None and len(self.chunks) >= self.max_chunks:
+                self.stopped = "max_chunks"
+        self.on_chunk(self.tool_name, chunk, index)
+        return not self.stopped
+
+    def stop(self, reason: str):
+        """
+        Stop accepting chunks.
+
+        Args:
+            reason (str): Why collection stopped.
+        """
+        with self.__lock:
+            self.stopped = self.stopped or reason
+
+    def result(self) -> Any:
+        """
+        Assemble the collected chunks.
+
+        Returns:
+            any: The joined text if every chunk is a string, otherwise the list of chunks. When
+                collection stopped early, a dict with the ``result``, ``truncated`` and a message.
+        """
+        with self.__lock:
+            chunks = list(self.chunks)
+            stopped = self.stopped
+        result = "".join(chunks) if all(isinstance(chunk, str) for chunk in chunks) else chunks
+        if not stopped:
+            return result
+        return {
+            "result": result,
+            "truncated": stopped,
+            "message": f"{self.tool_name} was stopped early ({stopped}) after {len(chunks)} chunks; "
+                       f"the result may be incomplete. Narrow the request to get the rest.",
+        }
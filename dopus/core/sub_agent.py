@@ -0,0 +1,87 @@
+from typing import Any, Callable, Dict, List, Optional
+from .tool_registry import tool_registry
+
+
+class SubAgentResult:
+    """
+    The outcome of a sub-agent run, returned by sub-agent tools.
+
+    ToolRunner passes ``result`` to the parent's conversation and records the
+    rest in the parent's action log under ``sub_agents``.
+
+    Attributes:
+        name (str): The tool name of the sub-agent.
+        message (str): The message the sub-agent was run with.
+        result (any): The result the sub-agent stopped with.
+        actions (list): The actions the sub-agent took.
+        usage (dict): The tokens the sub-agent spent, including those of its own sub-agents.
+        cost (float): The cost of the run, 0.0 if its budget has no prices.
+    """
+
+    def __init__(self, name: str, message: str, result: Any, actions: List[Dict[str, Any]], usage: Dict[str, int], cost: float = 0.0):
+        self.name = name
+        self.message = message
+        self.result = result
+        self.actions = actions
+        self.usage = usage
+        self.cost = cost
+
+    def to_log(self) -> Dict[str, Any]:
+        """
+        Serialize the run for the parent's action log.
+
+        Returns:
+            dict: The name, message, result, actions, usage and cost of the run.
+        """
+        return {
+            "name": self.name,
+            "message": self.message,
+            "result": self.result,
+            "actions": self.actions,
+            "usage": self.usage,
+            "cost": self.cost,
+        }
+
+
+def sub_agent_tool(factory: Callable, name: str, description: str = "", registry: Optional[dict] = None) -> str:
+    """
+    Register a tool that delegates a task to a sub-agent.
+
+    Every call builds a fresh agent with ``factory`` and runs it on its own
+    conversation, so sub-agents never see or alter the parent conversation and
+    several calls in one turn can run concurrently.
+
+    Args:
+        factory (callable): Creates the sub-agent.
+        name (str): The tool name.
+        description (str): What the sub-agent does, shown to the model.
+        registry (dict, optional): The registry to add the tool to. Defaults to the global registry.
+
+    Returns:
+        str: The tool name, to pass to ``Agent.add_tool``.
+    """
+    def run_sub_agent(self, message: str):
+        agent = factory()
+        ret, actions = agent.run(message)
+        result = ret[0] if ret else None
+        usage = agent.get_usage()
+        cost = usage.pop("cost", 0.0)
+        return SubAgentResult(name, message, result, list(actions), usage, cost)
+
+    run_sub_agent.tool_name = name
+    (registry if registry is not None else tool_registry)[name] = {
+        "name": name,
+        "description": description or f"Delegate a task to the {name} agent",
+        "properties": {
+            "message": {
+                "type": "string",
+                "description": "Instructions and all context the agent needs to complete the task",
+            }
+        },
+        "required": ["message"],
+        "function": run_sub_agent,
+        "executor": None,
+        "timeout": None,
+        "concurrent": True,
+    }
+    return name
@@ -1,16 +1,24 @@
 import inspect
-from .tool_registry import tool_registry
+from .tool_registry import tool_registry, schema_cache
+from .executor import EXECUTORS
 from pydantic import BaseModel
 from enum import Enum
 from .. import logger
 
-def __store_tool(name, description, parameters=None, required=None, function=None):
+def __store_tool(name, description, parameters=None, required=None, function=None, executor=None, timeout=None, idempotent=False,
+                 max_chars=None, max_chunks=None):
     return {
         "name": name,
         "description": description,
         "properties": parameters or {},
         "required": required or [],
         "function": function,
+        "executor": executor,
+        "timeout": timeout,
+        "idempotent": idempotent,
+        "streaming": inspect.isgeneratorfunction(function) or inspect.isasyncgenfunction(function),
+        "max_chars": max_chars,
+        "max_chunks": max_chunks,
     }
 
 def _parse_docstring_args(docstring, keyword="Args"):
@@ -113,27 +121,58 @@ def __get_function_description(func):
             return stripped_line
     return ""
 
-def tool(func=None):
+def tool(func=None, *, executor=None, timeout=None, idempotent=False, max_chars=None, max_chunks=None):
     """
     Decorator to register a function as a tool.
 
     This decorator adds metadata to the function and registers it in the tool registry.
+    Generator and async generator functions are streaming tools: every chunk they yield
+    is forwarded to ``TOOL_CHUNK`` listeners as it arrives, and the chunks are joined
+    into the result.
+
+    Args:
+        executor (str, optional): Where the tool runs. ``"process"`` runs it in a worker
+            process pool, for CPU-bound tools that would otherwise hold the GIL. Process
+            tools receive None as ``self``. Generator tools cannot use it. Defaults to running
+            inline on the loop thread.
+        timeout (float, optional): Deadline of a single call in seconds. Overrides the
+            ToolRunner's default deadline.
+        idempotent (bool): Whether repeating a call with the same arguments gives the same result.
+            Repeats of idempotent calls within a run get the earlier result without running the tool.
+        max_chars (int, optional): For generator tools, the result size in characters after which
+            the generator is closed and the result marked as truncated.
+        max_chunks (int, optional): For generator tools, the number of chunks after which the
+            generator is closed.
 
     Returns:
         callable: The decorated function.
     """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown tool executor: {executor}")
     if func is None:
-        return lambda f: tool(f)
+        return lambda f: tool(f, executor=executor, timeout=timeout, idempotent=idempotent, max_chars=max_chars, max_chunks=max_chunks)
+    if executor == "process" and (inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func)):
+        raise ValueError(f"Generator tool {func.__qualname__} cannot run in a worker process")
 
     func.is_tool = True
     func.tool_name = func.__qualname__.replace('.', '_')
-    parameters, required = _get_function_params(func)
+    cached = schema_cache.get(func)
+    if cached is None:
+        parameters, required = _get_function_params(func)
+        schema_cache.put(func, parameters, required)
+    else:
+        parameters, required = cached
     tool_data = __store_tool(
         name=func.__name__,
         description=__get_function_description(func),
         parameters=parameters,
         required=required,
         function=func,
+        executor=executor,
+        timeout=timeout,
+        idempotent=idempotent,
+        max_chars=max_chars,
+        max_chunks=max_chunks,
     )
     tool_registry[func.tool_name] = tool_data
     return func
\ No newline at end of file
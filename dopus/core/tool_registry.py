@@ -1 +1,178 @@
-tool_registry = {}
\ No newline at end of file
+import atexit
+import hashlib
+import inspect
+import json
+import os
+import threading
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+from .. import logger
+
+tool_registry = {}
+
+SCHEMA_CACHE_ENV = "DOPUS_SCHEMA_CACHE"
+SCHEMA_CACHE_VERSION = 1
+
+
+class SchemaCache:
+    """
+    A persistent cache of generated tool schemas.
+
+    Schemas are stored in a JSON file keyed by the function's qualified name
+    plus a hash of its signature, annotations and docstring, so that unchanged
+    tools skip reflection entirely across process restarts. The cache is
+    disabled unless a path is configured, either through the
+    ``DOPUS_SCHEMA_CACHE`` environment variable or ``configure``.
+
+    Attributes:
+        path (str): Location of the cache file, or None when disabled.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the SchemaCache.
+
+        Args:
+            path (str, optional): Location of the cache file.
+        """
+        self.path = None
+        self.__entries = {}
+        self.__dirty = False
+        self.__lock = threading.Lock()
+        self.configure(path)
+        atexit.register(self.flush)
+
+    def configure(self, path: Optional[str]) -> None:
+        """
+        Point the cache at a file and load its contents.
+        Tools are decorated at import time, so this must be called
+        before the modules defining them are imported.
+
+        Args:
+            path (str): Location of the cache file, or None to disable the cache.
+        """
+        with self.__lock:
+            self.path = path
+            self.__entries = self.__read(path) if path else {}
+            self.__dirty = False
+
+    def get(self, func) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """
+        Look up the cached schema of a function.
+
+        Args:
+            func (callable): The tool function.
+
+        Returns:
+            tuple: The cached ``(properties, required)`` pair, or None on a miss.
+        """
+        if not self.path:
+            return None
+        entry = self.__entries.get(self.key(func))
+        if entry is None:
+            return None
+        return entry["properties"], entry["required"]
+
+    def put(self, func, properties: Dict[str, Any], required: List[str]) -> None:
+        """
+        Store the generated schema of a function.
+        Entries left by previous versions of the same function are replaced.
+
+        Args:
+            func (callable): The tool function.
+            properties (dict): The generated properties schema.
+            required (list): The generated list of required parameters.
+        """
+        if not self.path:
+            return
+        key = self.key(func)
+        prefix = f"{func.__module__}.{func.__qualname__}:"
+        with self.__lock:
+            for stale in [k for k in self.__entries if k.startswith(prefix) and k != key]:
+                del self.__entries[stale]
+            self.__entries[key] = {"properties": properties, "required": required}
+            self.__dirty = True
+
+    def flush(self) -> None:
+        """
+        Write pending entries to the cache file.
+        Called automatically when the interpreter exits.
+        """
+        with self.__lock:
+            if not self.path or not self.__dirty:
+                return
+            data = {"version": SCHEMA_CACHE_VERSION, "entries": self.__entries}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    json.dump(data, file)
+                os.replace(tmp_path, self.path)
+                self.__dirty = False
+            except OSError as e:
+                logger.error(f"Failed to write schema cache {self.path}: {e}")
+
+    def clear(self) -> None:
+        """
+        Drop all cached schemas, including those on disk.
+        """
+        with self.__lock:
+            self.__entries = {}
+            self.__dirty = bool(self.path)
+        self.flush()
+
+    @staticmethod
+    def key(func) -> str:
+        """
+        Compute the cache key of a function.
+
+        Args:
+            func (callable): The tool function.
+
+        Returns:
+            str: The qualified name of the function and a hash of its source-level definition.
+        """
+        digest = hashlib.sha256(_fingerprint(func).encode("utf-8")).hexdigest()[:32]
+        return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+    @staticmethod
+    def __read(path: str) -> Dict[str, Any]:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable schema cache {path}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SCHEMA_CACHE_VERSION:
+            return {}
+        return data.get("entries", {})
+
+
+def _fingerprint(func) -> str:
+    parts = [str(SCHEMA_CACHE_VERSION), str(inspect.signature(func)), inspect.getdoc(func) or ""]
+    seen = set()
+    for annotation in getattr(func, "__annotations__", {}).values():
+        parts.append(_describe_type(annotation, seen))
+    return "\n".join(parts)
+
+
+def _describe_type(tp, seen) -> str:
+    # Nested classes contribute their own fields and docstrings to the schema,
+    # so they must be part of the fingerprint as well.
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return f"{tp.__qualname__}{[e.value for e in tp]}"
+    if isinstance(tp, type) and hasattr(tp, "__annotations__") and tp not in seen:
+        seen.add(tp)
+        fields = [f"{name}:{_describe_type(field, seen)}" for name, field in tp.__annotations__.items()]
+        return f"{tp.__module__}.{tp.__qualname__}({inspect.getdoc(tp) or ''};{','.join(fields)})"
+    args = getattr(tp, "__args__", None)
+    if args:
+        return f"{tp!r}[{','.join(_describe_type(arg, seen) for arg in args)}]"
+    return repr(tp)
+
+
+schema_cache = SchemaCache(os.environ.get(SCHEMA_CACHE_ENV))
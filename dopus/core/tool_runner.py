@@ -2,13 +2,31 @@ from .tool_registry import tool_registry
 from ..util import get_tool_str
 from .. import logger
 from .provider import Provider
+from .tracing import tracer as default_tracer, current_span
+from .profiler import Profiler
+from .action_log import ActionLog
+from .sub_agent import SubAgentResult
+from .validation import validate_arguments
+from .json_repair import repair_stats
+from .budget import add_usage
+from .loop_guard import LoopGuard
+from .events import EventBus
+from .result_store import READ_RESULT_TOOL, read_result_tool
+from .streaming import ChunkCollector
+from .executor import process_executor as default_process_executor, ToolTimeout, run_with_timeout, run_coroutine
 import types
 import json
+from collections import ChainMap
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import time
 from enum import Enum
 import inspect
 from pydantic import BaseModel
 
+_PENDING = object()
+
+
 class ToolRunner:
     """
     A class for managing and executing tools from LLM requests.
@@ -17,21 +35,62 @@ class ToolRunner:
     that can be used by an AI agent in a conversation.
     """
 
-    def __init__(self, tools=None, registry=None):
+    def __init__(self, tools=None, registry=None, tracer=None, max_actions=None, action_spill_path=None, process_executor=None, tool_timeout=None, validate_args=True, budget=None, loop_guard=None, event_bus=None, result_store=None, stream_max_chars=None):
         """
         Initialize the ToolRunner.
 
         Args:
             tools (list, optional): Initial list of tools to add.
             registry (dict, optional): Custom tool registry to use.
+            tracer (Tracer, optional): Tracer to record spans with. Defaults to the global tracer.
+            max_actions (int, optional): Maximum number of actions kept in memory per loop.
+            action_spill_path (str, optional): JSON lines file that actions evicted from memory are appended to.
+            process_executor (ProcessToolExecutor, optional): Worker pool for tools declared with
+                ``executor="process"``. Defaults to the shared pool.
+            tool_timeout (float, optional): Default deadline of a tool call in seconds, for tools
+                that do not declare their own ``timeout``.
+            validate_args (bool): Check tool arguments against the tool's schema before calling it.
+                Invalid calls are not run; the validation errors are returned to the model instead.
+            budget (Budget, optional): Token, cost and step limits; the loop stops once one is exceeded.
+            loop_guard (LoopGuard, optional): Protection against runs that never end. Defaults to
+                re-prompting on responses without tool calls and stopping on endlessly repeated calls.
+            event_bus (EventBus, optional): Dispatcher of events to ``on_event`` callbacks.
+            result_store (ResultStore, optional): Store for large tool results, which the conversation
+                then only holds as a handle with a preview.
+            stream_max_chars (int, optional): Result size in characters after which generator tools
+                that do not declare their own ``max_chars`` are stopped.
         """
-        self.__registry = registry or tool_registry
+        self.budget = budget
+        self.loop_guard = loop_guard or LoopGuard()
+        self.__reset_guard()
+        self.usage = {}
+        self.total_usage = {}
+        self.cost = 0.0
+        self.total_cost = 0.0
+        self.steps = 0
+        self.total_steps = 0
+        self.stop_reason = None
+        self.__validate_args = validate_args
+        self.__tool_timeout = tool_timeout
+        self.__stream_max_chars = stream_max_chars
+        self.__process_executor = process_executor or default_process_executor
+        self.__max_actions = max_actions
+        self.__action_spill_path = action_spill_path
+        self.__shared_registry = registry or tool_registry
+        self.__registry = self.__shared_registry
+        self.__tracer = tracer or default_tracer
         self.__tools = set()
         self.__tool_use_callbacks = {}
-        self.__event_callbacks = {}
+        self.__bound_tools = []
+        self.events = event_bus or EventBus()
         self.__looping = False
-        self.actions = []
+        self.__sub_agent_runs = []
+        self.__step_calls = []
+        self.actions = self.__new_action_log()
+        self.profile = None
         self.__ret = None
+        self.result_store = None
+        self.set_result_store(result_store)
         self.add_tools(tools or [])
 
     class Event(Enum):
@@ -41,16 +100,25 @@ class ToolRunner:
         TOOL_CALL_COMPLETED = "Tool call completed"
         STOP = "Tool Runner Stopped"
         PRE_TOOL_CALL = "Pre Tool Call"
+        TOOL_TIMEOUT = "Tool call timed out"
+        TOOL_INVALID_ARGS = "Tool arguments invalid"
+        BUDGET_EXCEEDED = "Budget exceeded"
+        LOOP_GUARD = "Loop guard intervened"
+        TOOL_CHUNK = "Tool produced a chunk"
     
-    def on_event(self, event : Event, callback):
+    def on_event(self, event : Event, callback, mode="sync", max_queue=None, on_full=None):
         """
         Register a callback function for a specific event.
 
         Args:
             event (Event): The event to listen for.
             callback (callable): The function to call when the event occurs.
+            mode (str): ``"sync"`` to call it on the loop thread, ``"async"`` to call it on a
+                background worker so it does not delay the loop.
+            max_queue (int, optional): Capacity of an async callback's queue.
+            on_full (str, optional): ``"drop"`` or ``"block"`` when an async callback's queue is full.
         """
-        self.__event_callbacks.setdefault(event, []).append(callback)
+        self.events.subscribe(event, callback, mode=mode, max_queue=max_queue, on_full=on_full)
 
     def _trigger_event(self, event : Event, *args, **kwargs):
         """
@@ -61,9 +129,7 @@ class ToolRunner:
             *args: Positional arguments to pass to the callbacks.
             **kwargs: Keyword arguments to pass to the callbacks.
         """
-        if event in self.__event_callbacks:
-            for callback in self.__event_callbacks[event]:
-                callback(*args, **kwargs)
+        self.events.publish(event, *args, **kwargs)
 
     def on(self, tool, callback):
         """
@@ -91,6 +157,18 @@ class ToolRunner:
             self.__tools.add(get_tool_str(tool))
             self._add_tool_funcs(tool, agent)
 
+    def add_bound_tools(self, tools, obj):
+        """
+        Add tools implemented by methods of an object. The methods are looked up
+        when a tool is called, so adding them costs the same however many there are.
+
+        Args:
+            tools (Mapping): Method names keyed by tool name, such as an agent class's tool manifest.
+            obj (object): The object whose methods implement the tools.
+        """
+        self.__tools.update(tools)
+        self.__bound_tools.append((obj, tools))
+
     def add_tools(self, tools, agent=None):
         """
         Add multiple tools to the ToolRunner.
@@ -101,6 +179,29 @@ class ToolRunner:
         """
         [self.add_tool(tool, agent) for tool in tools]
 
+    def set_result_store(self, store):
+        """
+        Store tool results over the store's threshold instead of returning them in full,
+        and offer the ``read_result`` tool to read them.
+
+        The tool is defined for this runner only and never added to the shared registry.
+
+        Args:
+            store (ResultStore): The store, or None to return all results in full.
+        """
+        self.result_store = store
+        if store is None:
+            self.__registry = self.__shared_registry
+            self.__tools.discard(READ_RESULT_TOOL)
+            self.__tool_use_callbacks.pop(READ_RESULT_TOOL, None)
+            return
+        self.__registry = ChainMap({READ_RESULT_TOOL: read_result_tool()}, self.__shared_registry)
+        self.__tools.add(READ_RESULT_TOOL)
+        self.__tool_use_callbacks[READ_RESULT_TOOL] = [self.__read_result]
+
+    def __read_result(self, handle, offset, length):
+        return self.result_store.read(handle, offset, length)
+
     def remove_tool(self, tool):
         """
         Remove a tool from the ToolRunner.
@@ -111,7 +212,7 @@ class ToolRunner:
         if tool:
             self.__tools.discard(get_tool_str(tool))
 
-    def loop(self, convo, llm, agent=None):
+    def loop(self, convo, llm, agent=None, profile=False):
         """
         Start the main execution loop for processing conversations.
 
@@ -119,17 +220,136 @@ class ToolRunner:
             convo (object): The conversation object.
             llm (object): The language model object.
             agent (object, optional): The agent object.
+            profile (bool | Profiler, optional): Record a per-phase and per-tool cost breakdown
+                of this loop, available afterwards as ``profile``.
 
         Returns:
             tuple: A tuple containing the final result and a list of actions performed.
         """
-        self.actions = []
+        self.actions = self.__new_action_log()
+        self.usage = {}
+        self.cost = 0.0
+        self.steps = 0
+        self.stop_reason = None
+        self.__reset_guard()
         self.__looping = True
+        if not profile:
+            self.__run(convo, llm, agent)
+            return self.__ret, self.actions
+        self.profile = profile if isinstance(profile, Profiler) else Profiler()
+        tracer = self.__tracer
+        self.__tracer = tracer.extended(self.profile)
+        self.profile.start()
+        try:
+            self.__run(convo, llm, agent)
+        finally:
+            self.__tracer = tracer
+            self.profile.finish()
+            logger.info("Profile of %s:\n%s", agent or self, self.profile.summary())
+        return self.__ret, self.actions
+
+    def __new_action_log(self):
+        return ActionLog(self.__max_actions, self.__action_spill_path)
+
+    def __run(self, convo, llm, agent):
         while self.__looping:
             result, dlog = self.execute(convo, llm, agent)
-            self.actions.append(dlog)
+            if dlog is not None:
+                self.actions.append(dlog)
+                self.__empty_responses = 0
+            elif self.__looping:
+                self.__on_empty_response(convo)
+            for record in self.__guard_records:
+                self.__record(record)
+            self.__guard_records = []
+            if not self.__looping:
+                break
+            if self.__guard_stop is not None:
+                self.__halt(self.__guard_stop, "loop_guard", ToolRunner.Event.LOOP_GUARD)
+            elif self.budget is not None:
+                reason = self.budget.check(*self.__spent())
+                if reason is not None:
+                    self.__halt(reason, "budget_exceeded", ToolRunner.Event.BUDGET_EXCEEDED)
         self._trigger_event(ToolRunner.Event.STOP, result)
-        return self.__ret, self.actions
+
+    def __reset_guard(self):
+        self.__dedup = {}
+        self.__dedup_step = []
+        self.dedup_hits = {}
+        self.__empty_responses = 0
+        self.__last_call = None
+        self.__last_result = None, None
+        self.__repeats = 0
+        self.__guard_records = []
+        self.__guard_stop = None
+
+    def __on_empty_response(self, convo):
+        guard = self.loop_guard
+        self.__empty_responses += 1
+        if guard.on_empty == "stop" or self.__empty_responses >= guard.max_empty:
+            self.__guard_stop = {"reason": "no_tool_call", "count": self.__empty_responses}
+            return
+        record = {"event": "no_tool_call", "action": guard.on_empty, "count": self.__empty_responses}
+        if guard.on_empty == "reprompt":
+            convo.append("user", guard.reprompt_message)
+        else:
+            record["delay"] = guard.backoff_delay(self.__empty_responses)
+            time.sleep(record["delay"])
+        self.__guard_records.append(record)
+
+    def __check_repeat(self, tool_data):
+        guard = self.loop_guard
+        if guard.on_repeat is None:
+            return None
+        call = self.__dedup_key(tool_data)
+        self.__repeats = self.__repeats + 1 if call == self.__last_call else 0
+        self.__last_call = call
+        if self.__repeats < guard.max_repeats:
+            return None
+        record = {"event": "repeated_call", "action": guard.on_repeat, "tool": tool_data['name'], "count": self.__repeats + 1}
+        self.__guard_records.append(record)
+        if guard.on_repeat == "reuse":
+            last_call, last_result = self.__last_result
+            return {
+                "repeated_call": True,
+                "message": f"This call is identical to your previous {self.__repeats} calls of {tool_data['name']}; it was not run again.",
+                # The previous identical call may be earlier in this turn and not have run yet.
+                "result": last_result if last_call == call else _PENDING,
+            }
+        self.__guard_stop = {"reason": "repeated_call", "tool": tool_data['name'], "count": self.__repeats + 1}
+        return {
+            "error": "repeated_call",
+            "message": f"{tool_data['name']} was called {self.__repeats + 1} times in a row with the same arguments; the run was stopped.",
+        }
+
+    def __cached_call(self, tool_data):
+        if tool_data.get('parse_error') or not self.__registry.get(tool_data['name'], {}).get('idempotent'):
+            return None
+        key = self.__dedup_key(tool_data)
+        if key not in self.__dedup:
+            return None
+        self.dedup_hits[tool_data['name']] = self.dedup_hits.get(tool_data['name'], 0) + 1
+        self.__dedup_step.append(tool_data['name'])
+        return {
+            "cached_result": True,
+            "message": f"{tool_data['name']} was already called with these arguments in this run; this is the earlier result.",
+            "result": self.__dedup[key],
+        }
+
+    def __remember_call(self, tool_data, result):
+        if tool_data.get('parse_error') or not self.__registry.get(tool_data['name'], {}).get('idempotent'):
+            return
+        if isinstance(result, dict) and "error" in result:
+            return
+        self.__dedup[self.__dedup_key(tool_data)] = result
+
+    @staticmethod
+    def __dedup_key(tool_data):
+        return tool_data['name'], json.dumps(tool_data['args'], sort_keys=True, default=str)
+
+    def __record(self, record):
+        self.actions.append(record)
+        self._trigger_event(ToolRunner.Event.LOOP_GUARD, record)
 
     def execute(self, convo, llm, agent=None):
         """
@@ -143,15 +363,54 @@ class ToolRunner:
         Returns:
             tuple: A tuple containing the result and a log of the execution.
         """
-        messages = convo.get_messages()
-        resp = llm.request(messages, self.__registry, self.__tools, agent.prompt() if agent else "")
-        tool_calls = llm.get_tool_calls(resp)
-        if tool_calls is not None:
-            result = self._call_tools(tool_calls, llm)
-            dlog = llm.build_log(resp, messages, result, self.__tools, agent)
-            return result, dlog
-        else:
-            return None, None
+        with self.__tracer.span("tool_runner.execute", step=self.actions.total) as step_span:
+            messages = convo.get_messages()
+            with self.__tracer.span("provider.request", model=llm.model, messages=len(messages)) as request_span:
+                resp = llm.request(messages, self.__registry, self.__tools, agent.prompt() if agent else "")
+                usage = llm.get_usage(resp)
+                if request_span.recording:
+                    request_span.update(usage)
+                    request_span.set("served_by", llm.get_model(resp))
+            cost = self.__charge(llm.get_charges(resp), usage)
+            tool_calls = llm.get_tool_calls(resp)
+            if tool_calls:
+                step_span.set("tool_calls", len(tool_calls))
+                self.__sub_agent_runs = []
+                self.__dedup_step = []
+                self.__step_calls = []
+                result = self._call_tools(tool_calls, llm)
+                dlog = llm.build_log(resp, messages, result, self.__tools, agent)
+                if self.__step_calls:
+                    dlog['tool_calls'] = self.__step_calls
+                if self.__sub_agent_runs:
+                    dlog['sub_agents'] = self.__sub_agent_runs
+                    for run in self.__sub_agent_runs:
+                        add_usage(self.usage, run['usage'])
+                        add_usage(self.total_usage, run['usage'])
+                        self.cost += run['cost']
+                        self.total_cost += run['cost']
+                if self.__dedup_step:
+                    dlog['dedup'] = {
+                        "hits": len(self.__dedup_step),
+                        "tools": self.__dedup_step,
+                        "run_hits": dict(self.dedup_hits),
+                    }
+                if cost:
+                    dlog['cost'] = cost
+                return result, dlog
+            else:
+                step_span.set("tool_calls", 0)
+                return None, None
+
+    def close(self, timeout=None):
+        """
+        Deliver the queued events and stop the event worker threads.
+        Workers start again if more events are published.
+
+        Args:
+            timeout (float, optional): Longest wait per worker in seconds.
+        """
+        self.events.close(timeout)
 
     def stop(self, result=None):
         """
@@ -162,6 +421,32 @@ class ToolRunner:
         """
         self.__ret = result, self.actions
         self.__looping = False
+        if self.stop_reason is None:
+            self.stop_reason = {"reason": "stopped"}
+
+    def __charge(self, charges, usage):
+        self.steps += 1
+        self.total_steps += 1
+        add_usage(self.usage, usage)
+        add_usage(self.total_usage, usage)
+        cost = sum(self.budget.cost(model, counts) for model, counts in charges) if self.budget is not None else 0.0
+        self.cost += cost
+        self.total_cost += cost
+        return cost
+
+    def __spent(self):
+        if self.budget.cumulative:
+            return self.total_usage, self.total_cost, self.total_steps
+        return self.usage, self.cost, self.steps
+
+    def __halt(self, reason, event, trigger):
+        logger.warning(f"Stopping run: {reason}")
+        self.stop_reason = reason
+        record = {"event": event, **reason}
+        self.actions.append(record)
+        self._trigger_event(trigger, record if trigger is ToolRunner.Event.LOOP_GUARD else reason)
+        self.__ret = None, self.actions
+        self.__looping = False
 
     def _add_tool_funcs(self, tool: str, agent=None):
         """
@@ -177,7 +462,8 @@ class ToolRunner:
             obj = agent or self
             method_name = f"on_{tool_str}"
             setattr(obj, method_name, types.MethodType(tool_info['function'], obj))
-            obj.on_tool_use(tool, getattr(obj, method_name))
+            register = self.on if obj is self else obj.on_tool_use
+            register(tool, getattr(obj, method_name))
         else:
             logger.debug("Tool not found or has no callback")
 
@@ -200,8 +486,24 @@ class ToolRunner:
                 ToolRunner.Event.TOOL_NOT_FOUND.value
             )
             return None
+        if self.__validate_args:
+            errors = validate_arguments(self.__registry[tool_name], tool_args)
+            if errors:
+                logger.error(f"Invalid arguments for tool {tool_name}: {'; '.join(errors)}")
+                self._trigger_event(
+                    ToolRunner.Event.TOOL_INVALID_ARGS,
+                    tool_name,
+                    tool_args,
+                    f"{ToolRunner.Event.TOOL_INVALID_ARGS.value}: {'; '.join(errors)}"
+                )
+                return {
+                    "error": "invalid_arguments",
+                    "message": f"Tool {tool_name} was not called because its arguments are invalid. Fix them and call it again.",
+                    "errors": errors,
+                }
         try:
-            for callback in self.__tool_use_callbacks[tool_name]:                
+            callbacks = [getattr(obj, tools[tool_name]) for obj, tools in self.__bound_tools if tool_name in tools]
+            for callback in callbacks + self.__tool_use_callbacks.get(tool_name, []):
                 sig = inspect.signature(callback)
                 instantiated_args = {}
                 
@@ -224,8 +526,21 @@ class ToolRunner:
                                 return None
                         else:
                             instantiated_args[name] = arg_value
-                res = callback(**instantiated_args) or ''
+                res = self.__invoke(tool_name, callback, instantiated_args) or ''
             return res
+        except ToolTimeout as e:
+            logger.error(f"Tool {tool_name} timed out after {e.timeout}s")
+            self._trigger_event(
+                ToolRunner.Event.TOOL_TIMEOUT,
+                tool_name,
+                tool_args,
+                f"{ToolRunner.Event.TOOL_TIMEOUT.value}: {e}"
+            )
+            return {
+                "error": "timeout",
+                "message": f"Tool {tool_name} did not finish within {e.timeout}s and was abandoned.",
+                "timeout": e.timeout,
+            }
         except Exception as e:
             logger.error(e)
             self._trigger_event(
@@ -235,22 +550,173 @@ class ToolRunner:
                 f"{ToolRunner.Event.TOOL_FAILED.value}: {e}"
             )
 
+    def __invoke(self, tool_name, callback, args):
+        tool_info = self.__registry[tool_name]
+        function = tool_info.get('function')
+        timeout = tool_info.get('timeout')
+        if timeout is None:
+            timeout = self.__tool_timeout
+        stats = {}
+        is_tool = getattr(callback, '__func__', None) is function
+        try:
+            if tool_info.get('streaming') and is_tool:
+                return self.__stream(tool_name, tool_info, callback, args, timeout, stats)
+            if tool_info.get('executor') == "process" and is_tool:
+                return self.__process_executor.run(function, args, timeout, stats)
+            if inspect.iscoroutinefunction(callback):
+                return run_coroutine(callback, args, timeout)
+            if timeout is None:
+                return callback(**args)
+            return run_with_timeout(callback, args, timeout, stats)
+        finally:
+            # CPU spent off the loop thread, which the profiler cannot see from the tool.call span.
+            span = current_span()
+            if "cpu" in stats and getattr(span, "name", None) == "tool.call":
+                span.set("worker_cpu", stats["cpu"])
+
+    def __stream(self, tool_name, tool_info, callback, args, timeout, stats):
+        collector = ChunkCollector(
+            tool_name,
+            lambda *chunk: self._trigger_event(ToolRunner.Event.TOOL_CHUNK, *chunk),
+            max_chars=tool_info.get('max_chars') or self.__stream_max_chars,
+            max_chunks=tool_info.get('max_chunks'),
+        )
+        if inspect.isasyncgenfunction(callback):
+            async def consume():
+                chunks = callback(**args)
+                try:
+                    async for chunk in chunks:
+                        if not collector.add(chunk):
+                            break
+                finally:
+                    await chunks.aclose()
+        else:
+            def consume():
+                chunks = callback(**args)
+                try:
+                    for chunk in chunks:
+                        if not collector.add(chunk):
+                            break
+                finally:
+                    chunks.close()
+        try:
+            if inspect.iscoroutinefunction(consume):
+                run_coroutine(consume, {}, timeout)
+            elif timeout is None:
+                consume()
+            else:
+                run_with_timeout(consume, {}, timeout, stats)
+        except ToolTimeout:
+            if not collector.chunks:
+                raise
+            # Keep what arrived before the deadline; the abandoned generator stops at its next chunk.
+            collector.stop("timeout")
+        return collector.result()
+
     def _call_tools(self, tool_calls, llm):
         """
         Process and execute a list of tool calls.
+        Calls to concurrent tools such as sub-agents run in parallel, other
+        calls run one after another in the order the model made them.
 
         Args:
             tool_calls (list): A list of tool calls to execute.
             llm (object): The language model object.
 
+        Every call and its result is kept for the step's log.
+
         Returns:
-            any: The result of the tool execution.
+            any: The result of the first tool call.
         """
         if not tool_calls:
             return None
-        tool_call = tool_calls[0]
-        self._trigger_event(ToolRunner.Event.PRE_TOOL_CALL, tool_call)
-        tool_data = llm.extract_tool_call_data(tool_call)
-        result = self._call_tool(tool_data['name'], tool_data['args'])
-        self._trigger_event(ToolRunner.Event.TOOL_CALL_COMPLETED, result, tool_data)
-        return result
\ No newline at end of file
+        with self.__tracer.span("tool_runner.dispatch", tool_calls=len(tool_calls)):
+            calls = []
+            for tool_call in tool_calls:
+                self._trigger_event(ToolRunner.Event.PRE_TOOL_CALL, tool_call)
+                with self.__tracer.span("provider.extract_tool_call_data"):
+                    tool_data = llm.extract_tool_call_data(tool_call)
+                if tool_data is None:
+                    logger.error(f"Skipping unreadable tool call: {tool_call}")
+                    continue
+                calls.append(tool_data)
+            if not calls:
+                return None
+            guarded = [self.__check_repeat(tool_data) for tool_data in calls]
+            cached = [self.__cached_call(tool_data) if replaced is None else None for tool_data, replaced in zip(calls, guarded)]
+            run = [replaced is None and hit is None for replaced, hit in zip(guarded, cached)]
+            ran = iter(self.__run_calls([data for data, needed in zip(calls, run) if needed]))
+            results = [next(ran) if needed else (replaced if replaced is not None else hit) for needed, replaced, hit in zip(run, guarded, cached)]
+            for tool_data, needed, result in zip(calls, run, results):
+                if needed:
+                    self.__remember_call(tool_data, result)
+            for i, tool_data in enumerate(calls):
+                if guarded[i] is not None:
+                    if guarded[i].get("result") is _PENDING:
+                        results[i] = dict(guarded[i], result=self.__last_result[1])
+                elif cached[i] is not None:
+                    self.__last_result = self.__dedup_key(tool_data), cached[i]["result"]
+                else:
+                    result = results[i].result if isinstance(results[i], SubAgentResult) else results[i]
+                    self.__last_result = self.__dedup_key(tool_data), result
+            # Offloaded after the results are remembered, so reuses get a fresh handle to the full result.
+            results = [self.__offload(tool_data, result) for tool_data, result in zip(calls, results)]
+            for tool_data, result in zip(calls, results):
+                if isinstance(result, SubAgentResult):
+                    self.__sub_agent_runs.append(result.to_log())
+                    result = result.result
+                self.__step_calls.append({
+                    'id': tool_data.get('id'),
+                    'name': tool_data['name'],
+                    'arguments': tool_data['args'],
+                    'result': result,
+                })
+                self._trigger_event(ToolRunner.Event.TOOL_CALL_COMPLETED, result, tool_data)
+            return results[0].result if isinstance(results[0], SubAgentResult) else results[0]
+
+    def __offload(self, tool_data, result):
+        if self.result_store is None or tool_data['name'] == READ_RESULT_TOOL or isinstance(result, SubAgentResult):
+            return result
+        if isinstance(result, dict) and (result.get("cached_result") or result.get("repeated_call")):
+            return dict(result, result=self.result_store.offload(tool_data['name'], result["result"]))
+        return self.result_store.offload(tool_data['name'], result)
+
+    def __run_calls(self, calls):
+        results = [None] * len(calls)
+        parallel = [i for i, data in enumerate(calls) if self.__registry.get(data['name'], {}).get('concurrent')]
+        if len(parallel) > 1:
+            with ThreadPoolExecutor(max_workers=len(parallel), thread_name_prefix="dopus-call") as pool:
+                futures = {i: pool.submit(contextvars.copy_context().run, self.__call_one, calls[i]) for i in parallel}
+                for i, data in enumerate(calls):
+                    if i not in futures:
+                        results[i] = self.__call_one(data)
+                for i, future in futures.items():
+                    results[i] = future.result()
+        else:
+            results = [self.__call_one(data) for data in calls]
+        return results
+
+    def __call_one(self, tool_data):
+        if tool_data.get('parse_error'):
+            # Arguments that could not be repaired go back to the model instead of the tool.
+            self._trigger_event(
+                ToolRunner.Event.TOOL_INVALID_ARGS,
+                tool_data['name'],
+                tool_data['args'],
+                f"{ToolRunner.Event.TOOL_INVALID_ARGS.value}: {tool_data['parse_error']}"
+            )
+            return {
+                "error": "malformed_arguments",
+                "message": f"The arguments of {tool_data['name']} are not valid JSON. Call it again with a JSON object.",
+                "errors": [tool_data['parse_error']],
+            }
+        with self.__tracer.span("tool.call", tool=tool_data['name']) as tool_span:
+            result = self._call_tool(tool_data['name'], tool_data['args'])
+            if tool_data.get('repairs') and isinstance(result, dict) and result.get('error') == "invalid_arguments":
+                repair_stats.record("invalid")
+            if tool_span.recording:
+                tool_span.update({
+                    "args_size": len(json.dumps(tool_data['args'], default=str)),
+                    "result_size": len(str(result)),
+                })
+            return result
\ No newline at end of file
@@ -0,0 +1,389 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from .. import logger
+
+_current_span = ContextVar("dopus_current_span", default=None)
+
+
+class Span:
+    """
+    A timed unit of work within an agent run.
+
+    Spans are created by a ``Tracer`` and used as context managers. A span
+    opened while another span is active becomes its child.
+
+    Attributes:
+        name (str): Name of the stage being measured.
+        attributes (dict): Attributes such as token usage and payload sizes.
+        trace_id (str): Identifier shared by every span of a run.
+        span_id (str): Identifier of this span.
+        parent_id (str): Identifier of the parent span, or None for a root span.
+        start_time (float): Wall-clock start time in seconds since the epoch.
+        duration (float): Elapsed time in seconds, set once the span ends.
+        status (str): "ok", or "error" if the span exited with an exception.
+    """
+
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], parent: Optional["Span"] = None):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = None
+        self.duration = None
+        self.status = "ok"
+        self.error = None
+        self.__start = None
+        self.__token = None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Set an attribute on the span.
+
+        Args:
+            key (str): The attribute name.
+            value (any): The attribute value.
+        """
+        self.attributes[key] = value
+
+    def update(self, attributes: Dict[str, Any]) -> None:
+        """
+        Set several attributes on the span.
+
+        Args:
+            attributes (dict): The attributes to set.
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the span.
+
+        Returns:
+            dict: A JSON-compatible representation of the span.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self.__start = time.perf_counter()
+        self.__token = _current_span.set(self)
+        self.tracer._start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.__start
+        if exc is not None:
+            self.status = "error"
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.__token)
+        self.tracer._end(self)
+        return False
+
+
+class _NoopSpan:
+    recording = False
+
+    def set(self, key, value):
+        pass
+
+    def update(self, attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanSink:
+    """
+    Base class of span exporters.
+    Subclasses override ``on_end`` and optionally ``on_start`` and ``shutdown``.
+    """
+
+    def on_start(self, span: Span) -> None:
+        """
+        Called when a span starts.
+
+        Args:
+            span (Span): The span that started.
+        """
+        pass
+
+    def on_end(self, span: Span) -> None:
+        """
+        Called when a span ends.
+
+        Args:
+            span (Span): The span that ended.
+        """
+        pass
+
+    def shutdown(self) -> None:
+        """
+        Release any resources held by the sink.
+        """
+        pass
+
+
+class InMemorySink(SpanSink):
+    """
+    A sink that collects finished spans in memory.
+
+    Attributes:
+        spans (list): The finished spans, in the order they ended.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.__lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        with self.__lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        """
+        Drop all collected spans.
+        """
+        with self.__lock:
+            self.spans = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the collected spans by name.
+
+        Returns:
+            dict: The count, total, mean and max duration in seconds of each span name.
+        """
+        stats = {}
+        with self.__lock:
+            spans = list(self.spans)
+        for span in spans:
+            entry = stats.setdefault(span.name, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += span.duration
+            entry["max"] = max(entry["max"], span.duration)
+        for entry in stats.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return stats
+
+
+class JsonlSink(SpanSink):
+    """
+    A sink that appends finished spans to a JSON lines file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the JsonlSink.
+
+        Args:
+            path (str): Location of the output file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__file = open(path, "a", encoding="utf-8")
+        self.__lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self.__lock:
+            self.__file.write(line + "\n")
+            self.__file.flush()
+
+    def shutdown(self) -> None:
+        with self.__lock:
+            self.__file.close()
+
+
+class OpenTelemetrySink(SpanSink):
+    """
+    A sink that mirrors spans into OpenTelemetry.
+    Requires the ``opentelemetry-api`` package.
+    """
+
+    def __init__(self, otel_tracer=None):
+        """
+        Initialize the OpenTelemetrySink.
+
+        Args:
+            otel_tracer (opentelemetry.trace.Tracer, optional): The tracer to export to.
+                Defaults to the globally configured tracer provider.
+        """
+        from opentelemetry import trace
+        self.__trace = trace
+        self.__otel_tracer = otel_tracer or trace.get_tracer("dopus")
+        self.__open = {}
+        self.__lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        with self.__lock:
+            parent = self.__open.get(span.parent_id)
+        context = self.__trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self.__otel_tracer.start_span(
+            span.name,
+            context=context,
+            start_time=int(span.start_time * 1e9),
+        )
+        with self.__lock:
+            self.__open[span.span_id] = otel_span
+
+    def on_end(self, span: Span) -> None:
+        with self.__lock:
+            otel_span = self.__open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                otel_span.set_attribute(key, value)
+            elif value is not None:
+                otel_span.set_attribute(key, json.dumps(value, default=str))
+        if span.status == "error":
+            otel_span.set_status(self.__trace.Status(self.__trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=int((span.start_time + span.duration) * 1e9))
+
+
+class Tracer:
+    """
+    Creates spans for the stages of the agent loop and exports them to sinks.
+
+    A tracer without sinks is disabled: ``span`` then returns a shared no-op
+    span, so instrumentation costs next to nothing.
+    """
+
+    def __init__(self, sinks: Optional[List[SpanSink]] = None):
+        """
+        Initialize the Tracer.
+
+        Args:
+            sinks (list, optional): Initial list of sinks to export to.
+        """
+        self.__sinks = list(sinks or [])
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the tracer has any sinks to export to.
+        """
+        return bool(self.__sinks)
+
+    def add_sink(self, sink: SpanSink) -> SpanSink:
+        """
+        Add a sink to export spans to.
+
+        Args:
+            sink (SpanSink): The sink to add.
+
+        Returns:
+            SpanSink: The added sink.
+        """
+        self.__sinks = self.__sinks + [sink]
+        return sink
+
+    def remove_sink(self, sink: SpanSink) -> None:
+        """
+        Stop exporting spans to a sink and shut it down.
+
+        Args:
+            sink (SpanSink): The sink to remove.
+        """
+        self.__sinks = [s for s in self.__sinks if s is not sink]
+        sink.shutdown()
+
+    def extended(self, *sinks: SpanSink) -> "Tracer":
+        """
+        Create a tracer exporting to this tracer's sinks plus additional ones.
+
+        Args:
+            *sinks (SpanSink): The additional sinks.
+
+        Returns:
+            Tracer: The new tracer.
+        """
+        return Tracer(self.__sinks + list(sinks))
+
+    def span(self, name: str, **attributes):
+        """
+        Create a span, as a child of the active span if there is one.
+
+        Args:
+            name (str): Name of the stage being measured.
+            **attributes: Initial attributes of the span.
+
+        Returns:
+            Span: A context manager measuring the enclosed block.
+        """
+        if not self.__sinks:
+            return NOOP_SPAN
+        return Span(self, name, attributes, _current_span.get())
+
+    def _start(self, span: Span) -> None:
+        for sink in self.__sinks:
+            try:
+                sink.on_start(span)
+            except Exception as e:
+                logger.error(f"Span sink {sink} failed: {e}")
+
+    def _end(self, span: Span) -> None:
+        for sink in self.__sinks:
+            try:
+                sink.on_end(span)
+            except Exception as e:
+                logger.error(f"Span sink {sink} failed: {e}")
+
+
+def span(name: str, **attributes):
+    """
+    Create a span on the tracer of the active span.
+    Returns a no-op span when no span is active, so library code can be
+    instrumented without knowing which tracer the caller configured.
+
+    Args:
+        name (str): Name of the stage being measured.
+        **attributes: Initial attributes of the span.
+
+    Returns:
+        Span: A context manager measuring the enclosed block.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return parent.tracer.span(name, **attributes)
+
+
+def current_span():
+    """
+    Get the active span.
+
+    Returns:
+        Span: The innermost active span, or a no-op span if there is none.
+    """
+    return _current_span.get() or NOOP_SPAN
+
+
+tracer = Tracer()
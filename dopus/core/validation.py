@@ -0,0 +1,104 @@
+from typing import Any, Callable, Dict, List
+
+_JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+}
+
+def validate_arguments(tool_info: Dict[str, Any], args: Any) -> List[str]:
+    """
+    Check tool arguments against the tool's generated schema.
+
+    The schema is compiled into a validator on first use and the validator is
+    reused for later calls of the same tool.
+
+    Args:
+        tool_info (dict): The registry entry of the tool.
+        args (dict): The arguments produced by the model.
+
+    Returns:
+        list: Human readable errors, empty if the arguments are valid.
+    """
+    errors = []
+    compile_validator(tool_info)(args, "args", errors)
+    return errors
+
+
+def compile_validator(tool_info: Dict[str, Any]) -> Callable[[Any, str, list], None]:
+    """
+    Get the compiled validator of a tool's arguments.
+
+    The validator is compiled on first use and kept on the registry entry under
+    ``validator``, so it lives as long as the entry and re-registering a tool
+    compiles it anew.
+
+    Args:
+        tool_info (dict): The registry entry of the tool.
+
+    Returns:
+        callable: A function ``(args, path, errors)`` appending errors to ``errors``.
+    """
+    validator = tool_info.get("validator")
+    if validator is None:
+        validator = _compile({
+            "type": "object",
+            "properties": tool_info.get("properties", {}),
+            "required": tool_info.get("required", []),
+            "additionalProperties": False,
+        })
+        # Concurrent first calls may both compile; either result is equivalent.
+        tool_info["validator"] = validator
+    return validator
+
+
+def _compile(schema):
+    expected = schema.get("type")
+    types = _JSON_TYPES.get(expected)
+    checks = []
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {allowed}")
+        checks.append(check_enum)
+    if expected == "object":
+        properties = {name: _compile(item) for name, item in schema.get("properties", {}).items()}
+        required = list(schema.get("required", []))
+        closed = schema.get("additionalProperties") is False
+
+        def check_object(value, path, errors):
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}.{name}: missing required field")
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    check(item, f"{path}.{name}", errors)
+                elif closed:
+                    errors.append(f"{path}.{name}: unexpected field")
+        checks.append(check_object)
+    elif expected == "array" and "items" in schema:
+        check_item = _compile(schema["items"])
+
+        def check_array(value, path, errors):
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+        checks.append(check_array)
+    numeric = expected in ("integer", "number")
+
+    def check(value, path, errors):
+        if types is not None:
+            if numeric and isinstance(value, bool):
+                errors.append(f"{path}: expected {expected}, got boolean")
+                return
+            if not isinstance(value, types):
+                errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+                return
+        for nested in checks:
+            nested(value, path, errors)
+    return check
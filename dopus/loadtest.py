@@ -0,0 +1,377 @@
+"""
+Load test agents against a simulated provider.
+
+Spins up concurrent sessions, each an agent driven through ``Agent.run`` by a
+fake provider with configurable latency, errors and token sizes, and reports
+throughput, step latency percentiles, CPU per step and peak RSS as JSON::
+
+    python -m dopus.loadtest --sessions 64 --runs 5 --steps 4 --latency lognormal:0.3,0.5 --error-rate 0.01
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from .core import Agent, LatencyHistogram, Provider, Tracer, tool
+from .core.tracing import SpanSink
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class InjectedError(Exception):
+    """
+    An error raised by FakeProvider to simulate a failing backend.
+
+    Attributes:
+        status_code (int): The simulated HTTP status code.
+    """
+
+    def __init__(self, status_code: int = 500):
+        super().__init__(f"Injected provider error (HTTP {status_code})")
+        self.status_code = status_code
+
+
+def latency_sampler(spec) -> Callable[[random.Random], float]:
+    """
+    Build a latency distribution from a spec.
+
+    Args:
+        spec (float | str | callable): A constant in seconds, a callable taking a ``random.Random``,
+            or one of ``const:S``, ``uniform:LOW,HIGH``, ``exp:MEAN`` and ``lognormal:MEDIAN,SIGMA``.
+
+    Returns:
+        callable: A function drawing a latency in seconds from a ``random.Random``.
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "const" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class FakeProvider(Provider):
+    """
+    A provider that simulates an LLM backend without network calls.
+
+    Every request sleeps for a latency drawn from a distribution, fails with a
+    given probability and reports token usage growing with the conversation.
+    The tool calls are chosen by ``plan``.
+    """
+
+    def __init__(self, plan: Callable[[list], Optional[tuple]], latency=0.0, error_rate: float = 0.0, error_status: int = 500,
+                 prompt_tokens: int = 200, tokens_per_message: int = 50, completion_tokens: int = 30, seed: Optional[int] = None, model: str = "fake"):
+        """
+        Initialize the FakeProvider.
+
+        Args:
+            plan (callable): Maps the conversation messages to the next tool call as ``(name, args)``,
+                or None for a response without tool calls.
+            latency (float | str | callable): The latency distribution, see ``latency_sampler``.
+            error_rate (float): Probability of a request failing with InjectedError.
+            error_status (int): Status code of injected errors, for example 429 to simulate rate limits.
+            prompt_tokens (int): Prompt tokens of a request on an empty conversation.
+            tokens_per_message (int): Prompt tokens added by each message.
+            completion_tokens (int): Completion tokens of every response.
+            seed (int, optional): Seed of the random generator.
+            model (str): The model name.
+        """
+        super().__init__(model)
+        self.plan = plan
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.prompt_tokens = prompt_tokens
+        self.tokens_per_message = tokens_per_message
+        self.completion_tokens = completion_tokens
+        self.__latency = latency_sampler(latency)
+        self.__rng = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__ids = itertools.count()
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        with self.__lock:
+            delay = max(self.__latency(self.__rng), 0.0)
+            failed = self.__rng.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise InjectedError(self.error_status)
+        call = self.plan(messages)
+        prompt_tokens = self.prompt_tokens + self.tokens_per_message * len(messages)
+        return SimpleNamespace(
+            tool_calls=None if call is None else [SimpleNamespace(id=f"call_{next(self.__ids)}", name=call[0], args=call[1])],
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": prompt_tokens + self.completion_tokens,
+            },
+        )
+
+    def get_tools(self, tools, registry):
+        return [tool for tool in tools if tool in registry]
+
+    def get_usage(self, response):
+        return dict(response.usage)
+
+    def get_tool_calls(self, response):
+        return response.tool_calls
+
+    def extract_tool_call_data(self, tool_call):
+        return {"id": tool_call.id, "name": tool_call.name, "args": tool_call.args}
+
+    def build_log(self, response, messages, result, tools, agent=None):
+        call = response.tool_calls[0]
+        return {
+            "message_count": len(messages),
+            "tool_called": {"id": call.id, "name": call.name, "arguments": call.args, "result": result},
+            "usage": dict(response.usage),
+        }
+
+    def _create_tool(self, name=None, description=None, parameters=None, required=None):
+        return {"name": name, "description": description, "parameters": parameters, "required": required}
+
+    def _create_tool_call_message(self, message):
+        return {"role": "assistant", "tool_call": message["content"]}
+
+    def _create_tool_result_message(self, message):
+        return {"role": "tool", "content": message["content"]["result"]}
+
+
+class LoadTestAgent(Agent):
+    """
+    The default agent of a load test: it calls ``work`` a number of times and then ``finish``.
+
+    Attributes:
+        tool_time (float): Seconds each ``work`` call blocks, simulating I/O of a real tool.
+        result_size (int): Characters returned by each ``work`` call.
+    """
+
+    def __init__(self, provider, tool_time: float = 0.0, result_size: int = 256, **kwargs):
+        super().__init__(provider, **kwargs)
+        self.tool_time = tool_time
+        self.result_size = result_size
+
+    def prompt(self):
+        return "Process the request with the work tool, then finish."
+
+    @tool
+    def work(self, payload: str):
+        """
+        Process a payload.
+
+        Args:
+            payload (str): The payload.
+        """
+        if self.tool_time:
+            time.sleep(self.tool_time)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return (digest * (self.result_size // len(digest) + 1))[:self.result_size]
+
+    @tool
+    def finish(self):
+        """Finish the request."""
+        self.stop("done")
+        return "done"
+
+
+def steps_plan(steps: int) -> Callable[[list], tuple]:
+    """
+    Build the plan of LoadTestAgent: ``steps - 1`` calls to ``work`` per run, then ``finish``.
+
+    Args:
+        steps (int): Provider requests per run.
+
+    Returns:
+        callable: The plan for FakeProvider.
+    """
+    def plan(messages):
+        calls = 0
+        for message in reversed(messages):
+            if message.get("role") == "user" and message.get("type") == "default":
+                break
+            if message.get("type") == "tool_call":
+                calls += 1
+        if calls < steps - 1:
+            return "LoadTestAgent_work", {"payload": f"step {calls}"}
+        return "LoadTestAgent_finish", {}
+    return plan
+
+
+class _StepSink(SpanSink):
+    def __init__(self):
+        self.latency = LatencyHistogram(min_value=0.0001)
+        self.cpu = LatencyHistogram(min_value=0.000001)
+        self.requests = LatencyHistogram(min_value=0.0001)
+        self.steps = 0
+        self.errors = 0
+        self.__started = {}
+        self.__lock = threading.Lock()
+
+    def on_start(self, span):
+        if span.name == "tool_runner.execute":
+            self.__started[span.span_id] = time.thread_time()
+
+    def on_end(self, span):
+        if span.name == "provider.request":
+            self.requests.record(span.duration)
+        elif span.name == "tool_runner.execute":
+            cpu = time.thread_time() - self.__started.pop(span.span_id, time.thread_time())
+            self.latency.record(span.duration)
+            self.cpu.record(cpu)
+            with self.__lock:
+                self.steps += 1
+                self.errors += span.status == "error"
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_load_test(sessions: int = 10, runs: int = 3, steps: int = 3, factory: Optional[Callable[[Provider, Tracer], Agent]] = None,
+                  plan: Optional[Callable[[list], Optional[tuple]]] = None, provider_options: Optional[Dict[str, Any]] = None,
+                  tool_time: float = 0.0, result_size: int = 256) -> Dict[str, Any]:
+    """
+    Run concurrent agent sessions against FakeProvider and measure them.
+
+    Each session is an agent on its own thread that handles ``runs`` user
+    messages one after another through ``Agent.run``. A run that raises,
+    for example because of an injected provider error, counts as failed and
+    the session continues with its next message.
+
+    Args:
+        sessions (int): Number of concurrent sessions.
+        runs (int): Runs per session.
+        steps (int): Provider requests per run of the default plan.
+        factory (callable, optional): Builds a session's agent from a provider and a tracer.
+            Defaults to LoadTestAgent.
+        plan (callable, optional): The tool calls of FakeProvider. Defaults to ``steps_plan(steps)``.
+        provider_options (dict, optional): Further FakeProvider options such as ``latency`` or ``error_rate``.
+        tool_time (float): Seconds each ``work`` call of LoadTestAgent blocks.
+        result_size (int): Characters returned by each ``work`` call of LoadTestAgent.
+
+    Returns:
+        dict: The report: configuration, counts, throughput, step and provider latency percentiles,
+            CPU per step, token usage and peak RSS.
+    """
+    sink = _StepSink()
+    tracer = Tracer([sink])
+    factory = factory or (lambda provider, tracer: LoadTestAgent(provider, tool_time=tool_time, result_size=result_size, tracer=tracer))
+    options = dict(provider_options or {})
+    seed = options.pop("seed", None)
+    failures = {}
+    tokens = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    lock = threading.Lock()
+
+    def session(index):
+        provider = FakeProvider(plan or steps_plan(steps), seed=None if seed is None else seed + index, **options)
+        agent = factory(provider, tracer)
+        completed = 0
+        for run in range(runs):
+            try:
+                ret, actions = agent.run(f"request {run} of session {index}")
+            except Exception as e:
+                with lock:
+                    failures[type(e).__name__] = failures.get(type(e).__name__, 0) + 1
+                continue
+            completed += 1
+            with lock:
+                for action in actions:
+                    for key, value in ((action or {}).get("usage") or {}).items():
+                        if key in tokens:
+                            tokens[key] += value
+        return completed
+
+    rss_before = _peak_rss_mb()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="dopus-load") as pool:
+        completed = sum(pool.map(session, range(sessions)))
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "config": {"sessions": sessions, "runs": runs, "steps": steps, "tool_time": tool_time,
+                   "provider": {key: str(value) for key, value in options.items()}},
+        "runs": {"completed": completed, "failed": sum(failures.values()), "failures": failures},
+        "steps": {"total": sink.steps, "failed": sink.errors},
+        "wall_time": wall,
+        "throughput": {"steps_per_second": sink.steps / wall if wall else None, "runs_per_second": completed / wall if wall else None},
+        "step_latency": sink.latency.snapshot(),
+        "provider_latency": sink.requests.snapshot(),
+        "cpu": {
+            "total_seconds": cpu,
+            "per_step_ms": 1000 * cpu / sink.steps if sink.steps else None,
+            "loop_thread_per_step_ms": {key: value * 1000 if isinstance(value, float) else value
+                                        for key, value in sink.cpu.snapshot().items() if key != "count"},
+        },
+        "tokens": tokens,
+        "peak_rss_mb": {"before": rss_before, "after": _peak_rss_mb()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dopus.loadtest", description="Load test agents against a simulated provider.")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--runs", type=int, default=3, help="runs per session")
+    parser.add_argument("--steps", type=int, default=3, help="provider requests per run")
+    parser.add_argument("--latency", default="lognormal:0.5,0.4", help="provider latency: const:S, uniform:LOW,HIGH, exp:MEAN or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a provider request failing")
+    parser.add_argument("--error-status", type=int, default=500, help="status code of injected errors")
+    parser.add_argument("--prompt-tokens", type=int, default=200, help="prompt tokens of the first request")
+    parser.add_argument("--tokens-per-message", type=int, default=50, help="prompt tokens added per message")
+    parser.add_argument("--completion-tokens", type=int, default=30, help="completion tokens per response")
+    parser.add_argument("--tool-time", type=float, default=0.0, help="seconds each tool call blocks")
+    parser.add_argument("--result-size", type=int, default=256, help="characters returned by each tool call")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        sessions=args.sessions,
+        runs=args.runs,
+        steps=args.steps,
+        tool_time=args.tool_time,
+        result_size=args.result_size,
+        provider_options={
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "error_status": args.error_status,
+            "prompt_tokens": args.prompt_tokens,
+            "tokens_per_message": args.tokens_per_message,
+            "completion_tokens": args.completion_tokens,
+            "seed": args.seed,
+        },
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
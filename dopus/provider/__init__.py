@@ -26,3 +26,10 @@ class LazyLoader:
 
 OpenAI = LazyLoader('dopus.provider.open_ai', 'OpenAI')
 Anthropic = LazyLoader('dopus.provider.anthropic', 'Anthropic')
+HedgedProvider = LazyLoader('dopus.provider.hedged', 'HedgedProvider')
+RouterProvider = LazyLoader('dopus.provider.router', 'RouterProvider')
+Backend = LazyLoader('dopus.provider.router', 'Backend')
+CascadeProvider = LazyLoader('dopus.provider.cascade', 'CascadeProvider')
+LocalOpenAICompatible = LazyLoader('dopus.provider.local_openai', 'LocalOpenAICompatible')
+Groq = LazyLoader('dopus.provider.groq', 'Groq')
+OpenAIResponses = LazyLoader('dopus.provider.responses', 'OpenAIResponses')
@@ -1,5 +1,7 @@
 from anthropic import Anthropic as Anth
+import json
 from ..core.provider import Provider
+from ..core import tracing
 
 class Anthropic(Provider):
     def __init__(self, api_key, model="claude-3-5-sonnet-20240620"):
@@ -16,23 +18,40 @@ class Anthropic(Provider):
     def on_stop(self, convo, result=None):
         convo.append("assistant", "Waiting for user input...")
 
+    def get_usage(self, response):
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return {}
+        cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+        cache_creation = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        # Anthropic reports cached input separately; prompt_tokens counts all input as OpenAI does.
+        prompt_tokens = usage.input_tokens + cache_read + cache_creation
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': usage.output_tokens,
+            'cached_tokens': cache_read,
+            'total_tokens': prompt_tokens + usage.output_tokens
+        }
+
     def get_tool_calls(self, response):
-        return response.content
+        return [block for block in response.content if block.type == "tool_use"]
 
     def request(self, messages, registry, tools, system_prompt):
         formatted_messages = self.format_messages(messages)
-        if tools is not None:
-            tools = self.get_tools(tools, registry)
-            return self.client.messages.create(
-                messages=formatted_messages,
-                model=self.model,
-                system=system_prompt,
-                tool_choice={"type": "any"} if tools else None,
-                max_tokens=500,
-                tools=tools
-            )
+        options = {}
+        if tools:
+            with tracing.span("provider.get_tools", tools=len(tools)):
+                options["tools"] = self.get_tools(tools, registry)
+            options["tool_choice"] = {"type": "any"}
+        return self.client.messages.create(
+            messages=formatted_messages,
+            model=self.model,
+            system=system_prompt,
+            max_tokens=500,
+            **options
+        )
 
-    def create_tool_call_message(self, message):
+    def _create_tool_call_message(self, message):
         return {
             "role": "assistant",
             "content": [
@@ -45,39 +64,57 @@ class Anthropic(Provider):
             ]
         }
 
-    def create_tool_result_message(self, message):
+    def _create_tool_result_message(self, message):
         return {
             "role": "user",
             "content": [
                 {
                     "type": "tool_result",
                     "tool_use_id": message['content']['id'],
-                    "content": message['content']['result']
+                    "content": _to_text(message['content']['result'])
                 }
             ]
         }
 
     def get_tools(self, tools, registry):
         return [
-            self.create_tool(
+            self._create_tool(
                 name=tool,
                 description=registry[tool]["description"],
-                input_schema={
-                    "type": "object",
-                    "properties": registry[tool]["properties"],
-                    "required": registry[tool]["required"]
-                }
+                parameters=registry[tool]["properties"],
+                required=registry[tool]["required"]
             )
             for tool in tools if tool in registry
         ]
 
-    def create_tool(self, name=None, description=None, input_schema=None):
+    def _create_tool(self, name=None, description=None, parameters=None, required=None):
         return {
             "name": name or "default_name",
             "description": description or "default_description",
-            "input_schema": input_schema or {
+            "input_schema": {
                 "type": "object",
-                "properties": {},
-                "required": []
+                "properties": parameters or {},
+                "required": required or []
             }
-        }
\ No newline at end of file
+        }
+
+    def build_log(self, resp, messages, result, tools, agent=None):
+        tool_use = self.get_tool_calls(resp)[0]
+        return {
+            'id': resp.id,
+            'message_count': len(messages),
+            'model': resp.model,
+            'available_tools': sorted(tools),
+            'tool_called': {
+                'id': tool_use.id,
+                'name': tool_use.name,
+                'arguments': tool_use.input,
+                'result': result
+            },
+            'usage': self.get_usage(resp),
+            'stop_reason': resp.stop_reason
+        }
+
+
+def _to_text(result):
+    return result if isinstance(result, str) else json.dumps(result, default=str)
\ No newline at end of file
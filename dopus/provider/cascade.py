@@ -0,0 +1,120 @@
+import threading
+from .delegating import DelegatingProvider
+from ..core.validation import validate_arguments
+from .. import logger
+
+
+def valid_tool_name(tool_data, registry, tools, messages):
+    """
+    Reject tool calls to tools that are not available.
+    """
+    if tool_data['name'] not in registry or (tools is not None and tool_data['name'] not in tools):
+        return f"unknown tool {tool_data['name']}"
+    return None
+
+
+def valid_arguments(tool_data, registry, tools, messages):
+    """
+    Reject tool calls whose arguments do not match the tool's schema.
+    """
+    errors = validate_arguments(registry[tool_data['name']], tool_data['args'])
+    if errors:
+        return "; ".join(errors)
+    return None
+
+
+def no_repeated_call(tool_data, registry, tools, messages):
+    """
+    Reject a tool call identical to the previous one, a sign the model is stuck in a loop.
+    """
+    for message in reversed(messages):
+        if message.get('type') == "tool_call":
+            previous = message['content']
+            if previous['name'] == tool_data['name'] and previous['args'] == tool_data['args']:
+                return f"repeated call to {tool_data['name']}"
+            return None
+    return None
+
+
+DEFAULT_VALIDATORS = [valid_tool_name, valid_arguments, no_repeated_call]
+
+
+class CascadeProvider(DelegatingProvider):
+    """
+    A provider that tries a fast model first and escalates to a stronger one.
+
+    Every request goes to the fast provider. Each of its tool calls is checked
+    by the validators; if any rejects one, or the fast model made no tool call,
+    the request is repeated with the strong provider. A validator is a callable
+    ``(tool_data, registry, tools, messages)`` returning None to accept the call
+    or a reason string to reject it. The rejected fast attempt counts towards
+    the step's usage. Accepted tool calls are parsed only once, by the check.
+
+    Attributes:
+        validators (list): The validators applied to the fast model's tool calls.
+    """
+
+    def __init__(self, fast, strong, validators=None):
+        """
+        Initialize the CascadeProvider.
+
+        Args:
+            fast (Provider): The cheap provider tried first.
+            strong (Provider): The provider used when the fast result is rejected.
+            validators (list, optional): Validators of the fast result. Defaults to checking the
+                tool name, the arguments against the schema and for repeated calls.
+        """
+        super().__init__(fast)
+        self.__fast = fast
+        self.__strong = strong
+        self.validators = list(DEFAULT_VALIDATORS if validators is None else validators)
+        self.__attempts = {}
+        self.__escalations = {}
+        self.__lock = threading.Lock()
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        response = self.__fast.request(messages, registry, tools, system_prompt)
+        calls, proposed, reason = self.__check(response, messages, registry, tools)
+        with self.__lock:
+            for tool in proposed:
+                self.__attempts[tool] = self.__attempts.get(tool, 0) + 1
+                if reason is not None:
+                    self.__escalations[tool] = self.__escalations.get(tool, 0) + 1
+        if reason is None:
+            return self._route(response, self.__fast, tool_data=calls)
+        logger.info(f"Escalating to {self.__strong.model}: {reason}")
+        strong = self.__strong.request(messages, registry, tools, system_prompt)
+        return self._route(strong, self.__strong, [(response, self.__fast)])
+
+    def stats(self):
+        """
+        Get the escalation rate per tool proposed by the fast model.
+
+        Returns:
+            dict: Attempts, escalations and escalation rate keyed by tool name. A step
+                counts once for every tool it called. Steps without a usable tool call are keyed by None.
+        """
+        with self.__lock:
+            return {
+                tool: {
+                    "attempts": attempts,
+                    "escalations": self.__escalations.get(tool, 0),
+                    "rate": self.__escalations.get(tool, 0) / attempts,
+                }
+                for tool, attempts in self.__attempts.items()
+            }
+
+    def __check(self, response, messages, registry, tools):
+        tool_calls = self.__fast.get_tool_calls(response)
+        if not tool_calls:
+            return None, [None], "no tool call"
+        calls = [self.__fast.extract_tool_call_data(tool_call) for tool_call in tool_calls]
+        proposed = list(dict.fromkeys(tool_data['name'] for tool_data in calls if tool_data is not None)) or [None]
+        for tool_data in calls:
+            if tool_data is None:
+                return calls, proposed, "malformed tool call"
+            for validator in self.validators:
+                reason = validator(tool_data, registry, tools, messages)
+                if reason is not None:
+                    return calls, proposed, reason
+        return calls, proposed, None
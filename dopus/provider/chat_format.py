@@ -0,0 +1,66 @@
+import json
+from typing import Any, Dict
+from ..core.json_repair import repair_json
+
+
+class ChatCompletionsFormat:
+    """
+    Mixin formatting Convo messages for the OpenAI chat completions API.
+
+    Shared by the providers speaking that format, whether through the
+    ``openai`` client or plain HTTP. List it before Provider in the bases.
+    """
+
+    def get_tools(self, tools, registry):
+        return [
+            self._create_tool(
+                name=tool,
+                description=registry[tool]["description"],
+                parameters=registry[tool]["properties"],
+                required=registry[tool]["required"]
+            )
+            for tool in tools if tool in registry
+        ]
+
+    def _create_tool_call_message(self, message):
+        return {
+            "role": "assistant",
+            "timestamp": message['timestamp'],
+            "type": "tool",
+            "tool_calls": [
+                {
+                    "id": message['content']['id'],
+                    "type": "function",
+                    "function": {
+                        "name": message['content']['name'],
+                        "arguments": json.dumps(message['content']['args'], default=str)
+                    }
+                }
+            ]
+        }
+
+    def _create_tool_result_message(self, message):
+        result = message['content']['result']
+        return {
+            "role": "tool",
+            "timestamp": message['timestamp'],
+            "type": "tool_output",
+            "content": result if isinstance(result, str) else json.dumps(result, default=str),
+            "tool_call_id": message['content']['id']
+        }
+
+
+def log_arguments(arguments: str) -> Any:
+    """
+    Decode tool call arguments for the action log.
+
+    Args:
+        arguments (str): The arguments as sent by the model.
+
+    Returns:
+        any: The repaired JSON value, or the raw string if it cannot be repaired.
+    """
+    try:
+        return repair_json(arguments)[0]
+    except ValueError:
+        return arguments
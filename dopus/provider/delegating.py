@@ -0,0 +1,94 @@
+from ..core.budget import add_usage
+from ..core.provider import Provider
+
+
+class Routed:
+    """
+    A response or tool call tagged with the provider that produced it.
+    Attribute access is forwarded to the wrapped object.
+
+    ``attempts`` holds the ``(response, provider)`` pairs of discarded requests
+    made for the same step, whose tokens were billed nonetheless. ``tool_data``
+    holds tool call data already extracted by the delegating provider: a list
+    aligned with the tool calls on a response, the data itself on a tool call.
+    """
+
+    __slots__ = ("value", "provider", "attempts", "tool_data")
+
+    def __init__(self, value, provider, attempts=(), tool_data=None):
+        self.value = value
+        self.provider = provider
+        self.attempts = list(attempts)
+        self.tool_data = tool_data
+
+    def __getattr__(self, name):
+        return getattr(self.value, name)
+
+    def __repr__(self):
+        return f"Routed({self.value!r})"
+
+
+class DelegatingProvider(Provider):
+    """
+    Base class of providers that forward each request to one of several backends.
+
+    Subclasses implement ``request`` and return ``self._route(response, backend)``.
+    Responses and tool calls are tagged with their backend, so parsing always
+    goes through the provider that produced them. Tool call data the subclass
+    already extracted can be attached with ``_route(..., tool_data=...)`` and
+    is not parsed again. Usage is the sum over the
+    served response and every discarded attempt, each priced with its own model.
+    """
+
+    def __init__(self, default):
+        super().__init__(default.model)
+        self._default = default
+
+    def _route(self, response, provider, attempts=(), tool_data=None):
+        return Routed(response, provider, attempts, tool_data)
+
+    def get_tool_calls(self, response):
+        tool_calls = response.provider.get_tool_calls(response.value)
+        if tool_calls is None:
+            return None
+        parsed = response.tool_data or [None] * len(tool_calls)
+        return [Routed(tool_call, response.provider, tool_data=data) for tool_call, data in zip(tool_calls, parsed)]
+
+    def extract_tool_call_data(self, tool_call):
+        if tool_call.tool_data is not None:
+            return tool_call.tool_data
+        return tool_call.provider.extract_tool_call_data(tool_call.value)
+
+    def get_usage(self, response):
+        usage = {}
+        for _, counts in self.get_charges(response):
+            add_usage(usage, counts)
+        return usage
+
+    def get_model(self, response):
+        return response.provider.get_model(response.value)
+
+    def get_charges(self, response):
+        charges = []
+        for value, provider in response.attempts:
+            charges.extend(provider.get_charges(value))
+        charges.extend(response.provider.get_charges(response.value))
+        return charges
+
+    def build_log(self, response, messages, result, tools, agent=None):
+        return response.provider.build_log(response.value, messages, result, tools, agent)
+
+    def get_tools(self, tools, registry):
+        return self._default.get_tools(tools, registry)
+
+    def on_stop(self, convo, result=None):
+        self._default.on_stop(convo, result)
+
+    def _create_tool(self, name=None, description=None, parameters=None, required=None):
+        return self._default._create_tool(name, description, parameters, required)
+
+    def _create_tool_call_message(self, message):
+        return self._default._create_tool_call_message(message)
+
+    def _create_tool_result_message(self, message):
+        return self._default._create_tool_result_message(message)
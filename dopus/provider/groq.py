@@ -1,21 +1,36 @@
-# def request(client, model, messages, tools=None, system_prompt=""):
-#     messages = [{"role": "system", "content": system_prompt}] + messages
-#     if tools is not None:
-#         response = client.chat.completions.create(
-#             messages=messages,
-#             model=model,
-#             tool_choice="required",
-#             parallel_tool_calls=False,
-#             n=1,
-#             tools=tools
-#         )
-#     else:
-#         response = client.chat.completions.create(
-#             messages=messages,
-#             model=model,
-#             n=1,
-#         )
-#     return response
+import os
+from typing import Optional
+from .local_openai import LocalOpenAICompatible
 
-# def get_tool_calls(response):
-#     return response.tool_calls
\ No newline at end of file
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+class Groq(LocalOpenAICompatible):
+    """
+    A provider for Groq's low-latency inference API.
+
+    Meant for high-volume, low-complexity agent steps, for example as the fast
+    model of a CascadeProvider. Completions are streamed by default and all
+    Groq providers of a thread share one keep-alive connection, so steps skip
+    the TCP and TLS handshakes.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "llama-3.1-8b-instant", base_url: str = GROQ_BASE_URL, stream: bool = True, **kwargs):
+        """
+        Initialize the Groq provider.
+
+        Args:
+            api_key (str, optional): The Groq API key. Defaults to the ``GROQ_API_KEY`` environment variable.
+            model (str): The model to use.
+            base_url (str): The API root.
+            stream (bool): Stream completions.
+            **kwargs: Further options of LocalOpenAICompatible, such as ``on_chunk`` or ``timeout``.
+        """
+        api_key = api_key or os.environ.get("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("Groq needs an api_key or the GROQ_API_KEY environment variable")
+        super().__init__(model, base_url=base_url, api_key=api_key, stream=stream, **kwargs)
+
+    def _chunk_usage(self, chunk):
+        # Groq reports the usage of a stream in its own extension field.
+        return chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
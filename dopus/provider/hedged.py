@@ -0,0 +1,137 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .delegating import DelegatingProvider
+from ..core.budget import add_usage
+from ..core.metrics import LatencyHistogram
+from .. import logger
+
+
+class HedgedProvider(DelegatingProvider):
+    """
+    A provider that hedges slow requests to cut tail latency.
+
+    Each request goes to the primary provider. If no response has arrived after
+    the hedge delay, a duplicate request is sent to the hedge provider (the
+    primary itself by default) and the first successful response wins. The
+    losing request is cancelled if it has not started, otherwise its response
+    is discarded. Its usage is reported with the winning response when it has
+    already arrived. Otherwise it arrives after the step was charged and is only
+    added to ``late_usage``. The delay is the configured percentile of recent primary
+    latencies, so roughly ``100 - percentile`` percent of requests are hedged.
+
+    Attributes:
+        latencies (LatencyHistogram): Recent latencies of the primary provider.
+        requests (int): Number of requests made.
+        hedged (int): Number of requests for which a hedge was sent.
+        hedge_wins (int): Number of hedges that answered first.
+        late_usage (dict): Token usage of losing requests that finished after the winner
+            was returned, and so was charged to no run.
+        late_responses (int): Number of such requests.
+    """
+
+    def __init__(self, primary, hedge=None, percentile=95, initial_delay=2.0, min_delay=0.05, max_delay=30.0, min_samples=20, window=500, max_workers=16):
+        """
+        Initialize the HedgedProvider.
+
+        Args:
+            primary (Provider): The provider requests are sent to first.
+            hedge (Provider, optional): The provider duplicate requests are sent to. Defaults to the primary.
+            percentile (float): Percentile of primary latency after which a hedge is sent.
+            initial_delay (float): Hedge delay in seconds until ``min_samples`` latencies are known.
+            min_delay (float): Lower bound of the hedge delay in seconds.
+            max_delay (float): Upper bound of the hedge delay in seconds.
+            min_samples (int): Number of samples needed before the delay adapts.
+            window (int): Number of samples after which older latencies lose half their weight.
+            max_workers (int): Maximum number of requests in flight.
+        """
+        super().__init__(primary)
+        self.__primary = primary
+        self.__hedge = hedge or primary
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.latencies = LatencyHistogram(window=window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.late_usage = {}
+        self.late_responses = 0
+        self.__lock = threading.Lock()
+        self.__pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dopus-hedge")
+
+    def hedge_delay(self):
+        """
+        Get the current hedge delay.
+
+        Returns:
+            float: Seconds to wait for the primary before sending a hedge.
+        """
+        if self.latencies.count < self.min_samples:
+            return self.initial_delay
+        delay = self.latencies.percentile(self.percentile)
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        with self.__lock:
+            self.requests += 1
+        start = time.perf_counter()
+        primary = self.__submit(self.__primary, messages, registry, tools, system_prompt)
+        primary.add_done_callback(lambda f: self.__record(f, start))
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        pending = {primary: self.__primary}
+        if not done:
+            hedge = self.__submit(self.__hedge, messages, registry, tools, system_prompt)
+            pending[hedge] = self.__hedge
+            with self.__lock:
+                self.hedged += 1
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                attempts = []
+                for loser, loser_provider in pending.items():
+                    if loser.cancel():
+                        continue
+                    if not loser.done():
+                        loser.add_done_callback(lambda f, p=loser_provider: self.__finished_late(f, p))
+                    elif loser.exception() is None:
+                        attempts.append((loser.result(), loser_provider))
+                if future is not primary:
+                    with self.__lock:
+                        self.hedge_wins += 1
+                return self._route(future.result(), provider, attempts)
+        raise error
+
+    def __submit(self, provider, messages, registry, tools, system_prompt):
+        context = contextvars.copy_context()
+        return self.__pool.submit(context.run, provider.request, messages, registry, tools, system_prompt)
+
+    def close(self):
+        """
+        Stop the thread pool, cancelling requests that have not started.
+        """
+        self.__pool.shutdown(wait=False, cancel_futures=True)
+
+    def __finished_late(self, future, provider):
+        if future.cancelled() or future.exception() is not None:
+            return
+        usage = provider.get_usage(future.result())
+        with self.__lock:
+            self.late_responses += 1
+            add_usage(self.late_usage, usage)
+
+    def __record(self, future, start):
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            self.latencies.record(time.perf_counter() - start)
+        else:
+            logger.debug("Primary request failed: %s", future.exception())
@@ -0,0 +1,303 @@
+import http.client
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+from ..core.provider import Provider
+from ..core import tracing
+from ..core.json_repair import parse_arguments
+from .chat_format import ChatCompletionsFormat, log_arguments
+from .. import logger
+
+# Keep-alive connections of the calling thread, shared by every provider talking to the same server.
+_connections = threading.local()
+
+
+class ProviderHTTPError(Exception):
+    """
+    An error response from an HTTP inference server.
+
+    Attributes:
+        status_code (int): The HTTP status code.
+        body (str): The response body.
+    """
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"HTTP {status_code}: {body[:500]}")
+        self.status_code = status_code
+        self.body = body
+
+
+class LocalOpenAICompatible(ChatCompletionsFormat, Provider):
+    """
+    A provider for servers speaking the OpenAI chat completions API, such as
+    llama.cpp, vLLM or Ollama.
+
+    Requests go over plain HTTP keep-alive connections, one per thread and
+    server and shared by all providers talking to that server, so consecutive
+    steps of an agent reuse the same connection. Responses are handled as
+    plain dicts.
+
+    Attributes:
+        base_url (str): The API root, for example ``http://localhost:8000/v1``.
+        stream (bool): Whether completions are streamed.
+        on_chunk (callable): Called with every streamed delta.
+    """
+
+    def __init__(self, model: str, base_url: str = "http://localhost:8000/v1", api_key: Optional[str] = None, timeout: float = 120.0,
+                 stream: bool = False, on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None, strict: bool = False,
+                 grammar: Optional[str] = None, json_schema: Optional[Dict[str, Any]] = None, tool_choice: str = "required",
+                 parallel_tool_calls: bool = False, extra_body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None):
+        """
+        Initialize the LocalOpenAICompatible provider.
+
+        Args:
+            model (str): The model name the server expects.
+            base_url (str): The API root, including the version path.
+            api_key (str, optional): Sent as a bearer token if given.
+            timeout (float): Socket timeout in seconds.
+            stream (bool): Stream completions and assemble them as they arrive.
+            on_chunk (callable, optional): Called with every streamed delta, for example to forward tokens.
+            strict (bool): Mark function schemas as strict, for servers that constrain tool arguments to the schema.
+            grammar (str, optional): A GBNF grammar constraining the output (llama.cpp).
+            json_schema (dict, optional): A JSON schema constraining plain completions through ``response_format``.
+            tool_choice (str): The tool choice sent with tool requests.
+            parallel_tool_calls (bool): Allow several tool calls in one turn.
+            extra_body (dict, optional): Further server-specific fields merged into every request,
+                for example ``{"guided_decoding_backend": "xgrammar"}`` for vLLM.
+            headers (dict, optional): Further HTTP headers.
+        """
+        super().__init__(model)
+        url = urlsplit(base_url.rstrip("/"))
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported base_url: {base_url}")
+        self.base_url = base_url.rstrip("/")
+        self.stream = stream
+        self.on_chunk = on_chunk
+        self.strict = strict
+        self.grammar = grammar
+        self.json_schema = json_schema
+        self.tool_choice = tool_choice
+        self.parallel_tool_calls = parallel_tool_calls
+        self.extra_body = dict(extra_body or {})
+        self.__connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.__key = (url.scheme, url.hostname, url.port, timeout)
+        self.__path = url.path
+        self.__headers = {"Content-Type": "application/json", "Connection": "keep-alive", **(headers or {})}
+        if api_key:
+            self.__headers["Authorization"] = f"Bearer {api_key}"
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        formatted_messages = self.format_messages(messages)
+        formatted_messages.insert(0, {"role": "system", "content": system_prompt})
+        body = {"model": self._model, "messages": formatted_messages, "n": 1}
+        if tools is not None:
+            with tracing.span("provider.get_tools", tools=len(tools)):
+                body["tools"] = self.get_tools(tools, registry)
+            body["tool_choice"] = self.tool_choice
+            body["parallel_tool_calls"] = self.parallel_tool_calls
+        elif self.json_schema is not None:
+            body["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": self.json_schema, "strict": True},
+            }
+        if self.grammar is not None:
+            body["grammar"] = self.grammar
+        body.update(self.extra_body)
+        if self.stream:
+            body["stream"] = True
+            body["stream_options"] = {"include_usage": True}
+        return self._post("/chat/completions", body, stream=self.stream)
+
+    def get_embedding(self, text, model=None):
+        response = self._post("/embeddings", {"input": text, "model": model or self._model})
+        return response["data"][0]["embedding"]
+
+    def get_tool_calls(self, response):
+        return response["choices"][0]["message"].get("tool_calls") or None
+
+    def extract_tool_call_data(self, tool_call):
+        function = tool_call["function"]
+        try:
+            tool_args, repairs = parse_arguments(function.get("arguments"))
+        except ValueError as e:
+            logger.error(f"Failed to parse tool arguments: {function.get('arguments')}")
+            return {
+                'id': tool_call["id"],
+                'args': {},
+                'name': function["name"],
+                'parse_error': str(e)
+            }
+        data = {
+            'id': tool_call["id"],
+            'args': tool_args,
+            'name': function["name"]
+        }
+        if repairs:
+            data['repairs'] = repairs
+        return data
+
+    def get_usage(self, response):
+        usage = response.get("usage") or {}
+        counts = {key: usage[key] for key in ("prompt_tokens", "completion_tokens", "total_tokens") if key in usage}
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+        if cached is not None:
+            counts["cached_tokens"] = cached
+        return counts
+
+    def build_log(self, resp, messages, result, tools, agent=None):
+        message = resp["choices"][0]["message"]
+        tool_call = message["tool_calls"][0]
+        return {
+            'id': resp.get("id"),
+            'message_count': len(messages),
+            'created': resp.get("created"),
+            'model': resp.get("model", self._model),
+            'available_tools': sorted(tools),
+            'tool_called': {
+                'id': tool_call["id"],
+                'name': tool_call["function"]["name"],
+                'arguments': log_arguments(tool_call["function"].get("arguments")),
+                'result': result
+            },
+            'usage': self.get_usage(resp),
+        }
+
+    def _create_tool(self, name=None, description=None, parameters=None, required=None):
+        tool = {
+            "type": "function",
+            "function": {
+                "name": name or "default_name",
+                "description": description or "default_description",
+                "parameters": {
+                    "type": "object",
+                    "properties": parameters or {},
+                    "additionalProperties": False,
+                    "required": required or []
+                }
+            }
+        }
+        if self.strict:
+            tool["function"]["strict"] = True
+        return tool
+
+    def close(self):
+        """
+        Close the calling thread's connection.
+        """
+        connection = self.__pool().pop(self.__key, None)
+        if connection is not None:
+            connection.close()
+
+    def _post(self, path, body, stream=False):
+        """
+        Send a JSON request over the calling thread's keep-alive connection.
+
+        A request on a connection the server already closed is retried once on a new connection.
+
+        Args:
+            path (str): The endpoint below ``base_url``.
+            body (dict): The request body.
+            stream (bool): Read the response as a stream of server-sent events.
+
+        Returns:
+            dict: The decoded response, assembled from its chunks when streaming.
+
+        Raises:
+            ProviderHTTPError: If the server answers with an error status.
+        """
+        payload = json.dumps(body).encode("utf-8")
+        for attempt in range(2):
+            connection = self.__connection()
+            try:
+                connection.request("POST", self.__path + path, body=payload, headers=self.__headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, http.client.CannotSendRequest):
+                self.close()
+                if attempt:
+                    raise
+                continue
+            try:
+                if response.status >= 400:
+                    raise ProviderHTTPError(response.status, response.read().decode("utf-8", "replace"))
+                if stream:
+                    return self.__read_stream(response)
+                return json.loads(response.read())
+            except BaseException:
+                self.close()
+                raise
+            finally:
+                if response.will_close:
+                    self.close()
+
+    def __connection(self):
+        pool = self.__pool()
+        connection = pool.get(self.__key)
+        if connection is None:
+            scheme, host, port, timeout = self.__key
+            connection = self.__connection_class(host, port, timeout=timeout)
+            pool[self.__key] = connection
+        return connection
+
+    @staticmethod
+    def __pool():
+        pool = getattr(_connections, "pool", None)
+        if pool is None:
+            pool = _connections.pool = {}
+        return pool
+
+    def __read_stream(self, response):
+        assembled = {"choices": [{"index": 0, "message": {"role": "assistant", "content": None}, "finish_reason": None}]}
+        message = assembled["choices"][0]["message"]
+        content = []
+        tool_calls = {}
+        for line in response:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            chunk = json.loads(data)
+            for key in ("id", "created", "model"):
+                if key in chunk:
+                    assembled.setdefault(key, chunk[key])
+            usage = self._chunk_usage(chunk)
+            if usage:
+                assembled["usage"] = usage
+            for choice in chunk.get("choices") or []:
+                delta = choice.get("delta") or {}
+                if self.on_chunk is not None:
+                    self.on_chunk(delta)
+                if delta.get("content"):
+                    content.append(delta["content"])
+                for call in delta.get("tool_calls") or []:
+                    entry = tool_calls.setdefault(call.get("index", len(tool_calls)), {
+                        "id": None, "type": "function", "function": {"name": "", "arguments": ""},
+                    })
+                    if call.get("id"):
+                        entry["id"] = call["id"]
+                    function = call.get("function") or {}
+                    entry["function"]["name"] += function.get("name") or ""
+                    entry["function"]["arguments"] += function.get("arguments") or ""
+                if choice.get("finish_reason"):
+                    assembled["choices"][0]["finish_reason"] = choice["finish_reason"]
+        # Drain what follows the end marker so the connection can be reused.
+        response.read()
+        if content:
+            message["content"] = "".join(content)
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+        return assembled
+
+    def _chunk_usage(self, chunk):
+        """
+        Get the token usage reported in a streamed chunk.
+
+        Args:
+            chunk (dict): A decoded chunk.
+
+        Returns:
+            dict: The usage, or None if the chunk carries none.
+        """
+        return chunk.get("usage")
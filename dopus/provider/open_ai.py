@@ -1,11 +1,14 @@
 from openai import OpenAI as OAI
-import json
 from ..core.provider import Provider
+from ..core import tracing
+from ..core.json_repair import parse_arguments
+from .chat_format import ChatCompletionsFormat, log_arguments
 from .. import logger
 
-class OpenAI(Provider):
-    def __init__(self, api_key, model="gpt-4o"):
+class OpenAI(ChatCompletionsFormat, Provider):
+    def __init__(self, api_key, model="gpt-4o", parallel_tool_calls=False):
         self.client = OAI(api_key=api_key)
+        self.parallel_tool_calls = parallel_tool_calls
         super().__init__(model)
 
     def on_stop(self, convo, result=None):
@@ -21,16 +24,37 @@ class OpenAI(Provider):
     def extract_tool_call_data(self, tool_call):
         tool_name = tool_call.function.name
         try:
-            tool_args = json.loads(tool_call.function.arguments)
-        except Exception as e:
+            tool_args, repairs = parse_arguments(tool_call.function.arguments)
+        except ValueError as e:
             logger.error(f"Failed to parse tool arguments: {tool_call.function.arguments}")
-            return None
-        return {
+            return {
+                'id': tool_call.id,
+                'args': {},
+                'name': tool_name,
+                'parse_error': str(e)
+            }
+        data = {
             'id': tool_call.id,
             'args': tool_args,
             'name': tool_name
         }
+        if repairs:
+            logger.warning(f"Repaired arguments of {tool_name}: {', '.join(repairs)}")
+            data['repairs'] = repairs
+        return data
     
+    def get_usage(self, response):
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return {}
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return {
+            'prompt_tokens': usage.prompt_tokens,
+            'completion_tokens': usage.completion_tokens,
+            'cached_tokens': getattr(details, 'cached_tokens', None) or 0,
+            'total_tokens': usage.total_tokens
+        }
+
     def get_tool_calls(self, response):
         return response.choices[0].message.tool_calls
 
@@ -50,42 +74,17 @@ class OpenAI(Provider):
             }
         }
 
-    def _create_tool_call_message(self, message):
-        return {
-            "role": "assistant",
-            "timestamp": message['timestamp'],
-            "type": "tool",
-            "tool_calls": [
-                {
-                    "id": message['content']['id'],
-                    "type": "function",
-                    "function": {
-                        "name": message['content']['name'],
-                        "arguments": str(message['content']['args'])
-                    }
-                }
-            ]
-        }
-
-    def _create_tool_result_message(self, message):
-        return {
-            "role": "tool",
-            "timestamp": message['timestamp'],
-            "type": "tool_output",
-            "content": message['content']['result'],
-            "tool_call_id": message['content']['id']
-        }
-
     def request(self, messages, registry, tools=None, system_prompt=""):
         formatted_messages = self.format_messages(messages)
         formatted_messages.insert(0, {"role": "system", "content": system_prompt})
         if tools is not None:
-            tools = self.get_tools(tools, registry)
+            with tracing.span("provider.get_tools", tools=len(tools)):
+                tools = self.get_tools(tools, registry)
             response = self.client.chat.completions.create(
                 messages=formatted_messages,
                 model=self._model,
                 tool_choice="required",
-                parallel_tool_calls=False,
+                parallel_tool_calls=self.parallel_tool_calls,
                 n=1,
                 tools=tools
             )
@@ -97,36 +96,20 @@ class OpenAI(Provider):
             )
         return response
 
-    def get_tools(self, tools, registry):
-        return [
-            self._create_tool(
-                name=tool,
-                description=registry[tool]["description"],
-                parameters=registry[tool]["properties"],
-                required=registry[tool]["required"]
-            )
-            for tool in tools if tool in registry
-        ]
-
     def build_log(self, resp, messages, result, tools, agent=None):
         message = resp.choices[0].message
         return {
             'id': resp.id,
-            'messages': messages,
+            'message_count': len(messages),
             'created': resp.created,
             'model': resp.model,
-            'messages': messages,
-            'available_tools': tools,
+            'available_tools': sorted(tools),
             'tool_called': {
                 'id': message.tool_calls[0].id,
                 'name': message.tool_calls[0].function.name,
-                'arguments': json.loads(message.tool_calls[0].function.arguments or {}),
+                'arguments': log_arguments(message.tool_calls[0].function.arguments),
                 'result': result
             },
-            'usage': {
-                'completion_tokens': resp.usage.completion_tokens,
-                'prompt_tokens': resp.usage.prompt_tokens,
-                'total_tokens': resp.usage.total_tokens
-            },
+            'usage': self.get_usage(resp),
             'system_fingerprint': resp.system_fingerprint
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,212 @@
+import collections
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+from ..core import tracing
+from .local_openai import LocalOpenAICompatible, ProviderHTTPError
+from .. import logger
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+class OpenAIResponses(LocalOpenAICompatible):
+    """
+    A provider for the OpenAI Responses API, and proxies speaking it, that
+    keeps the conversation on the server.
+
+    In stateful mode every response is stored server-side and the next request
+    chains to it with ``previous_response_id``, sending only the messages
+    appended since then instead of the whole history. The provider keeps one
+    chain per conversation, keyed by a digest of the conversation's first
+    item, so several agents can share it, also across threads. For each chain
+    it remembers a digest of the history the server holds; when the history no
+    longer starts with it (for example after the conversation was trimmed),
+    when the instructions or tools change, or when the server no longer knows
+    the previous response, the full history is sent again and the chain starts
+    over.
+
+    Attributes:
+        stateful (bool): Whether requests chain to the previous response.
+        max_conversations (int): Number of chains kept; the least recently used is forgotten first.
+        session_stats (dict): Counts of ``requests``, ``full`` and ``incremental`` requests,
+            ``items_sent`` and ``fallbacks`` after the server rejected a chained request.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini", base_url: str = OPENAI_BASE_URL, api_key: Optional[str] = None, stateful: bool = True,
+                 max_conversations: int = 128, **kwargs):
+        """
+        Initialize the OpenAIResponses provider.
+
+        Args:
+            model (str): The model to use.
+            base_url (str): The API root, including the version path.
+            api_key (str, optional): The API key. Defaults to the ``OPENAI_API_KEY`` environment variable.
+            stateful (bool): Store responses on the server and send only new messages.
+            max_conversations (int): Number of conversation chains kept.
+            **kwargs: Further options of LocalOpenAICompatible, such as ``timeout`` or ``extra_body``.
+        """
+        if kwargs.get("stream"):
+            raise ValueError("OpenAIResponses does not support streaming")
+        super().__init__(model, base_url=base_url, api_key=api_key or os.environ.get("OPENAI_API_KEY"), **kwargs)
+        self.stateful = stateful
+        self.max_conversations = max_conversations
+        self.session_stats = {"requests": 0, "full": 0, "incremental": 0, "items_sent": 0, "fallbacks": 0}
+        self.__states = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def reset_session(self):
+        """
+        Forget the server-side conversations, so the next request of each sends its full history.
+        """
+        with self.__lock:
+            self.__states.clear()
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        items = self.format_messages(messages)
+        context = (system_prompt, tuple(sorted(tools)) if tools is not None else None)
+        body = {"model": self._model, "instructions": system_prompt, "store": self.stateful}
+        if tools is not None:
+            with tracing.span("provider.get_tools", tools=len(tools)):
+                body["tools"] = self.get_tools(tools, registry)
+            body["tool_choice"] = self.tool_choice
+            body["parallel_tool_calls"] = self.parallel_tool_calls
+        body.update(self.extra_body)
+        key = self.__digest(items[:1])
+        new_items, previous = self.__new_items(key, items, context)
+        try:
+            response = self.__send(body, new_items, previous)
+        except ProviderHTTPError as e:
+            if previous is None or e.status_code not in (400, 404):
+                raise
+            logger.warning(f"Server rejected the chained request, sending the full history: {e}")
+            with self.__lock:
+                self.session_stats["fallbacks"] += 1
+                self.__states.pop(key, None)
+            response = self.__send(body, items, None)
+        if self.stateful:
+            state = {
+                "id": response.get("id"),
+                "context": context,
+                "sent": len(items),
+                "digest": self.__digest(items),
+                "calls": {item.get("call_id") for item in response.get("output") or [] if item.get("type") == "function_call"},
+            }
+            with self.__lock:
+                self.__states[key] = state
+                self.__states.move_to_end(key)
+                while len(self.__states) > self.max_conversations:
+                    self.__states.popitem(last=False)
+        return response
+
+    def __send(self, body, items, previous):
+        body = dict(body, input=items)
+        if previous is not None:
+            body["previous_response_id"] = previous
+        with self.__lock:
+            self.session_stats["requests"] += 1
+            self.session_stats["incremental" if previous is not None else "full"] += 1
+            self.session_stats["items_sent"] += len(items)
+        return self._post("/responses", body)
+
+    def __new_items(self, key, items, context):
+        with self.__lock:
+            state = self.__states.get(key)
+        if not self.stateful or state is None or state["id"] is None or state["context"] != context:
+            return items, None
+        sent = state["sent"]
+        if len(items) < sent or self.__digest(items[:sent]) != state["digest"]:
+            return items, None
+        # The server already holds the calls it made in its last response.
+        new_items = [item for item in items[sent:] if not (item.get("type") == "function_call" and item.get("call_id") in state["calls"])]
+        return new_items, state["id"]
+
+    @staticmethod
+    def __digest(items):
+        return hashlib.sha256(json.dumps(items, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def format_messages(self, messages):
+        with tracing.span("provider.format_messages", messages=len(messages)):
+            items = []
+            for message in messages:
+                kind = message.get("type")
+                if kind == "tool_call":
+                    item = self._create_tool_call_message(message)
+                elif kind == "tool_result":
+                    item = self._create_tool_result_message(message)
+                else:
+                    item = {key: value for key, value in message.items() if key not in ("type", "timestamp")}
+                if item:
+                    items.append(item)
+            return items
+
+    def get_tool_calls(self, response):
+        return [item for item in response.get("output") or [] if item.get("type") == "function_call"] or None
+
+    def extract_tool_call_data(self, tool_call):
+        return super().extract_tool_call_data({
+            "id": tool_call["call_id"],
+            "function": {"name": tool_call["name"], "arguments": tool_call.get("arguments")},
+        })
+
+    def get_usage(self, response):
+        usage = response.get("usage") or {}
+        counts = {}
+        for key, name in (("input_tokens", "prompt_tokens"), ("output_tokens", "completion_tokens"), ("total_tokens", "total_tokens")):
+            if key in usage:
+                counts[name] = usage[key]
+        cached = (usage.get("input_tokens_details") or {}).get("cached_tokens")
+        if cached is not None:
+            counts["cached_tokens"] = cached
+        return counts
+
+    def build_log(self, resp, messages, result, tools, agent=None):
+        tool_call = self.get_tool_calls(resp)[0]
+        data = self.extract_tool_call_data(tool_call)
+        return {
+            'id': resp.get("id"),
+            'message_count': len(messages),
+            'created': resp.get("created_at"),
+            'model': resp.get("model", self._model),
+            'available_tools': sorted(tools),
+            'tool_called': {
+                'id': data['id'],
+                'name': data['name'],
+                'arguments': data['args'],
+                'result': result
+            },
+            'usage': self.get_usage(resp),
+        }
+
+    def _create_tool(self, name=None, description=None, parameters=None, required=None):
+        tool = {
+            "type": "function",
+            "name": name or "default_name",
+            "description": description or "default_description",
+            "parameters": {
+                "type": "object",
+                "properties": parameters or {},
+                "additionalProperties": False,
+                "required": required or []
+            }
+        }
+        if self.strict:
+            tool["strict"] = True
+        return tool
+
+    def _create_tool_call_message(self, message):
+        return {
+            "type": "function_call",
+            "call_id": message['content']['id'],
+            "name": message['content']['name'],
+            "arguments": json.dumps(message['content']['args'], default=str)
+        }
+
+    def _create_tool_result_message(self, message):
+        result = message['content']['result']
+        return {
+            "type": "function_call_output",
+            "call_id": message['content']['id'],
+            "output": result if isinstance(result, str) else json.dumps(result, default=str)
+        }
@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import deque
+from .delegating import DelegatingProvider
+from .. import logger
+
+
+class Backend:
+    """
+    A provider in a RouterProvider pool together with its health statistics.
+
+    Attributes:
+        provider (Provider): The wrapped provider.
+        name (str): Name used in statistics and logs.
+        weight (float): Relative preference; higher weights are chosen more often.
+        requests_per_minute (int): Client-side request budget, or None for no limit.
+        tokens_per_minute (int): Client-side token budget, or None for no limit.
+        latency (float): Exponentially weighted mean latency in seconds, or None before the first success.
+        error_rate (float): Exponentially weighted error rate between 0 and 1.
+        consecutive_failures (int): Failures since the last success.
+        ejected_until (float): Monotonic time until which the backend is skipped.
+        probation (bool): Whether the backend was ejected and has not succeeded since.
+    """
+
+    def __init__(self, provider, name=None, weight=1.0, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Initialize the Backend.
+
+        Args:
+            provider (Provider): The wrapped provider.
+            name (str, optional): Name used in statistics and logs. Defaults to the model name.
+            weight (float): Relative preference; higher weights are chosen more often.
+            requests_per_minute (int, optional): Client-side request budget.
+            tokens_per_minute (int, optional): Client-side token budget.
+        """
+        self.provider = provider
+        self.name = name or provider.model
+        self.weight = weight
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.probation = False
+        self.requests = 0
+        self.failures = 0
+        self.__window = deque()
+
+    def remaining_budget(self, now):
+        """
+        Get the fraction of the rate-limit budget left in the current minute.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The smallest remaining fraction of the request and token budgets, 1.0 without limits.
+        """
+        while self.__window and now - self.__window[0][0] > 60:
+            self.__window.popleft()
+        remaining = 1.0
+        if self.requests_per_minute:
+            remaining = min(remaining, 1 - len(self.__window) / self.requests_per_minute)
+        if self.tokens_per_minute:
+            tokens = sum(tokens for _, tokens in self.__window)
+            remaining = min(remaining, 1 - tokens / self.tokens_per_minute)
+        return max(remaining, 0.0)
+
+    def charge(self, now, tokens):
+        """
+        Record a request against the rate-limit budget.
+
+        Args:
+            now (float): The current monotonic time.
+            tokens (int): Tokens used by the request.
+        """
+        self.__window.append((now, tokens))
+
+    def stats(self):
+        """
+        Summarize the backend's health.
+
+        Returns:
+            dict: Latency, error rate, request counts and ejection state.
+        """
+        return {
+            "name": self.name,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejected": self.ejected_until > time.monotonic(),
+            "remaining_budget": self.remaining_budget(time.monotonic()),
+        }
+
+
+class RouterProvider(DelegatingProvider):
+    """
+    A provider that load-balances requests over a pool of backends.
+
+    Each request goes to the healthy backend with the best score, derived from
+    its observed latency, error rate, weight and remaining rate-limit budget.
+    A failed request is retried on the next best backend. Backends that keep
+    failing or hit a rate limit are ejected for a cooldown and then re-admitted
+    on probation. Tool calls are parsed by the backend that produced them and
+    the conversation stays provider-neutral, so backends can be mixed freely.
+    """
+
+    def __init__(self, backends, latency_alpha=0.2, error_alpha=0.2, error_penalty=4.0, eject_after=3, eject_error_rate=0.5, cooldown=30.0, max_attempts=None):
+        """
+        Initialize the RouterProvider.
+
+        Args:
+            backends (list): Providers or Backend instances to route between.
+            latency_alpha (float): Smoothing factor of the latency average.
+            error_alpha (float): Smoothing factor of the error rate.
+            error_penalty (float): How strongly the error rate inflates a backend's score.
+            eject_after (int): Consecutive failures after which a backend is ejected.
+            eject_error_rate (float): Error rate above which a backend is ejected.
+            cooldown (float): Seconds an ejected backend is skipped.
+            max_attempts (int, optional): Backends tried per request. Defaults to all of them.
+        """
+        if not backends:
+            raise ValueError("RouterProvider needs at least one backend")
+        self.backends = [b if isinstance(b, Backend) else Backend(b) for b in backends]
+        super().__init__(self.backends[0].provider)
+        self.latency_alpha = latency_alpha
+        self.error_alpha = error_alpha
+        self.error_penalty = error_penalty
+        self.eject_after = eject_after
+        self.eject_error_rate = eject_error_rate
+        self.cooldown = cooldown
+        self.max_attempts = max_attempts or len(self.backends)
+        self.__lock = threading.Lock()
+
+    def choose(self, exclude=()):
+        """
+        Pick the backend for the next request.
+
+        Args:
+            exclude (iterable): Backends not to consider.
+
+        Returns:
+            Backend: The chosen backend, or None if every backend is excluded.
+        """
+        now = time.monotonic()
+        with self.__lock:
+            candidates = [b for b in self.backends if b not in exclude]
+            if not candidates:
+                return None
+            healthy = [b for b in candidates if b.ejected_until <= now and b.remaining_budget(now) > 0]
+            if not healthy:
+                # Everything is ejected or out of budget: prefer the backend that recovers first.
+                return min(candidates, key=lambda b: b.ejected_until)
+            known = [b.latency for b in healthy if b.latency is not None]
+            baseline = min(known) if known else 1.0
+            return min(healthy, key=lambda b: self.__score(b, now, baseline))
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        tried = []
+        error = None
+        for _ in range(self.max_attempts):
+            backend = self.choose(exclude=tried)
+            if backend is None:
+                break
+            tried.append(backend)
+            start = time.monotonic()
+            try:
+                response = backend.provider.request(messages, registry, tools, system_prompt)
+            except Exception as e:
+                error = e
+                self.__failure(backend, e)
+                continue
+            self.__success(backend, start, backend.provider.get_usage(response))
+            return self._route(response, backend.provider)
+        raise error or RuntimeError("No backend available")
+
+    def stats(self):
+        """
+        Summarize the health of every backend.
+
+        Returns:
+            list: One statistics dict per backend.
+        """
+        with self.__lock:
+            return [backend.stats() for backend in self.backends]
+
+    def __score(self, backend, now, baseline):
+        # Untried backends and backends back from ejection are probed first.
+        if backend.requests == 0 or backend.probation:
+            return 0.0
+        # Backends that never succeeded borrow the best observed latency.
+        latency = backend.latency if backend.latency is not None else baseline
+        budget = max(backend.remaining_budget(now), 0.05)
+        return latency * (1 + self.error_penalty * backend.error_rate) / (backend.weight * budget)
+
+    def __success(self, backend, start, usage):
+        now = time.monotonic()
+        latency = now - start
+        with self.__lock:
+            backend.requests += 1
+            backend.charge(now, usage.get("total_tokens", 0))
+            backend.latency = latency if backend.latency is None else (
+                self.latency_alpha * latency + (1 - self.latency_alpha) * backend.latency
+            )
+            backend.error_rate *= 1 - self.error_alpha
+            backend.consecutive_failures = 0
+            backend.probation = False
+
+    def __failure(self, backend, error):
+        now = time.monotonic()
+        with self.__lock:
+            backend.requests += 1
+            backend.failures += 1
+            backend.charge(now, 0)
+            backend.error_rate = self.error_alpha + (1 - self.error_alpha) * backend.error_rate
+            backend.consecutive_failures += 1
+            rate_limited = getattr(error, "status_code", None) == 429
+            if rate_limited or backend.probation or backend.consecutive_failures >= self.eject_after or (
+                backend.requests >= self.eject_after and backend.error_rate >= self.eject_error_rate
+            ):
+                backend.ejected_until = now + self.cooldown
+                backend.probation = True
+                logger.warning(f"Ejecting backend {backend.name} for {self.cooldown}s after error: {error}")
@@ -1 +1 @@
-# from .dopus_test import DopusTest, test, test_multi
\ No newline at end of file
+from .dopus_test import DopusTest, CaseResult, JudgeCache, test, test_multi
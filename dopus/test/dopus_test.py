@@ -1,185 +1,498 @@
-# from dopus.core import ToolRunner, tool, Convo
-# from dopus.util import suppress_output, log
-# import inspect
-# import json
-# import argparse
-
-# test_registry = {}
-
-# @tool(
-#     description="tell the user if the assertion about the given data is true or false",
-#     parameters={
-#         "result": {
-#             "type": "boolean",
-#             "description": "true if the assertion is true or false"
-#         },
-#         "message": {
-#             "type": "string",
-#             "description": "message explaining the result"
-#         }
-#     },
-#     required=["result", "message"],
-#     registry=test_registry
-# )
-# def SmartAssert(self, result, message):
-#     return {
-#         'assert': result,
-#         'message': message
-#     }
-
-# class DopusTest:
-
-#     def __init__(self):
-#         parser = argparse.ArgumentParser(description='Run DopusTest')
-#         parser.add_argument('--test', type=str, help='Specific test to run')
-#         args = parser.parse_args()
-
-#         self.test_cases = []
-#         self.tests = []
-#         self.passed_tests = 0
-#         self.total_tests = 0
-#         self.runner = ToolRunner(registry=test_registry)
-#         self.runner.add_tool(SmartAssert)
-#         self.suppress_output = False
-#         self.test = args.test
-#         self.setUp()
-#         self._add_tests_in_class()
-#         self.run()
-#         self.run_multi()
-#         self.tearDown()
-
-#     def _add_tests_in_class(self):
-#             for name, method in inspect.getmembers(self, predicate=inspect.ismethod):
-#                 if hasattr(method, "is_test"):
-#                     if hasattr(method, "path"):
-#                         self.load(getattr(method, "path"), method)
-#                     else:
-#                         self.tests.append(method)
-
-#     def setUp(self):
-#         pass
-
-#     def tearDown(self):
-#         pass
-
-#     def on(self, test_case):
-#         pass
-
-#     def load(self, path, func):
-#         with open(path, 'r') as file:
-#             self.test_cases.append({'function': func, 'data': json.load(file)})
-
-#     def run_test(self, test_func, test_name):
-#         self.total_tests += 1
-#         try:
-#             if self.suppress_output:
-#                 with suppress_output():
-#                     test_func()
-#             else:
-#                 test_func()
-#             log(f"✅ Test Passed - {test_name}")
-#             self.passed_tests += 1
-#         except AssertionError as e:
-#             log(f"❌ Test Failed - {test_name}: {e}", color="red")
-
-#     def run(self):
-#         for test in self.tests:
-#             if self.test and test.__name__ != self.test:
-#                 continue
-#             self.run_test(test, test.__name__)
-
-#     def run_multi_test(self, name, test, func):
-#         self.total_tests += 1
-#         try:
-#             if self.suppress_output:
-#                 with suppress_output():
-#                     func(name, test)
-#             else:
-#                 func(name, test)
-#             log(f"✅ Test Passed - {name}")
-#             self.passed_tests += 1
-#         except AssertionError as e:
-#             log(f"❌ Test Failed - {name}: {e}", color="red")
-
-#     def run_multi(self):
-#         for tests in self.test_cases:
-#             for test_name, test_data in tests['data'].items():
-#                 if self.test and test_name != self.test:
-#                     continue
-#                 self.run_multi_test(test_name, test_data, tests['function'])
-
-#     def tearDown(self):
-#         if self.total_tests > 0:
-#             success_rate = (self.passed_tests / self.total_tests) * 100
-#             log(f"Passed {success_rate:.2f}% tests [{self.passed_tests}/{self.total_tests}]", color="blue")
-#         else:
-#             log("No tests were run.")
-
-#     def extract_tool_calls(self, actions):
-#         tool_calls = []
-#         for action in actions:
-#             if 'tool_called' in action:
-#                 tool_calls.append(action['tool_called'])
-#         return tool_calls
-
-#     def IsEqual(self, first, second):
-#         if isinstance(first, list) and isinstance(second, list):
-#             return len(first) == len(second) and all(f == s for f, s in zip(first, second))
-#         elif isinstance(first, dict) and isinstance(second, dict):
-#             return first == second
-#         else:
-#             return first == second
-
-#     def AssertEqual(self, first, second):
-#         if isinstance(first, list) and isinstance(second, list):
-#             if len(first) != len(second) or any(f != s for f, s in zip(first, second)):
-#                 raise AssertionError(f"Lists differ: {first} != {second}")
-#         elif isinstance(first, dict) and isinstance(second, dict):
-#             if first != second:
-#                 raise AssertionError(f"Dictionaries differ: {first} != {second}")
-#         else:
-#             if first != second:
-#                 raise AssertionError(f"{first} does not equal {second}")
-
-#     def AssertTrue(self, expr, msg=None):
-#         if not expr:
-#             raise AssertionError(msg or f"{expr} is not True")
-
-#     def AssertFalse(self, expr, msg=None):
-#         if expr:
-#             raise AssertionError(msg or f"{expr} is not False")
-
-#     def AssertIn(self, member, container, msg=None):
-#         if member not in container:
-#             raise AssertionError(msg or f"{member} not found in {container}")
-
-#     def AssertNotIn(self, member, container, msg=None):
-#         if member in container:
-#             raise AssertionError(msg or f"{member} unexpectedly found in {container}")
-
-#     def _LLMAssert(self, assertion, data):
-#         convo = Convo()
-#         convo.append('user', f"Determine if this assertion about the data is true or false: {assertion}\nDATA: {data}")
-#         res, actions = self.runner.execute(convo, default_inference_provider)
-#         return res
-
-#     def LLMAssertTrue(self, assertion, data):
-#         res = self._LLMAssert(assertion, data)
-#         if res['assert'] is False:
-#             raise AssertionError(res["message"])
-    
-#     def LLMAssertFalse(self, assertion, data):
-#         res = self._LLMAssert(assertion, data)
-#         if res['assert'] is True:
-#             raise AssertionError(res["message"])
-
-# def test_multi(path):
-#     def decorator(func):
-#         func.is_test = True
-#         func.path = path
-#         return func
-#     return decorator
-
-# def test(func):
-#     func.is_test = True
-#     return func
\ No newline at end of file
+from dopus.core import ToolRunner, Convo
+from dopus.core.tracing import SpanSink, tracer
+from dopus import logger
+from concurrent.futures import ThreadPoolExecutor, Future
+from xml.etree import ElementTree
+import contextvars
+import hashlib
+import inspect
+import json
+import argparse
+import os
+import threading
+import time
+
+test_registry = {}
+_current_case = contextvars.ContextVar("dopus_test_case", default=None)
+
+
+def judge(self, verdicts):
+    return verdicts
+
+
+test_registry["judge"] = {
+    "name": "judge",
+    "description": "tell the user whether each numbered assertion about its data is true or false",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "description": "one verdict per assertion",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer", "description": "number of the assertion"},
+                    "result": {"type": "boolean", "description": "true if the assertion is true, false otherwise"},
+                    "message": {"type": "string", "description": "message explaining the result"},
+                },
+                "required": ["index", "result", "message"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["verdicts"],
+    "function": judge,
+    "executor": None,
+    "timeout": None,
+}
+
+
+class JudgeCache:
+    """
+    Judge verdicts keyed by a hash of the assertion, the data and the judge model,
+    persisted as JSON so unchanged assertions are not judged again.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.__verdicts = {}
+        self.__lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    self.__verdicts = json.load(file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable judge cache {path}: {e}")
+
+    @staticmethod
+    def key(assertion, data, model):
+        content = json.dumps([assertion, data, model], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self.__lock:
+            return self.__verdicts.get(key)
+
+    def put(self, key, verdict):
+        with self.__lock:
+            self.__verdicts[key] = verdict
+
+    def save(self):
+        if not self.path:
+            return
+        with self.__lock:
+            verdicts = dict(self.__verdicts)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(verdicts, file)
+        os.replace(tmp_path, self.path)
+
+
+class JudgeBatcher:
+    """
+    Collects assertions from concurrently running cases and judges them in one request.
+
+    A batch is sent once it holds ``batch_size`` assertions or ``window`` seconds
+    after its first assertion arrived.
+    """
+
+    def __init__(self, provider, batch_size=8, window=0.05):
+        self.provider = provider
+        self.batch_size = batch_size
+        self.window = window
+        self.__pending = []
+        self.__timer = None
+        self.__lock = threading.Lock()
+
+    def submit(self, assertion, data):
+        future = Future()
+        with self.__lock:
+            self.__pending.append((assertion, data, future, _current_case.get()))
+            if len(self.__pending) >= self.batch_size:
+                batch = self.__take()
+            else:
+                batch = None
+                if self.__timer is None:
+                    self.__timer = threading.Timer(self.window, self.flush)
+                    self.__timer.daemon = True
+                    self.__timer.start()
+        if batch:
+            # Judge outside the case's context so its tokens are not also counted by the span sink.
+            contextvars.Context().run(self.__judge, batch)
+        return future
+
+    def flush(self):
+        with self.__lock:
+            batch = self.__take()
+        if batch:
+            self.__judge(batch)
+
+    def __take(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        batch, self.__pending = self.__pending, []
+        return batch
+
+    def __judge(self, batch):
+        try:
+            convo = Convo()
+            lines = [
+                f"{index}. ASSERTION: {assertion}\n   DATA: {json.dumps(data, default=str)}"
+                for index, (assertion, data, _, _) in enumerate(batch)
+            ]
+            convo.append("user", "Determine for each numbered assertion whether it is true or false about its data. "
+                                 "Give one verdict per assertion.\n\n" + "\n".join(lines))
+            # A runner per batch, as batches sent by the timer and by full batches may overlap.
+            runner = ToolRunner(registry=test_registry)
+            runner.add_tool("judge")
+            verdicts, dlog = runner.execute(convo, self.provider)
+            usage = (dlog or {}).get("usage") or {}
+            by_index = {v.get("index"): v for v in verdicts or [] if isinstance(v, dict)}
+        except Exception as e:
+            for _, _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for index, (_, _, future, case) in enumerate(batch):
+            if case is not None:
+                case.add_usage({key: value / len(batch) for key, value in usage.items() if isinstance(value, (int, float))})
+            verdict = by_index.get(index)
+            if verdict is None:
+                future.set_result({"assert": None, "message": "The judge gave no verdict for this assertion"})
+            else:
+                future.set_result({"assert": verdict["result"], "message": verdict["message"]})
+
+
+class CaseResult:
+    """
+    The outcome of one test case.
+
+    Attributes:
+        name (str): The case name.
+        status (str): ``passed``, ``failed`` or ``error``.
+        message (str): The failure or error message.
+        time (float): Wall time of the case in seconds.
+        usage (dict): Tokens used by the case, including its share of batched judge requests.
+        judged (int): Assertions sent to the judge.
+        cached (int): Assertions answered from the judge cache.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.status = "passed"
+        self.message = None
+        self.time = 0.0
+        self.usage = {}
+        self.judged = 0
+        self.cached = 0
+        self.__lock = threading.Lock()
+
+    def add_usage(self, usage):
+        with self.__lock:
+            for key, value in usage.items():
+                self.usage[key] = self.usage.get(key, 0) + value
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "status": self.status,
+            "message": self.message,
+            "time": self.time,
+            "usage": self.usage,
+            "judged": self.judged,
+            "cached": self.cached,
+        }
+
+
+class _UsageSink(SpanSink):
+    def on_end(self, span):
+        case = _current_case.get()
+        if case is not None and span.name == "provider.request":
+            case.add_usage({key: value for key, value in span.attributes.items() if key.endswith("_tokens")})
+
+
+class DopusTest:
+    """
+    Base class of agent evaluation suites.
+
+    Methods decorated with ``@test`` are cases; methods decorated with
+    ``@test_multi(path)`` run once per entry of a JSON file. Cases run
+    concurrently on a worker pool. ``LLMAssertTrue`` and ``LLMAssertFalse``
+    ask the judge provider, batching assertions made at the same time and
+    caching verdicts by content hash.
+
+    Attributes:
+        judge_provider (Provider): The provider judging LLM assertions.
+        results (list): The CaseResult of every case run.
+    """
+
+    judge_provider = None
+
+    def __init__(self, judge_provider=None, workers=4, cache_path=None, report_path=None, test=None, batch_size=8, argv=None, autorun=True):
+        """
+        Initialize the suite and, unless ``autorun`` is False, run it.
+
+        Options given on the command line (``--test``, ``--workers``, ``--cache``,
+        ``--report``) override the arguments.
+
+        Args:
+            judge_provider (Provider, optional): The provider judging LLM assertions.
+            workers (int): Number of cases run concurrently.
+            cache_path (str, optional): JSON file caching judge verdicts between runs.
+            report_path (str, optional): Report file, JUnit XML if it ends with ``.xml``, JSON otherwise.
+            test (str, optional): Run only the case with this name.
+            batch_size (int): Maximum number of assertions judged in one request.
+            argv (list, optional): Command line arguments. Defaults to ``sys.argv``.
+            autorun (bool): Run the suite right away.
+        """
+        parser = argparse.ArgumentParser(description='Run DopusTest')
+        parser.add_argument('--test', type=str, default=test, help='Specific test to run')
+        parser.add_argument('--workers', type=int, default=workers, help='Number of cases run concurrently')
+        parser.add_argument('--cache', type=str, default=cache_path, help='Judge verdict cache file')
+        parser.add_argument('--report', type=str, default=report_path, help='JUnit (.xml) or JSON report file')
+        args, _ = parser.parse_known_args(argv)
+
+        self.test_cases = []
+        self.tests = []
+        self.results = []
+        self.passed_tests = 0
+        self.total_tests = 0
+        self.test = args.test
+        self.workers = max(args.workers, 1)
+        self.report_path = args.report
+        self.judge_provider = judge_provider or self.judge_provider
+        self.cache = JudgeCache(args.cache)
+        self.batch_size = batch_size
+        self.__batcher = None
+        self.__batcher_lock = threading.Lock()
+        self.__print_lock = threading.Lock()
+        self.setUp()
+        self._add_tests_in_class()
+        if autorun:
+            self.run()
+            self.tearDown()
+
+    def _add_tests_in_class(self):
+        for name, method in inspect.getmembers(self, predicate=inspect.ismethod):
+            if hasattr(method, "is_test"):
+                if hasattr(method, "path"):
+                    self.load(getattr(method, "path"), method)
+                else:
+                    self.tests.append(method)
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        if self.total_tests > 0:
+            success_rate = (self.passed_tests / self.total_tests) * 100
+            print(f"Passed {success_rate:.2f}% tests [{self.passed_tests}/{self.total_tests}]")
+        else:
+            print("No tests were run.")
+        if self.report_path:
+            print(f"Report written to {self.report_path}")
+
+    def load(self, path, func):
+        with open(path, 'r') as file:
+            self.test_cases.append({'function': func, 'data': json.load(file)})
+
+    def run(self):
+        """
+        Run all selected cases concurrently, then save the judge cache and write the report.
+
+        Returns:
+            list: The CaseResult of every case.
+        """
+        cases = [(test.__name__, test, ()) for test in self.tests]
+        for tests in self.test_cases:
+            for test_name, test_data in tests['data'].items():
+                cases.append((test_name, tests['function'], (test_name, test_data)))
+        cases = [case for case in cases if not self.test or case[0] == self.test]
+
+        sink = tracer.add_sink(_UsageSink())
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dopus-test") as pool:
+                futures = [pool.submit(contextvars.copy_context().run, self.run_case, *case) for case in cases]
+                self.results = [future.result() for future in futures]
+        finally:
+            tracer.remove_sink(sink)
+        self.total_tests = len(self.results)
+        self.passed_tests = sum(result.status == "passed" for result in self.results)
+        self.cache.save()
+        if self.report_path:
+            self.write_report(self.report_path)
+        return self.results
+
+    def run_case(self, name, func, args=()):
+        """
+        Run one case and record its outcome.
+
+        Args:
+            name (str): The case name.
+            func (callable): The test method.
+            args (tuple): Arguments of the test method.
+
+        Returns:
+            CaseResult: The outcome.
+        """
+        result = CaseResult(name)
+        token = _current_case.set(result)
+        start = time.perf_counter()
+        try:
+            func(*args)
+        except AssertionError as e:
+            result.status = "failed"
+            result.message = str(e)
+        except Exception as e:
+            result.status = "error"
+            result.message = f"{type(e).__name__}: {e}"
+        finally:
+            result.time = time.perf_counter() - start
+            _current_case.reset(token)
+        if result.status == "passed":
+            line = f"✅ Test Passed - {name}"
+        else:
+            line = f"❌ Test Failed - {name}: {result.message}"
+        with self.__print_lock:
+            print(line, flush=True)
+        return result
+
+    def report(self):
+        """
+        Summarize the last run.
+
+        Returns:
+            dict: Totals and the outcome of every case.
+        """
+        usage = {}
+        for result in self.results:
+            for key, value in result.usage.items():
+                usage[key] = usage.get(key, 0) + value
+        return {
+            "total": len(self.results),
+            "passed": sum(r.status == "passed" for r in self.results),
+            "failed": sum(r.status == "failed" for r in self.results),
+            "errors": sum(r.status == "error" for r in self.results),
+            "time": sum(r.time for r in self.results),
+            "usage": usage,
+            "cases": [r.to_dict() for r in self.results],
+        }
+
+    def write_report(self, path):
+        """
+        Write the report of the last run.
+
+        Args:
+            path (str): JUnit XML if it ends with ``.xml``, JSON otherwise.
+        """
+        summary = self.report()
+        if not path.endswith(".xml"):
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(summary, file, indent=2)
+            return
+        suite = ElementTree.Element("testsuite", {
+            "name": type(self).__name__,
+            "tests": str(summary["total"]),
+            "failures": str(summary["failed"]),
+            "errors": str(summary["errors"]),
+            "time": f"{summary['time']:.3f}",
+        })
+        for result in self.results:
+            case = ElementTree.SubElement(suite, "testcase", {
+                "classname": type(self).__name__,
+                "name": result.name,
+                "time": f"{result.time:.3f}",
+            })
+            if result.status != "passed":
+                ElementTree.SubElement(case, "failure" if result.status == "failed" else "error", {"message": result.message or ""})
+            properties = ElementTree.SubElement(case, "properties")
+            for key, value in sorted(result.usage.items()):
+                ElementTree.SubElement(properties, "property", {"name": key, "value": f"{value:g}"})
+            ElementTree.SubElement(properties, "property", {"name": "cached_judgments", "value": str(result.cached)})
+        ElementTree.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+    def extract_tool_calls(self, actions):
+        tool_calls = []
+        for action in actions:
+            if action and 'tool_calls' in action:
+                tool_calls.extend(action['tool_calls'])
+            elif action and 'tool_called' in action:
+                tool_calls.append(action['tool_called'])
+        return tool_calls
+
+    def IsEqual(self, first, second):
+        return first == second
+
+    def AssertEqual(self, first, second):
+        if isinstance(first, list) and isinstance(second, list):
+            if len(first) != len(second) or any(f != s for f, s in zip(first, second)):
+                raise AssertionError(f"Lists differ: {first} != {second}")
+        elif isinstance(first, dict) and isinstance(second, dict):
+            if first != second:
+                raise AssertionError(f"Dictionaries differ: {first} != {second}")
+        else:
+            if first != second:
+                raise AssertionError(f"{first} does not equal {second}")
+
+    def AssertTrue(self, expr, msg=None):
+        if not expr:
+            raise AssertionError(msg or f"{expr} is not True")
+
+    def AssertFalse(self, expr, msg=None):
+        if expr:
+            raise AssertionError(msg or f"{expr} is not False")
+
+    def AssertIn(self, member, container, msg=None):
+        if member not in container:
+            raise AssertionError(msg or f"{member} not found in {container}")
+
+    def AssertNotIn(self, member, container, msg=None):
+        if member in container:
+            raise AssertionError(msg or f"{member} unexpectedly found in {container}")
+
+    def _LLMAssert(self, assertion, data):
+        if self.judge_provider is None:
+            raise RuntimeError("LLM assertions need a judge_provider")
+        case = _current_case.get()
+        key = JudgeCache.key(assertion, data, self.judge_provider.model)
+        verdict = self.cache.get(key)
+        if verdict is not None:
+            if case is not None:
+                case.cached += 1
+            return verdict
+        with self.__batcher_lock:
+            if self.__batcher is None:
+                self.__batcher = JudgeBatcher(self.judge_provider, self.batch_size)
+        if case is not None:
+            case.judged += 1
+        verdict = self.__batcher.submit(assertion, data).result()
+        if verdict["assert"] is not None:
+            self.cache.put(key, verdict)
+        return verdict
+
+    def LLMAssertTrue(self, assertion, data):
+        res = self._LLMAssert(assertion, data)
+        if res['assert'] is not True:
+            raise AssertionError(res["message"])
+
+    def LLMAssertFalse(self, assertion, data):
+        res = self._LLMAssert(assertion, data)
+        if res['assert'] is not False:
+            raise AssertionError(res["message"])
+
+
+def test_multi(path):
+    def decorator(func):
+        func.is_test = True
+        func.path = path
+        return func
+    return decorator
+
+
+def test(func):
+    func.is_test = True
+    return func
+
+
+# The decorators are not tests themselves when imported into pytest modules.
+test.__test__ = False
+test_multi.__test__ = False
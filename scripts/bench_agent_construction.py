@@ -0,0 +1,81 @@
+"""
+Microbenchmark of Agent construction for agent classes of growing size.
+
+Each class has the given number of tools plus as many plain methods and
+attributes, and the benchmark reports the median time to construct one
+agent, which should not grow with the class size::
+
+    PYTHONPATH=. python scripts/bench_agent_construction.py --sizes 1 10 100 --agents 2000
+"""
+import argparse
+import json
+import statistics
+import time
+
+from dopus.core import Agent, tool
+
+
+def make_agent_class(size: int) -> type:
+    """
+    Build an Agent subclass with ``size`` tools, ``size`` plain methods and ``size`` attributes.
+
+    Args:
+        size (int): The number of members of each kind.
+
+    Returns:
+        type: The agent class.
+    """
+    name = f"BenchAgent{size}"
+    namespace = {"prompt": lambda self: "Benchmark."}
+    for n in range(size):
+        def work(self, value: str):
+            """
+            Do some work.
+
+            Args:
+                value (str): The input.
+            """
+            return value
+
+        work.__name__ = f"tool_{n}"
+        work.__qualname__ = f"{name}.tool_{n}"
+        namespace[work.__name__] = tool(work)
+        namespace[f"helper_{n}"] = lambda self: None
+        namespace[f"setting_{n}"] = n
+    return type(name, (Agent,), namespace)
+
+
+def bench(cls: type, agents: int, repeat: int) -> float:
+    """
+    Time agent construction.
+
+    Args:
+        cls (type): The agent class.
+        agents (int): Agents constructed per measurement.
+        repeat (int): Number of measurements.
+
+    Returns:
+        float: The median time per agent in microseconds.
+    """
+    cls(None)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(agents):
+            cls(None)
+        samples.append((time.perf_counter() - start) / agents * 1e6)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Agent construction for classes of growing size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200], help="tools per agent class")
+    parser.add_argument("--agents", type=int, default=1000, help="agents constructed per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per size")
+    args = parser.parse_args(argv)
+    results = {size: round(bench(make_agent_class(size), args.agents, args.repeat), 2) for size in args.sizes}
+    print(json.dumps({"us_per_agent": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
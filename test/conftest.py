@@ -0,0 +1,149 @@
+from dopus.core import Provider
+
+import itertools
+import json
+import pytest
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+class ScriptedProvider(Provider):
+    """
+    A provider that replays a fixed list of tool calls instead of calling an LLM.
+    Each step of the script is one tool call, or a list of tool calls made in the same turn.
+    """
+
+    def __init__(self, script: List[Dict[str, Any]], model: str = "scripted"):
+        super().__init__(model)
+        self.script = list(script)
+        self.requests = []
+        self.__ids = itertools.count()
+
+    def request(self, messages, registry, tools=None, system_prompt=""):
+        self.requests.append(self.format_messages(messages))
+        step = self.script.pop(0) if self.script else None
+        calls = None
+        if step is not None:
+            steps = step if isinstance(step, list) else [step]
+            calls = [SimpleNamespace(id=f"call_{next(self.__ids)}", name=s["name"], args=s.get("args", {})) for s in steps]
+        return SimpleNamespace(
+            tool_calls=calls,
+            usage={"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+        )
+
+    def get_tools(self, tools, registry):
+        return [tool for tool in tools if tool in registry]
+
+    def get_usage(self, response):
+        return dict(response.usage)
+
+    def extract_tool_call_data(self, tool_call):
+        return {"id": tool_call.id, "args": tool_call.args, "name": tool_call.name}
+
+    def build_log(self, response, messages, result, tools, agent=None):
+        call = response.tool_calls[0]
+        return {
+            "available_tools": sorted(tools),
+            "tool_called": {"id": call.id, "name": call.name, "arguments": call.args, "result": result},
+            "usage": dict(response.usage),
+        }
+
+    def get_tool_calls(self, response):
+        return response.tool_calls
+
+    def _create_tool(self, name=None, description=None, parameters=None, required=None):
+        return {"name": name, "description": description, "parameters": parameters, "required": required}
+
+    def _create_tool_call_message(self, message):
+        return {"role": "assistant", "tool_call": message["content"]}
+
+    def _create_tool_result_message(self, message):
+        return {"role": "tool", "content": message["content"]["result"]}
+
+
+@pytest.fixture
+def scripted_provider():
+    """Fixture for a factory of providers replaying a list of tool calls."""
+    return ScriptedProvider
+
+
+class OpenAIStub:
+    """
+    A local HTTP server answering OpenAI-style chat completion requests from a script.
+    Each scripted reply is a response dict, a list of chunks to stream, or a ``(status, body)`` error.
+    """
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+        self.connections = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                stub.connections.add(self.client_address)
+                stub.requests.append({"path": self.path, "headers": dict(self.headers), "body": json.loads(self.rfile.read(length))})
+                reply = stub.replies.pop(0)
+                if isinstance(reply, tuple):
+                    status, body = reply
+                    self.__send(status, "application/json", json.dumps(body).encode())
+                elif isinstance(reply, list):
+                    events = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in reply) + "data: [DONE]\n\n"
+                    self.__send(200, "text/event-stream", events.encode())
+                else:
+                    self.__send(200, "application/json", json.dumps(reply).encode())
+
+            def __send(self, status, content_type, data):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def completion(tool_calls=None, content=None, usage=(10, 2)):
+    """Build a chat completion response with the given tool calls as ``(id, name, arguments)``."""
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = [
+            {"id": id, "type": "function", "function": {"name": name, "arguments": arguments}}
+            for id, name, arguments in tool_calls
+        ]
+    return {
+        "id": "chatcmpl-1",
+        "created": 0,
+        "model": "stub",
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": {"prompt_tokens": usage[0], "completion_tokens": usage[1], "total_tokens": sum(usage)},
+    }
+
+
+@pytest.fixture
+def openai_stub():
+    """Fixture for a local OpenAI-compatible HTTP server."""
+    stub = OpenAIStub()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def make_completion():
+    """Fixture for a builder of chat completion responses."""
+    return completion
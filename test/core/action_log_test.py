@@ -0,0 +1,120 @@
+import json
+
+from dopus.core import ActionLog, Agent, ToolRunner, tool
+
+import pytest
+
+
+def test_unbounded_by_default():
+    """Test that a log without a limit keeps every entry."""
+    log = ActionLog()
+    for i in range(100):
+        log.append({"step": i})
+    assert len(log) == 100
+    assert log[0] == {"step": 0}
+    assert log.total == 100
+
+
+def test_ring_buffer_drops_oldest():
+    """Test that a bounded log keeps only the most recent entries."""
+    log = ActionLog(max_actions=3)
+    for i in range(10):
+        log.append({"step": i})
+    assert [entry["step"] for entry in log] == [7, 8, 9]
+    assert log.evicted == 7
+    assert log.total == 10
+    assert log[-1] == {"step": 9}
+    assert list(log.read_spilled()) == []
+
+
+def test_spill_to_disk(tmp_path):
+    """Test that evicted entries are appended to the spill file."""
+    log = ActionLog(max_actions=2, spill_path=str(tmp_path / "actions.jsonl"))
+    for i in range(5):
+        log.append({"step": i})
+    assert [entry["step"] for entry in log.read_spilled()] == [0, 1, 2]
+    assert [entry["step"] for entry in log] == [3, 4]
+
+
+def test_extend_respects_limit():
+    """Test that extend goes through the bound and the log cannot be modified in place."""
+    log = ActionLog(max_actions=2)
+    log.extend({"step": i} for i in range(5))
+    assert log == [{"step": 3}, {"step": 4}]
+    assert log.evicted == 3
+    with pytest.raises(TypeError):
+        log += [{"step": 5}]
+    with pytest.raises(TypeError):
+        log[0] = {"step": 6}
+
+
+def test_invalid_limit():
+    """Test that a non-positive limit is rejected."""
+    with pytest.raises(ValueError):
+        ActionLog(max_actions=0)
+
+
+class TickAgent(Agent):
+
+    def prompt(self):
+        return "Tick."
+
+    @tool
+    def tick(self, n: int):
+        """
+        Tick once.
+
+        Args:
+            n (int): The tick number.
+        """
+        if n == 9:
+            self.stop(n)
+        return n
+
+
+def test_runner_bounds_actions(scripted_provider, tmp_path):
+    """Test that ToolRunner keeps its action log bounded."""
+    spill = tmp_path / "spill.jsonl"
+    provider = scripted_provider([{"name": "TickAgent_tick", "args": {"n": i}} for i in range(10)])
+    runner = ToolRunner(max_actions=4, action_spill_path=str(spill))
+    agent = TickAgent(provider, tool_manager=runner)
+    agent.run("go")
+
+    actions = agent.get_actions()
+    assert len(actions) == 4
+    assert actions.total == 10
+    assert [action["tool_called"]["result"] for action in actions] == [6, 7, 8, 9]
+    assert len(list(actions.read_spilled())) == 6
+
+
+def test_actions_serializable(scripted_provider):
+    """Test that the action log, including the available tools, serializes as a list."""
+    provider = scripted_provider([{"name": "TickAgent_tick", "args": {"n": 9}}])
+    agent = TickAgent(provider)
+    agent.run("go")
+    action = json.loads(json.dumps(agent.get_actions().to_list()))[0]
+    assert action["tool_called"]["result"] == 9
+    assert action["available_tools"] == ["TickAgent_tick"]
+
+
+def test_spill_file_per_run(scripted_provider, tmp_path):
+    """Test that each run starts a fresh spill file."""
+    spill = tmp_path / "spill.jsonl"
+    runner = ToolRunner(max_actions=2, action_spill_path=str(spill))
+    provider = scripted_provider([{"name": "TickAgent_tick", "args": {"n": i}} for i in range(10)])
+    agent = TickAgent(provider, tool_manager=runner)
+    agent.run("first")
+    provider.script = [{"name": "TickAgent_tick", "args": {"n": i}} for i in range(5, 10)]
+    agent.run("second")
+    assert [action["tool_called"]["result"] for action in agent.get_actions().read_spilled()] == [5, 6, 7]
+
+
+def test_shared_spill_file(tmp_path):
+    """Test that logs sharing a spill file keep each other's entries."""
+    spill = str(tmp_path / "spill.jsonl")
+    first, second = ActionLog(max_actions=1, spill_path=spill), ActionLog(max_actions=1, spill_path=spill)
+    for i in range(3):
+        first.append({"first": i})
+        second.append({"second": i})
+    assert list(first.read_spilled()) == [{"first": 0}, {"first": 1}]
+    assert list(second.read_spilled()) == [{"second": 0}, {"second": 1}]
@@ -0,0 +1,76 @@
+from dopus.core import Agent, Budget, ToolRunner, tool
+
+import pytest
+
+
+class CounterAgent(Agent):
+
+    def prompt(self):
+        return "Count."
+
+    @tool
+    def count(self, n: int):
+        """
+        Count a number.
+
+        Args:
+            n (int): The number.
+        """
+        return n
+
+    @tool
+    def done(self):
+        """Stop counting."""
+        self.stop("done")
+
+
+def counting(steps):
+    return [{"name": "CounterAgent_count", "args": {"n": n}} for n in range(steps)] + [{"name": "CounterAgent_done"}]
+
+
+def test_usage_accounting(scripted_provider):
+    """Test that usage is summed per run and over the agent's lifetime."""
+    agent = CounterAgent(scripted_provider(counting(2) + counting(0)))
+    agent.run("count to two")
+    assert agent.get_usage() == {"prompt_tokens": 30, "completion_tokens": 6, "total_tokens": 36}
+    agent.run("stop")
+    assert agent.get_usage()["total_tokens"] == 12
+    assert agent.get_usage(total=True)["total_tokens"] == 48
+    assert agent.get_stop_reason() == {"reason": "stopped"}
+
+
+@pytest.mark.parametrize("budget, reason, steps", [
+    (Budget(max_steps=3), "max_steps", 3),
+    (Budget(max_tokens=40), "max_tokens", 4),
+    (Budget(max_cost=0.0001, prices={"scripted": {"prompt": 2.0, "completion": 10.0}}), "max_cost", 3),
+])
+def test_budget_stops_run(scripted_provider, budget, reason, steps):
+    """Test that exceeding a budget stops the loop with a structured reason."""
+    exceeded = []
+    runner = ToolRunner(budget=budget)
+    runner.on_event(ToolRunner.Event.BUDGET_EXCEEDED, exceeded.append)
+    agent = CounterAgent(scripted_provider(counting(100)), tool_manager=runner)
+    ret, actions = agent.run("count forever")
+
+    assert ret[0] is None
+    assert agent.get_stop_reason()["reason"] == reason
+    assert exceeded == [agent.get_stop_reason()]
+    assert len(actions) == steps + 1
+    assert actions[-1]["event"] == "budget_exceeded"
+
+
+def test_cumulative_budget(scripted_provider):
+    """Test that a cumulative budget caps the agent across runs."""
+    agent = CounterAgent(scripted_provider(counting(1) + counting(1)), budget=Budget(max_tokens=30, cumulative=True))
+    agent.run("first")
+    assert agent.get_stop_reason() == {"reason": "stopped"}
+    ret, actions = agent.run("second")
+    assert agent.get_stop_reason() == {"reason": "max_tokens", "limit": 30, "used": 36}
+
+
+def test_cost_with_cached_tokens():
+    """Test that cached prompt tokens are charged at the cached price."""
+    budget = Budget(prices={"m": {"prompt": 2.0, "cached": 1.0, "completion": 8.0}})
+    usage = {"prompt_tokens": 1_000_000, "cached_tokens": 500_000, "completion_tokens": 100_000}
+    assert budget.cost("m", usage) == pytest.approx(1.0 + 0.5 + 0.8)
+    assert budget.cost("unknown", usage) == 0.0
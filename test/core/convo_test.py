@@ -2,6 +2,7 @@ from dopus.core import Convo
 
 import pytest
 import datetime
+import json
 from typing import List, Dict, Any
 
 
@@ -264,3 +265,14 @@ def test_merge_with_overlapping_timestamps():
     assert len(merged_messages) == 2
     assert merged_messages[0]["content"]["text"] == "First"
     assert merged_messages[1]["content"]["text"] == "Second"
+
+
+def test_size_tracks_messages(empty_convo: Convo):
+    """Test that the estimated size follows appends, replacements and removals."""
+    empty_convo.append("user", "hello")
+    empty_convo.add_tool_call({"id": "1", "name": "t", "args": {}}, "done")
+    assert empty_convo.size == sum(len(json.dumps(m)) for m in empty_convo.get_messages())
+    empty_convo.remove_all_of_type("tool_result")
+    assert empty_convo.size == sum(len(json.dumps(m)) for m in empty_convo.get_messages())
+    empty_convo.set_messages([])
+    assert empty_convo.size == 0
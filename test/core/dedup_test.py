@@ -0,0 +1,98 @@
+from dopus.core import Agent, LoopGuard, ToolRunner, tool
+from dopus.core.tool_registry import tool_registry
+
+
+class LookupAgent(Agent):
+    lookups = 0
+    writes = 0
+
+    def prompt(self):
+        return "Look up the records."
+
+    @tool(idempotent=True)
+    def lookup(self, key: str, fields: str):
+        """
+        Look up a record.
+
+        Args:
+            key (str): The record key.
+            fields (str): The fields to return.
+        """
+        LookupAgent.lookups += 1
+        if key == "missing":
+            return {"error": "not_found"}
+        return {"key": key, "value": LookupAgent.lookups}
+
+    @tool
+    def write(self, key: str):
+        """
+        Write a record.
+
+        Args:
+            key (str): The record key.
+        """
+        LookupAgent.writes += 1
+        return "written"
+
+
+def run(scripted_provider, script):
+    provider = scripted_provider(script)
+    agent = LookupAgent(provider, tool_manager=ToolRunner(loop_guard=LoopGuard(on_empty="stop", on_repeat=None)))
+    LookupAgent.lookups = LookupAgent.writes = 0
+    ret, actions = agent.run("go")
+    return agent, [action for action in actions if "dedup" in action]
+
+
+def lookup(key, fields="value"):
+    return {"name": "LookupAgent_lookup", "args": {"key": key, "fields": fields}}
+
+
+def test_idempotent_flag():
+    """Test that the idempotent flag is stored in the registry."""
+    assert tool_registry["LookupAgent_lookup"]["idempotent"] is True
+    assert tool_registry["LookupAgent_write"]["idempotent"] is False
+
+
+def test_repeat_returns_cached_result(scripted_provider):
+    """Test that a repeated idempotent call gets the earlier result without running the tool."""
+    agent, hits = run(scripted_provider, [lookup("a"), lookup("b"), lookup("a")])
+    assert LookupAgent.lookups == 2
+    assert len(hits) == 1
+    assert hits[0]["dedup"] == {"hits": 1, "tools": ["LookupAgent_lookup"], "run_hits": {"LookupAgent_lookup": 1}}
+    assert hits[0]["tool_called"]["result"]["cached_result"] is True
+    assert hits[0]["tool_called"]["result"]["result"] == {"key": "a", "value": 1}
+
+
+def test_canonical_arguments(scripted_provider):
+    """Test that arguments differing only in key order count as the same call."""
+    script = [
+        {"name": "LookupAgent_lookup", "args": {"key": "a", "fields": "x"}},
+        {"name": "LookupAgent_lookup", "args": {"fields": "x", "key": "a"}},
+        lookup("a", fields="y"),
+    ]
+    agent, hits = run(scripted_provider, script)
+    assert LookupAgent.lookups == 2
+    assert len(hits) == 1
+
+
+def test_errors_and_other_tools_not_cached(scripted_provider):
+    """Test that error results and tools not marked idempotent always run."""
+    script = [lookup("missing"), lookup("missing"), {"name": "LookupAgent_write", "args": {"key": "a"}},
+              {"name": "LookupAgent_write", "args": {"key": "a"}}]
+    agent, hits = run(scripted_provider, script)
+    assert LookupAgent.lookups == 2
+    assert LookupAgent.writes == 2
+    assert hits == []
+
+
+def test_table_reset_per_run(scripted_provider):
+    """Test that a new run starts with an empty table."""
+    provider = scripted_provider([lookup("a"), lookup("a"), None, lookup("a")])
+    runner = ToolRunner(loop_guard=LoopGuard(on_empty="stop"))
+    agent = LookupAgent(provider, tool_manager=runner)
+    LookupAgent.lookups = 0
+    agent.run("go")
+    assert runner.dedup_hits == {"LookupAgent_lookup": 1}
+    agent.run("again")
+    assert LookupAgent.lookups == 2
+    assert runner.dedup_hits == {}
@@ -0,0 +1,173 @@
+import threading
+import time
+
+from dopus.core import Agent, EventBus, ToolRunner, tool
+
+import pytest
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus(max_queue=2)
+    yield bus
+    bus.close(timeout=1)
+
+
+def test_sync_delivery(bus):
+    """Test that sync callbacks run on the publishing thread before publish returns."""
+    threads = []
+    bus.subscribe("e", lambda x: threads.append((x, threading.current_thread())))
+    bus.publish("e", 1)
+    assert threads == [(1, threading.current_thread())]
+
+
+def test_async_delivery_does_not_block(bus):
+    """Test that a slow async callback neither delays the publisher nor sync callbacks."""
+    release = threading.Event()
+    received, fast = [], []
+    bus.subscribe("e", lambda x: (release.wait(1), received.append(x)), mode="async")
+    bus.subscribe("e", fast.append)
+    start = time.perf_counter()
+    bus.publish("e", 1)
+    assert time.perf_counter() - start < 0.5
+    assert fast == [1] and received == []
+    release.set()
+    bus.flush()
+    assert received == [1]
+
+
+def test_drop_policy(bus):
+    """Test that events are dropped and counted once a callback's queue is full."""
+    release = threading.Event()
+    received = []
+    bus.subscribe("e", lambda x: (release.wait(1), received.append(x)), mode="async")
+    bus.publish("e", 0)
+    while bus.metrics()[0]["queued"]:
+        time.sleep(0.001)
+    for n in range(1, 6):
+        bus.publish("e", n)
+    release.set()
+    bus.flush()
+    metrics = bus.metrics()[0]
+    assert metrics["dropped"] == 3
+    assert metrics["delivered"] == len(received) == 3
+    assert metrics["lag"]["count"] == 3
+
+
+def test_block_policy():
+    """Test that the block policy makes the publisher wait instead of dropping events."""
+    bus = EventBus(max_queue=1, on_full="block")
+    received = []
+    bus.subscribe("e", lambda x: (time.sleep(0.01), received.append(x)), mode="async")
+    for n in range(5):
+        bus.publish("e", n)
+    bus.close()
+    assert received == [0, 1, 2, 3, 4]
+    assert bus.metrics()[0]["dropped"] == 0
+
+
+def test_close_timeout_abandons_events(caplog):
+    """Test that close returns after its timeout on a full queue and logs the abandoned events."""
+    bus = EventBus(max_queue=2)
+    release = threading.Event()
+    received = []
+    bus.subscribe("e", lambda x: (release.wait(1), received.append(x)), mode="async")
+    bus.publish("e", 0)
+    while bus.metrics()[0]["queued"]:
+        time.sleep(0.001)
+    bus.publish("e", 1)
+    bus.publish("e", 2)
+    start = time.perf_counter()
+    bus.close(timeout=0.05)
+    assert time.perf_counter() - start < 0.5
+    release.set()
+    deadline = time.perf_counter() + 1
+    while not bus.metrics()[0]["abandoned"] and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    assert received == [0]
+    assert bus.metrics()[0]["abandoned"] == 2
+    assert "Abandoned 2 queued events" in caplog.text
+
+
+def test_idle_workers_exit(scripted_provider):
+    """Test that short-lived runners with async callbacks do not leave worker threads behind."""
+    before = threading.active_count()
+    for _ in range(50):
+        runner = ToolRunner(event_bus=EventBus(idle_timeout=0.01))
+        runner.on_event(ToolRunner.Event.STOP, lambda result: None, mode="async")
+        runner._trigger_event(ToolRunner.Event.STOP, None)
+    deadline = time.perf_counter() + 2
+    while threading.active_count() > before and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == before
+
+
+def test_worker_restarts_after_idle():
+    """Test that an event published after the worker went idle is still delivered."""
+    bus = EventBus(idle_timeout=0.01)
+    received = []
+    bus.subscribe("e", received.append, mode="async")
+    bus.publish("e", 1)
+    time.sleep(0.05)
+    bus.publish("e", 2)
+    bus.flush()
+    assert received == [1, 2]
+
+
+def test_agent_close_stops_workers(scripted_provider):
+    """Test that closing an agent stops the workers of its async callbacks."""
+    before = threading.active_count()
+    runner = ToolRunner()
+    runner.on_event(ToolRunner.Event.STOP, lambda result: None, mode="async")
+    runner._trigger_event(ToolRunner.Event.STOP, None)
+    assert threading.active_count() == before + 1
+    EventsAgent(scripted_provider([]), tool_manager=runner).close()
+    assert threading.active_count() == before
+
+
+def test_async_errors_and_coroutines(bus):
+    """Test that async callback errors are counted and coroutine callbacks are awaited."""
+    received = []
+
+    async def observe(x):
+        received.append(x)
+
+    def fail(x):
+        raise RuntimeError("observer failed")
+
+    bus.subscribe("e", observe, mode="async")
+    bus.subscribe("e", fail, mode="async")
+    bus.publish("e", 1)
+    bus.flush()
+    assert received == [1]
+    assert [m["errors"] for m in bus.metrics()] == [0, 1]
+
+
+def test_invalid_options(bus):
+    """Test that unknown delivery modes and policies are rejected."""
+    with pytest.raises(ValueError):
+        bus.subscribe("e", print, mode="later")
+    with pytest.raises(ValueError):
+        EventBus(on_full="spill")
+
+
+class EventsAgent(Agent):
+    def prompt(self):
+        return "Finish."
+
+    @tool
+    def finish(self):
+        """Finish the run."""
+        self.stop("finished")
+
+
+def test_tool_runner_async_callback(scripted_provider):
+    """Test that ToolRunner delivers events to async callbacks off the loop thread."""
+    threads = []
+    runner = ToolRunner()
+    runner.on_event(ToolRunner.Event.STOP, lambda result: threads.append((result, threading.current_thread())), mode="async")
+    agent = EventsAgent(scripted_provider([{"name": "EventsAgent_finish"}]), tool_manager=runner)
+    agent.run("go")
+    runner.events.flush()
+    assert len(threads) == 1
+    assert threads[0][1] is not threading.current_thread()
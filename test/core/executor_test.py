@@ -0,0 +1,120 @@
+from dopus.core import Agent, ProcessToolExecutor, ToolRunner, tool
+from dopus.core.executor import ToolProcessCrashed, ToolTimeout
+
+import os
+import pytest
+import threading
+import time
+
+
+class CrunchAgent(Agent):
+
+    def prompt(self):
+        return "Crunch numbers."
+
+    @tool(executor="process")
+    def crunch(self, text: str):
+        """
+        Count characters in a worker process.
+
+        Args:
+            text (str): The text to count.
+        """
+        return {"pid": os.getpid(), "length": len(text), "detached": self is None}
+
+    @tool(executor="process")
+    def nap(self, seconds: float):
+        """
+        Sleep in a worker process.
+
+        Args:
+            seconds (float): How long to sleep.
+        """
+        time.sleep(seconds)
+        return os.getpid()
+
+    @tool(executor="process")
+    def crash(self):
+        """Kill the worker process."""
+        os._exit(1)
+
+    @tool
+    def finish(self):
+        """Stop the run."""
+        self.stop("finished")
+
+
+@pytest.fixture
+def executor():
+    """Fixture for a small process pool that is torn down after the test."""
+    pool = ProcessToolExecutor(max_workers=2, shared_memory_threshold=1024)
+    yield pool
+    pool.shutdown()
+
+
+def test_unknown_executor():
+    """Test that only known executors are accepted."""
+    with pytest.raises(ValueError):
+        tool(executor="gpu")
+
+
+def test_runs_in_worker_process(executor: ProcessToolExecutor):
+    """Test that process tools run outside the current process, including shared memory arguments."""
+    executor.start()
+    small = executor.run(CrunchAgent.crunch, {"text": "abc"})
+    large = executor.run(CrunchAgent.crunch, {"text": "x" * 4096})
+    assert small["pid"] != os.getpid()
+    assert small["detached"] is True
+    assert large["length"] == 4096
+
+
+def test_crash_is_isolated(executor: ProcessToolExecutor):
+    """Test that a crashing worker fails only its own call and the pool recovers."""
+    with pytest.raises(ToolProcessCrashed):
+        executor.run(CrunchAgent.crash, {})
+    assert executor.run(CrunchAgent.crunch, {"text": "ok"})["length"] == 2
+
+
+def test_crash_retries_other_calls(executor: ProcessToolExecutor):
+    """Test that calls in flight when another call crashes the pool are retried on a new pool."""
+    executor.start()
+    outcome = {}
+    napper = threading.Thread(target=lambda: outcome.update(pid=executor.run(CrunchAgent.nap, {"seconds": 0.5})))
+    napper.start()
+    time.sleep(0.1)
+    with pytest.raises(ToolProcessCrashed):
+        executor.run(CrunchAgent.crash, {})
+    napper.join()
+    assert outcome["pid"] != os.getpid()
+
+
+def test_timeout_frees_worker():
+    """Test that a tool that misses its deadline does not keep its worker busy."""
+    executor = ProcessToolExecutor(max_workers=1)
+    try:
+        executor.start()
+        with pytest.raises(ToolTimeout):
+            executor.run(CrunchAgent.nap, {"seconds": 10}, timeout=0.3)
+        start = time.perf_counter()
+        assert executor.run(CrunchAgent.crunch, {"text": "ok"})["length"] == 2
+        assert time.perf_counter() - start < 5
+    finally:
+        executor.shutdown()
+
+
+def test_runner_dispatches_to_pool(scripted_provider, executor: ProcessToolExecutor):
+    """Test that ToolRunner sends process tools to the pool and reports crashes as failures."""
+    failures = []
+    provider = scripted_provider([
+        {"name": "CrunchAgent_crunch", "args": {"text": "hello"}},
+        {"name": "CrunchAgent_crash"},
+        {"name": "CrunchAgent_finish"},
+    ])
+    runner = ToolRunner(process_executor=executor)
+    runner.on_event(ToolRunner.Event.TOOL_FAILED, lambda name, args, msg: failures.append(name))
+    agent = CrunchAgent(provider, tool_manager=runner)
+    agent.run("go")
+
+    actions = agent.get_actions()
+    assert actions[0]["tool_called"]["result"]["pid"] != os.getpid()
+    assert failures == ["CrunchAgent_crash"]
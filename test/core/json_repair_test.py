@@ -0,0 +1,109 @@
+from dopus.core import Agent, tool
+from dopus.core.json_repair import repair_json, parse_arguments, repair_stats
+
+import pytest
+
+
+@pytest.mark.parametrize("text, expected, fix", [
+    ('{"city": "Oslo",}', {"city": "Oslo"}, "trailing comma"),
+    ('{"days": [1, 2,],}', {"days": [1, 2]}, "trailing comma"),
+    ("{'city': 'Oslo'}", {"city": "Oslo"}, "single quotes"),
+    ('{"metric": True, "unit": None}', {"metric": True, "unit": None}, "python literal"),
+    ('{"query": {"city": "Oslo"', {"query": {"city": "Oslo"}}, "truncated"),
+    ('{"city": "Oslo", "days": [1, 2,', {"city": "Oslo", "days": [1, 2]}, "trailing comma"),
+    ('{"city": "it\\\'s"}', {"city": "it's"}, "invalid escape"),
+    ('{"note": "two\nlines"}', {"note": "two\nlines"}, "control character"),
+    ('{city: "Oslo"}', {"city": "Oslo"}, "unquoted key"),
+    ('```json\n{"city": "Oslo"}\n```', {"city": "Oslo"}, "surrounding text"),
+    ('{"days": (1, 2)}', {"days": [1, 2]}, "python literal"),
+])
+def test_repairs(text, expected, fix):
+    """Test that common defects in model-produced JSON are repaired."""
+    value, fixes = repair_json(text)
+    assert value == expected
+    assert fix in fixes
+
+
+def test_valid_json_is_untouched():
+    """Test that valid JSON is parsed without fixes."""
+    assert repair_json('{"city": "it\'s"}') == ({"city": "it's"}, [])
+
+
+@pytest.mark.parametrize("text", [
+    '{"a": "tr',
+    '{"a": 1 "b": 2}',
+    '{"a": tru',
+    '{"city": "Oslo", "days":',
+    "{'a': 'x' 'y'}",
+])
+def test_lossy_repairs_are_rejected(text):
+    """Test that defects that would change or drop content are not repaired."""
+    with pytest.raises(ValueError):
+        repair_json(text)
+
+
+def test_unrepairable():
+    """Test that text without a JSON object is rejected and counted."""
+    repair_stats.reset()
+    with pytest.raises(ValueError):
+        parse_arguments("I would call the weather tool")
+    with pytest.raises(ValueError):
+        parse_arguments("[1, 2]")
+    assert repair_stats.snapshot()["failed"] == 2
+
+
+class ForecastAgent(Agent):
+
+    def prompt(self):
+        return "Forecast the weather."
+
+    @tool
+    def forecast(self, city: str, days: int):
+        """
+        Forecast the weather.
+
+        Args:
+            city (str): The city.
+            days (int): Number of days.
+        """
+        self.stop(f"{city}:{days}")
+        return "sunny"
+
+
+@pytest.fixture
+def raw_provider(scripted_provider):
+    """Fixture for a provider whose tool calls carry raw argument strings, like OpenAI's."""
+    class RawProvider(scripted_provider):
+        def extract_tool_call_data(self, tool_call):
+            try:
+                args, repairs = parse_arguments(tool_call.args)
+            except ValueError as e:
+                return {"id": tool_call.id, "name": tool_call.name, "args": {}, "parse_error": str(e)}
+            return {"id": tool_call.id, "name": tool_call.name, "args": args, "repairs": repairs}
+    return RawProvider
+
+
+def test_repaired_call_runs(raw_provider):
+    """Test that a call with repairable arguments runs without another round trip."""
+    repair_stats.reset()
+    provider = raw_provider([{"name": "ForecastAgent_forecast", "args": "{'city': 'Oslo', 'days': 3,"}])
+    ret, actions = ForecastAgent(provider).run("weather?")
+    assert ret[0] == "Oslo:3"
+    assert len(provider.requests) == 1
+    assert repair_stats.snapshot()["repair_rate"] == 1.0
+
+
+def test_unrepairable_call_is_returned_to_model(raw_provider):
+    """Test that unrepairable arguments are reported to the model, which then retries."""
+    repair_stats.reset()
+    provider = raw_provider([
+        {"name": "ForecastAgent_forecast", "args": "city=Oslo"},
+        {"name": "ForecastAgent_forecast", "args": '{"city": "Oslo", "days": "3"}'},
+        {"name": "ForecastAgent_forecast", "args": '{"city": "Oslo", "days": 3}'},
+    ])
+    ret, actions = ForecastAgent(provider).run("weather?")
+    assert ret[0] == "Oslo:3"
+    assert actions[0]["tool_called"]["result"]["error"] == "malformed_arguments"
+    assert actions[1]["tool_called"]["result"]["error"] == "invalid_arguments"
+    stats = repair_stats.snapshot()
+    assert (stats["parsed"], stats["failed"], stats["repair_rate"]) == (2, 1, 0.0)
@@ -0,0 +1,107 @@
+from dopus.core import Agent, LoopGuard, ToolRunner, tool
+
+import pytest
+
+
+class PollAgent(Agent):
+    polls = 0
+
+    def prompt(self):
+        return "Poll the job."
+
+    @tool
+    def poll(self, job: str):
+        """
+        Poll a job.
+
+        Args:
+            job (str): The job id.
+        """
+        PollAgent.polls += 1
+        return "running"
+
+    @tool
+    def done_polling(self):
+        """Report that polling finished."""
+        return "finished"
+
+    @tool
+    def done(self):
+        """Stop polling."""
+        self.stop("done")
+
+
+def run(scripted_provider, script, guard):
+    records = []
+    runner = ToolRunner(loop_guard=guard)
+    runner.on_event(ToolRunner.Event.LOOP_GUARD, records.append)
+    provider = scripted_provider(script)
+    agent = PollAgent(provider, tool_manager=runner)
+    PollAgent.polls = 0
+    ret, actions = agent.run("poll job 1")
+    return agent, provider, list(actions), records
+
+
+def poll(job="1"):
+    return {"name": "PollAgent_poll", "args": {"job": job}}
+
+
+def test_empty_response_reprompt(scripted_provider):
+    """Test that a response without tool calls re-prompts the model, and repeated ones stop the run."""
+    agent, provider, actions, records = run(scripted_provider, [], LoopGuard(on_empty="reprompt", max_empty=3))
+    assert len(provider.requests) == 3
+    assert provider.requests[1][-1] == {"role": "user", "content": "Respond by calling one of the available tools."}
+    assert [r.get("action") for r in records] == ["reprompt", "reprompt", None]
+    assert agent.get_stop_reason() == {"reason": "no_tool_call", "count": 3}
+
+
+def test_empty_response_stop(scripted_provider):
+    """Test that the stop policy ends the run on the first response without tool calls."""
+    agent, provider, actions, records = run(scripted_provider, [poll()], LoopGuard(on_empty="stop"))
+    assert len(provider.requests) == 2
+    assert actions[-1]["reason"] == "no_tool_call"
+
+
+def test_empty_response_backoff(scripted_provider, monkeypatch):
+    """Test that the backoff policy waits longer after every response without tool calls."""
+    delays = []
+    monkeypatch.setattr("dopus.core.tool_runner.time.sleep", delays.append)
+    run(scripted_provider, [], LoopGuard(on_empty="backoff", max_empty=4, backoff=0.5, max_backoff=1.5))
+    assert delays == [0.5, 1.0, 1.5]
+
+
+def test_repeated_call_reuse(scripted_provider):
+    """Test that repeated identical calls get the previous result without running the tool."""
+    script = [poll()] * 4 + [{"name": "PollAgent_done"}]
+    agent, provider, actions, records = run(scripted_provider, script, LoopGuard(on_repeat="reuse", max_repeats=2))
+    assert PollAgent.polls == 2
+    assert agent.get_stop_reason() == {"reason": "stopped"}
+    reused = actions[2]["tool_called"]["result"]
+    assert reused["repeated_call"] and reused["result"] == "running"
+    assert records == [
+        {"event": "repeated_call", "action": "reuse", "tool": "PollAgent_poll", "count": 3},
+        {"event": "repeated_call", "action": "reuse", "tool": "PollAgent_poll", "count": 4},
+    ]
+
+
+def test_repeated_call_reuse_same_turn(scripted_provider):
+    """Test that a repeat within one turn reuses the result of its own earlier call."""
+    script = [{"name": "PollAgent_done_polling"}, [poll("2"), poll("2")], {"name": "PollAgent_done"}]
+    agent, provider, actions, records = run(scripted_provider, script, LoopGuard(on_repeat="reuse", max_repeats=1))
+    assert PollAgent.polls == 1
+    first, repeat = actions[1]["tool_calls"]
+    assert first["result"] == "running"
+    assert repeat["result"]["repeated_call"] and repeat["result"]["result"] == "running"
+
+
+def test_repeated_call_stop(scripted_provider):
+    """Test that the stop policy ends a run stuck on one call."""
+    agent, provider, actions, records = run(scripted_provider, [poll()] * 10, LoopGuard(max_repeats=2))
+    assert PollAgent.polls == 2
+    assert agent.get_stop_reason() == {"reason": "repeated_call", "tool": "PollAgent_poll", "count": 3}
+
+
+def test_invalid_policy():
+    """Test that unknown policies are rejected."""
+    with pytest.raises(ValueError):
+        LoopGuard(on_empty="retry")
@@ -0,0 +1,76 @@
+from dopus.core import Agent, tool, Profiler
+
+import time
+
+
+class SleepyAgent(Agent):
+
+    def prompt(self):
+        return "Take a nap."
+
+    @tool
+    def nap(self, seconds: float):
+        """
+        Sleep for a while.
+
+        Args:
+            seconds (float): How long to sleep.
+        """
+        time.sleep(seconds)
+        self.stop("rested")
+        return "done"
+
+
+def test_profile_run(scripted_provider, tmp_path):
+    """Test that a profiled run records phases, tools and collapsed stacks."""
+    path = tmp_path / "profile.folded"
+    provider = scripted_provider([{"name": "SleepyAgent_nap", "args": {"seconds": 0.02}}])
+    agent = SleepyAgent(provider)
+    agent.run("sleep", profile=Profiler(trace_memory=True, collapsed_path=str(path)))
+
+    profile = agent.get_profile()
+    phases = profile.phases()
+    assert {"request", "format_messages", "extract_tool_call_data", "_call_tool"} <= set(phases)
+    assert phases["_call_tool"]["wall"] >= 0.02
+    assert phases["_call_tool"]["cpu"] < phases["_call_tool"]["wall"]
+    assert profile.tools()["SleepyAgent_nap"]["calls"] == 1
+
+    lines = path.read_text().splitlines()
+    assert any(line.startswith("tool_runner.execute;tool_runner.dispatch;tool.call[SleepyAgent_nap] ") for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in lines)
+    assert "tool:SleepyAgent_nap" in profile.summary()
+
+
+def test_profile_disabled_by_default(scripted_provider):
+    """Test that runs are not profiled unless requested."""
+    provider = scripted_provider([{"name": "SleepyAgent_nap", "args": {"seconds": 0}}])
+    agent = SleepyAgent(provider)
+    agent.run("sleep")
+    assert agent.get_profile() is None
+
+
+class BusyAgent(Agent):
+
+    def prompt(self):
+        return "Work."
+
+    @tool(timeout=10)
+    def spin(self, seconds: float):
+        """
+        Keep the CPU busy for a while.
+
+        Args:
+            seconds (float): How long to spin.
+        """
+        end = time.thread_time() + seconds
+        while time.thread_time() < end:
+            pass
+        self.stop("spun")
+
+
+def test_profile_worker_thread_cpu(scripted_provider):
+    """Test that CPU time of tools running on a worker thread is attributed to the tool."""
+    provider = scripted_provider([{"name": "BusyAgent_spin", "args": {"seconds": 0.05}}])
+    agent = BusyAgent(provider)
+    agent.run("spin", profile=True)
+    assert agent.get_profile().tools()["BusyAgent_spin"]["cpu"] >= 0.04
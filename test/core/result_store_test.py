@@ -0,0 +1,167 @@
+import json
+
+from dopus.core import Agent, ResultStore, ToolRunner, tool, tool_registry
+from dopus.core.result_store import READ_RESULT_TOOL
+
+import pytest
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request, tmp_path):
+    directory = str(tmp_path / "results") if request.param == "file" else None
+    return ResultStore(threshold=100, page_size=40, preview_chars=10, directory=directory)
+
+
+def test_small_results_kept(store):
+    """Test that results under the threshold are returned unchanged."""
+    assert store.offload("tool", "short") == "short"
+    assert store.offload("tool", {"a": 1}) == {"a": 1}
+    assert len(store) == 0
+
+
+def test_offload_and_page(store):
+    """Test that a large result is replaced by a preview and can be read back page by page."""
+    text = "".join(f"line {n}\n" for n in range(50))
+    stored = store.offload("fetch", text)
+    assert stored["preview"] == text[:10]
+    assert stored["size"] == len(text)
+    pages, offset = [], 0
+    while offset is not None:
+        page = store.read(stored["stored_result"], offset, 1000)
+        assert len(page["content"]) <= 40
+        pages.append(page["content"])
+        offset = page["next_offset"]
+    assert "".join(pages) == text
+
+
+def test_structured_preview(store):
+    """Test that stored lists and dicts describe their structure."""
+    rows = [{"id": n, "name": f"row {n}"} for n in range(20)]
+    stored = store.offload("query", rows)
+    assert stored["structure"] == {"type": "array", "items": 20}
+    content = "".join(store.read(stored["stored_result"], offset, 40)["content"] for offset in range(0, stored["size"], 40))
+    assert json.loads(content) == rows
+
+
+def test_pages_cut_at_character_boundaries(store):
+    """Test that pages never split a multi-byte character."""
+    text = "äöü€" * 40
+    handle = store.offload("tool", text)["stored_result"]
+    pages, offset = [], 0
+    while offset is not None:
+        page = store.read(handle, offset, 7)
+        pages.append(page["content"])
+        offset = page["next_offset"]
+    assert "".join(pages) == text
+
+
+def test_eviction(tmp_path):
+    """Test that the least recently used results are evicted over max_bytes."""
+    store = ResultStore(threshold=10, max_bytes=250, directory=str(tmp_path))
+    handles = [store.put(bytes([65 + n]) * 100) for n in range(2)]
+    store.read(handles[0])
+    third = store.put(b"C" * 100)
+    assert handles[1] not in store and handles[0] in store and third in store
+    assert store.evicted == 1 and store.size == 200
+    assert store.read(handles[1])["error"] == "unknown_handle"
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+class ReportAgent(Agent):
+
+    def prompt(self):
+        return "Read the report."
+
+    @tool
+    def fetch_report(self):
+        """Fetch the report."""
+        return "x" * 500
+
+    @tool
+    def done(self, summary: str):
+        """
+        Finish.
+
+        Args:
+            summary (str): The summary.
+        """
+        self.stop(summary)
+
+
+def test_agent_reads_stored_result(scripted_provider):
+    """Test that the conversation keeps a handle and the model reads the result with read_result."""
+    store = ResultStore(threshold=100, page_size=200)
+    provider = scripted_provider([{"name": "ReportAgent_fetch_report"}])
+    agent = ReportAgent(provider, result_store=store)
+    ret, actions = agent.run("summarize")
+    handle = actions[0]["tool_called"]["result"]["stored_result"]
+    provider.script = [
+        {"name": READ_RESULT_TOOL, "args": {"handle": handle, "offset": 0, "length": 1000}},
+        {"name": "ReportAgent_done", "args": {"summary": "all x"}},
+    ]
+    ret, actions = agent.run("read it")
+    page = actions[0]["tool_called"]["result"]
+    assert page["content"] == "x" * 200 and page["next_offset"] == 200
+    assert ret[0] == "all x"
+    assert all("x" * 500 not in json.dumps(message) for message in provider.requests[-1])
+
+
+def test_read_result_stays_out_of_shared_registry(scripted_provider):
+    """Test that the read_result tool is defined per runner and removed with the store."""
+    offered = []
+
+    class ToolsProvider(scripted_provider):
+        def request(self, messages, registry, tools=None, system_prompt=""):
+            offered.append(self.get_tools(tools, registry))
+            return super().request(messages, registry, tools, system_prompt)
+
+    provider = ToolsProvider([{"name": "ReportAgent_done", "args": {"summary": "-"}}])
+    runner = ToolRunner(result_store=ResultStore())
+    ReportAgent(provider, tool_manager=runner).run("summarize")
+    assert READ_RESULT_TOOL in offered[-1]
+    assert READ_RESULT_TOOL not in tool_registry
+
+    runner.set_result_store(None)
+    provider.script = [{"name": "ReportAgent_done", "args": {"summary": "-"}}]
+    ReportAgent(provider, tool_manager=runner).run("summarize")
+    assert READ_RESULT_TOOL not in offered[-1]
+
+
+class CatalogAgent(Agent):
+
+    def prompt(self):
+        return "Browse the catalog."
+
+    @tool(idempotent=True)
+    def page(self, name: str):
+        """
+        Fetch a catalog page.
+
+        Args:
+            name (str): The page name.
+        """
+        return name * 3000
+
+    @tool
+    def done(self):
+        """Finish."""
+        self.stop("done")
+
+
+def test_reused_result_gets_a_live_handle(scripted_provider):
+    """Test that a cached idempotent result is stored again instead of returning an evicted handle."""
+    store = ResultStore(threshold=1000, max_bytes=6000)
+    agent = CatalogAgent(scripted_provider([
+        {"name": "CatalogAgent_page", "args": {"name": "a"}},
+        {"name": "CatalogAgent_page", "args": {"name": "b"}},
+        {"name": "CatalogAgent_page", "args": {"name": "a"}},
+        {"name": "CatalogAgent_done"},
+    ]), result_store=store)
+    ret, actions = agent.run("browse")
+    first = actions[0]["tool_called"]["result"]["stored_result"]
+    assert first not in store
+    reused = actions[2]["tool_called"]["result"]
+    assert reused["cached_result"] is True
+    handle = reused["result"]["stored_result"]
+    assert handle in store
+    assert store.read(handle, 0, 10)["content"] == "a" * 10
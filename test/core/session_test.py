@@ -0,0 +1,113 @@
+from dopus.core import Agent, SessionManager, tool
+
+import pytest
+
+
+class ChatAgent(Agent):
+
+    def prompt(self):
+        return "Chat."
+
+    @tool
+    def reply(self, text: str):
+        """
+        Reply to the user.
+
+        Args:
+            text (str): The reply.
+        """
+        self.stop(text)
+        return text
+
+
+@pytest.fixture
+def manager(tmp_path, scripted_provider):
+    """Fixture for a session manager holding at most two sessions in memory."""
+    class EchoProvider(scripted_provider):
+        def request(self, messages, registry, tools=None, system_prompt=""):
+            user_messages = [m for m in messages if m["role"] == "user" and m["type"] == "default"]
+            self.script = [{"name": "ChatAgent_reply", "args": {"text": f"turn {len(user_messages)}"}}]
+            return super().request(messages, registry, tools, system_prompt)
+
+    factory = lambda session_id: ChatAgent(EchoProvider([]), name=session_id)
+    return SessionManager(factory, str(tmp_path / "sessions"), max_sessions=2)
+
+
+def reply(run_result):
+    ret, actions = run_result
+    return ret[0]
+
+
+def test_lru_eviction_and_restore(manager: SessionManager):
+    """Test that the least recently used session is evicted and restored with its history."""
+    assert reply(manager.run("alice", "hi")) == "turn 1"
+    assert reply(manager.run("bob", "hi")) == "turn 1"
+    assert reply(manager.run("alice", "again")) == "turn 2"
+    manager.run("carol", "hi")
+
+    assert manager.in_memory() == ["alice", "carol"]
+    assert manager.evictions == 1
+
+    assert reply(manager.run("bob", "back")) == "turn 2"
+    assert manager.restores == 1
+    assert "alice" not in manager.in_memory()
+
+
+def test_restored_state(manager: SessionManager):
+    """Test that a restored session keeps its conversation and last actions."""
+    manager.run("dave", "hello")
+    with manager.session("dave") as agent:
+        state = agent.get_state()
+    manager.evict("dave")
+    assert "dave" not in manager.in_memory()
+
+    with manager.session("dave") as agent:
+        restored = agent.get_state()
+    assert restored["messages"] == state["messages"]
+    assert restored["actions"][0]["tool_called"]["result"] == "turn 1"
+
+
+def test_memory_budget(tmp_path, manager: SessionManager):
+    """Test that sessions are evicted when their estimated size exceeds the budget."""
+    manager.max_sessions = None
+    manager.max_memory = 1
+    manager.run("erin", "hello")
+    manager.run("frank", "hello")
+    assert manager.in_memory() == ["frank"]
+
+
+def test_idle_sweep(manager: SessionManager):
+    """Test that idle sessions are evicted by sweep."""
+    manager.idle_timeout = 0
+    manager.run("gina", "hello")
+    assert manager.sweep() == 1
+    assert manager.in_memory() == []
+
+
+def test_restored_totals(manager: SessionManager):
+    """Test that a restored session keeps its usage totals, step count and stop reason."""
+    manager.run("hana", "hello")
+    manager.run("hana", "again")
+    with manager.session("hana") as agent:
+        usage, total, stop_reason = agent.get_usage(), agent.get_usage(total=True), agent.get_stop_reason()
+    manager.evict("hana")
+
+    with manager.session("hana") as restored:
+        assert restored is not agent
+        assert restored.get_usage() == usage
+        assert restored.get_usage(total=True) == total == {k: 2 * v for k, v in usage.items()}
+        assert restored.get_stop_reason() == stop_reason == {"reason": "stopped"}
+        assert restored.get_state()["runner"]["total_steps"] == 2
+
+
+def test_held_session_is_not_evicted(manager: SessionManager):
+    """Test that a session held by a caller survives other sessions pushing it over the budget."""
+    with manager.session("ivan") as agent:
+        manager.run("jane", "hello")
+        manager.run("kate", "hello")
+        assert "ivan" in manager.in_memory()
+        agent.reset()
+    manager.run("leo", "hello")
+    assert "ivan" not in manager.in_memory()
+    with manager.session("ivan") as restored:
+        assert restored.get_state()["messages"] == []
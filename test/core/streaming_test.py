@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+import time
+
+from dopus.core import Agent, ToolRunner, tool
+from dopus.core.tool_registry import tool_registry
+
+
+class CrawlAgent(Agent):
+    produced = 0
+
+    def prompt(self):
+        return "Crawl."
+
+    @tool
+    def crawl(self, pages: int):
+        """
+        Crawl pages.
+
+        Args:
+            pages (int): The number of pages.
+        """
+        for n in range(pages):
+            CrawlAgent.produced += 1
+            yield f"page {n};"
+
+    @tool(max_chunks=2)
+    async def search(self, query: str):
+        """
+        Search.
+
+        Args:
+            query (str): The query.
+        """
+        for n in range(10):
+            await asyncio.sleep(0)
+            CrawlAgent.produced += 1
+            yield {"hit": n, "query": query}
+
+    @tool(timeout=0.2)
+    def slow(self):
+        """Produce pages slowly."""
+        yield "first;"
+        time.sleep(1)
+        yield "second;"
+
+
+def run(scripted_provider, call, **runner_options):
+    chunks = []
+    runner = ToolRunner(**runner_options)
+    runner.on_event(ToolRunner.Event.TOOL_CHUNK, lambda *chunk: chunks.append(chunk))
+    agent = CrawlAgent(scripted_provider([call]), tool_manager=runner)
+    CrawlAgent.produced = 0
+    ret, actions = agent.run("go")
+    return actions[0]["tool_called"]["result"], chunks
+
+
+def test_streaming_registry_flag():
+    """Test that generator tools are registered as streaming tools."""
+    assert tool_registry["CrawlAgent_crawl"]["streaming"] is True
+    assert tool_registry["CrawlAgent_search"]["max_chunks"] == 2
+
+
+def test_process_generator_rejected():
+    """Test that generator tools cannot be sent to the process executor."""
+    def pages(self, url: str):
+        """
+        Fetch pages.
+
+        Args:
+            url (str): The first page.
+        """
+        yield url
+
+    async def feed(self, url: str):
+        """
+        Fetch a feed.
+
+        Args:
+            url (str): The feed.
+        """
+        yield url
+
+    for func in (pages, feed):
+        with pytest.raises(ValueError):
+            tool(func, executor="process")
+    assert not any(name.endswith("_pages") for name in tool_registry)
+
+
+def test_generator_chunks_forwarded(scripted_provider):
+    """Test that every chunk reaches TOOL_CHUNK listeners and the chunks are joined into the result."""
+    result, chunks = run(scripted_provider, {"name": "CrawlAgent_crawl", "args": {"pages": 3}})
+    assert result == "page 0;page 1;page 2;"
+    assert chunks == [("CrawlAgent_crawl", f"page {n};", n) for n in range(3)]
+
+
+def test_max_chars_stops_generator(scripted_provider):
+    """Test that a generator is closed once the size cap is reached and the result is marked as truncated."""
+    result, chunks = run(scripted_provider, {"name": "CrawlAgent_crawl", "args": {"pages": 100}}, stream_max_chars=10)
+    assert result["result"] == "page 0;pag"
+    assert result["truncated"] == "max_chars"
+    assert CrawlAgent.produced == 2
+
+
+def test_async_generator_max_chunks(scripted_provider):
+    """Test that async generators stream and stop at their declared chunk cap."""
+    result, chunks = run(scripted_provider, {"name": "CrawlAgent_search", "args": {"query": "q"}})
+    assert result["result"] == [{"hit": 0, "query": "q"}, {"hit": 1, "query": "q"}]
+    assert result["truncated"] == "max_chunks"
+    assert len(chunks) == 2 and CrawlAgent.produced == 2
+
+
+def test_timeout_keeps_partial_result(scripted_provider):
+    """Test that a streaming tool missing its deadline returns the chunks produced so far."""
+    result, chunks = run(scripted_provider, {"name": "CrawlAgent_slow"})
+    assert result["result"] == "first;"
+    assert result["truncated"] == "timeout"
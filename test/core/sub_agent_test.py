@@ -0,0 +1,129 @@
+from dopus.core import Agent, Budget, ToolRunner, tool
+
+import time
+
+
+class ResearchAgent(Agent):
+    """Research a topic and report back."""
+
+    def prompt(self):
+        return "Research the topic."
+
+    @tool
+    def report(self, topic: str):
+        """
+        Report findings.
+
+        Args:
+            topic (str): The researched topic.
+        """
+        time.sleep(0.2)
+        self.stop(f"notes on {topic}")
+
+
+class LeadAgent(Agent):
+
+    def prompt(self):
+        return "Delegate research."
+
+    @tool
+    def finish(self):
+        """Stop the run."""
+        self.stop("done")
+
+
+def child_provider(scripted_provider):
+    class ChildProvider(scripted_provider):
+        def request(self, messages, registry, tools=None, system_prompt=""):
+            topic = messages[-1]["content"]
+            self.script = [{"name": "ResearchAgent_report", "args": {"topic": topic}}]
+            return super().request(messages, registry, tools, system_prompt)
+
+    return ChildProvider([], model="child")
+
+
+def test_sub_agents_run_concurrently(scripted_provider):
+    """Test that sub-agent calls in one turn run in parallel on isolated conversations."""
+    tool_name = ResearchAgent.as_tool(child_provider(scripted_provider))
+    assert tool_name == "ResearchAgent_agent"
+
+    parent_provider = scripted_provider([
+        [
+            {"name": tool_name, "args": {"message": "cats"}},
+            {"name": tool_name, "args": {"message": "dogs"}},
+        ],
+        {"name": "LeadAgent_finish"},
+    ], model="parent")
+    lead = LeadAgent(parent_provider)
+    lead.add_tool(tool_name)
+
+    start = time.perf_counter()
+    lead.run("compare pets")
+    assert time.perf_counter() - start < 0.35
+
+    first = lead.get_actions()[0]
+    assert first["tool_called"]["result"] == "notes on cats"
+    runs = first["sub_agents"]
+    assert [run["result"] for run in runs] == ["notes on cats", "notes on dogs"]
+    assert runs[0]["usage"]["total_tokens"] == 12
+    assert len(runs[1]["actions"]) == 1
+
+    # Both results reach the parent conversation; the children's messages do not.
+    second_request = parent_provider.requests[1]
+    tool_results = [m["content"] for m in second_request if m["role"] == "tool"]
+    assert tool_results == ["notes on cats", "notes on dogs"]
+    assert len(second_request) == 5
+
+
+def test_as_tool_description():
+    """Test that the tool description defaults to the class docstring."""
+    registry = {}
+    ResearchAgent.as_tool(None, name="researcher", registry=registry)
+    assert registry["researcher"]["description"] == "Research a topic and report back."
+    assert registry["researcher"]["required"] == ["message"]
+
+
+class TallyAgent(Agent):
+    """Count before reporting."""
+
+    def prompt(self):
+        return "Count, then report."
+
+    @tool
+    def count(self, n: int):
+        """
+        Count once.
+
+        Args:
+            n (int): The number counted.
+        """
+        return n
+
+    @tool
+    def total(self):
+        """Report the count."""
+        self.stop("counted")
+
+
+def test_sub_agent_usage_and_cost(scripted_provider):
+    """Test that the parent is charged every token and the cost of a sub-agent, even those evicted from its log."""
+    child = scripted_provider([
+        {"name": "TallyAgent_count", "args": {"n": 1}},
+        {"name": "TallyAgent_count", "args": {"n": 2}},
+        {"name": "TallyAgent_total"},
+    ], model="child")
+    tool_name = TallyAgent.as_tool(
+        child, name="tally", tool_manager=ToolRunner(max_actions=1),
+        budget=Budget(prices={"child": {"prompt": 100000.0}}),
+    )
+    lead = LeadAgent(scripted_provider([{"name": tool_name, "args": {"message": "go"}}, {"name": "LeadAgent_finish"}], model="parent"))
+    lead.add_tool(tool_name)
+    lead.run("count")
+
+    run = lead.get_actions()[0]["sub_agents"][0]
+    assert len(run["actions"]) == 1
+    assert run["usage"]["total_tokens"] == 36
+    assert run["cost"] == 3.0
+    usage = lead.get_usage()
+    assert usage["total_tokens"] == 36 + 24
+    assert usage["cost"] == 3.0
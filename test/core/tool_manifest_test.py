@@ -0,0 +1,81 @@
+import inspect
+
+from dopus.core import Agent, ToolRunner, tool
+
+
+class BaseShopAgent(Agent):
+
+    def prompt(self):
+        return "Shop."
+
+    @tool
+    def browse(self):
+        """Browse the shop."""
+        return f"browsing {self.shop}"
+
+    @tool
+    def pay(self):
+        """Pay."""
+        return "paid"
+
+    shop = "base"
+
+
+class CornerShopAgent(BaseShopAgent):
+    shop = "corner"
+
+    @tool
+    def browse(self):
+        """Browse the corner shop."""
+        return f"browsing the {self.shop} shop"
+
+    def pay(self):
+        return "not a tool"
+
+    @tool
+    def leave(self):
+        """Leave the shop."""
+        self.stop("left")
+
+
+def run(scripted_provider, agent_class, calls):
+    runner = ToolRunner()
+    agent = agent_class(scripted_provider(calls), tool_manager=runner)
+    ret, actions = agent.run("go")
+    return ret, [action["tool_called"]["result"] for action in actions if "tool_called" in action]
+
+
+def test_inherited_tools(scripted_provider):
+    """Test that subclasses inherit tools and overriding methods replace them."""
+    ret, results = run(scripted_provider, CornerShopAgent, [
+        {"name": "CornerShopAgent_browse"},
+        {"name": "BaseShopAgent_pay"},
+        {"name": "CornerShopAgent_leave"},
+    ])
+    assert results[0] == "browsing the corner shop"
+    assert results[1] is None
+    assert ret[0] == "left"
+
+
+def test_base_class_tools(scripted_provider):
+    """Test that each class keeps its own manifest."""
+    ret, results = run(scripted_provider, BaseShopAgent, [{"name": "BaseShopAgent_browse"}, {"name": "BaseShopAgent_pay"}])
+    assert results == ["browsing base", "paid"]
+
+
+def test_methods_resolved_per_instance(scripted_provider):
+    """Test that tools are bound to the instance that is running when they are called."""
+    provider = scripted_provider([{"name": "BaseShopAgent_browse"}])
+    agent = BaseShopAgent(provider)
+    agent.shop = "market"
+    ret, actions = agent.run("go")
+    assert actions[0]["tool_called"]["result"] == "browsing market"
+
+
+def test_construction_skips_reflection(monkeypatch):
+    """Test that constructing an agent does not inspect its members."""
+    def fail(*args, **kwargs):
+        raise AssertionError("getmembers called")
+
+    monkeypatch.setattr(inspect, "getmembers", fail)
+    CornerShopAgent(None)
@@ -0,0 +1,83 @@
+from dopus.core.tool_registry import SchemaCache
+
+import json
+import pytest
+
+
+def sample_tool(self, query: str, limit: int):
+    """
+    Search for records.
+
+    Args:
+        query (str): The search query.
+        limit (int): Maximum number of records.
+    """
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    """Fixture for a schema cache file location."""
+    return str(tmp_path / "schemas.json")
+
+
+def test_disabled_without_path():
+    """Test that the cache is a no-op when no path is configured."""
+    cache = SchemaCache()
+    cache.put(sample_tool, {"query": {"type": "string"}}, ["query"])
+    assert cache.get(sample_tool) is None
+
+
+def test_round_trip_across_instances(cache_path: str):
+    """Test that flushed schemas are loaded by a new cache instance."""
+    properties = {"query": {"type": "string"}, "limit": {"type": "integer"}}
+    cache = SchemaCache(cache_path)
+    assert cache.get(sample_tool) is None
+    cache.put(sample_tool, properties, ["query", "limit"])
+    cache.flush()
+
+    reloaded = SchemaCache(cache_path)
+    assert reloaded.get(sample_tool) == (properties, ["query", "limit"])
+
+
+def test_key_changes_with_definition():
+    """Test that changing the docstring or signature changes the key."""
+    def first(self, query: str):
+        """Search."""
+
+    def second(self, query: str):
+        """Search for records."""
+
+    def third(self, query: int):
+        """Search."""
+
+    second.__qualname__ = third.__qualname__ = first.__qualname__
+    keys = {SchemaCache.key(first), SchemaCache.key(second), SchemaCache.key(third)}
+    assert len(keys) == 3
+
+
+def test_stale_entries_are_replaced(cache_path: str):
+    """Test that storing a new version of a function drops the old entry."""
+    def search(self, query: str):
+        """Search."""
+
+    def search_v2(self, query: str, limit: int):
+        """Search."""
+
+    search_v2.__qualname__ = search.__qualname__
+    cache = SchemaCache(cache_path)
+    cache.put(search, {"query": {}}, ["query"])
+    cache.put(search_v2, {"query": {}, "limit": {}}, ["query", "limit"])
+    cache.flush()
+
+    with open(cache_path) as file:
+        entries = json.load(file)["entries"]
+    assert len(entries) == 1
+    assert cache.get(search) is None
+
+
+def test_unreadable_file_is_ignored(cache_path: str):
+    """Test that a corrupt cache file is treated as empty."""
+    with open(cache_path, "w") as file:
+        file.write("{not json")
+    cache = SchemaCache(cache_path)
+    assert cache.get(sample_tool) is None
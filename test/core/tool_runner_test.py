@@ -0,0 +1,149 @@
+from dopus.core import Agent, ToolRunner, tool
+
+import asyncio
+import time
+
+
+class SlowAgent(Agent):
+    cancelled = False
+
+    def prompt(self):
+        return "Look things up."
+
+    @tool(timeout=0.05)
+    def slow_lookup(self, key: str):
+        """
+        Look up a key in a slow backend.
+
+        Args:
+            key (str): The key to look up.
+        """
+        time.sleep(1)
+        return key
+
+    @tool(timeout=0)
+    def instant_lookup(self, key: str):
+        """
+        Look up a key in a backend that must answer at once.
+
+        Args:
+            key (str): The key to look up.
+        """
+        time.sleep(0.2)
+        return key
+
+    @tool
+    def fast_lookup(self, key: str):
+        """
+        Look up a key in a fast backend.
+
+        Args:
+            key (str): The key to look up.
+        """
+        return key.upper()
+
+    @tool
+    async def async_lookup(self, key: str):
+        """
+        Look up a key asynchronously.
+
+        Args:
+            key (str): The key to look up.
+        """
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            SlowAgent.cancelled = True
+            raise
+        return key
+
+    @tool
+    async def async_echo(self, key: str):
+        """
+        Echo a key asynchronously.
+
+        Args:
+            key (str): The key to echo.
+        """
+        await asyncio.sleep(0)
+        return key
+
+    @tool
+    def finish(self):
+        """Stop the run."""
+        self.stop("finished")
+
+
+def run_slow_agent(scripted_provider, script, **runner_options):
+    timeouts = []
+    runner = ToolRunner(**runner_options)
+    runner.on_event(ToolRunner.Event.TOOL_TIMEOUT, lambda name, args, msg: timeouts.append(name))
+    agent = SlowAgent(scripted_provider(script + [{"name": "SlowAgent_finish"}]), tool_manager=runner)
+    agent.run("go")
+    return agent.get_actions(), timeouts
+
+
+def test_per_tool_timeout(scripted_provider):
+    """Test that a tool exceeding its own deadline returns a timeout result."""
+    start = time.perf_counter()
+    actions, timeouts = run_slow_agent(scripted_provider, [{"name": "SlowAgent_slow_lookup", "args": {"key": "a"}}])
+    assert time.perf_counter() - start < 0.5
+    assert timeouts == ["SlowAgent_slow_lookup"]
+    result = actions[0]["tool_called"]["result"]
+    assert result["error"] == "timeout"
+    assert result["timeout"] == 0.05
+    assert result["message"].endswith("was abandoned.")
+
+
+def test_zero_timeout_is_a_deadline(scripted_provider):
+    """Test that a tool timeout of 0 is applied rather than replaced by the runner's default."""
+    actions, timeouts = run_slow_agent(scripted_provider, [{"name": "SlowAgent_instant_lookup", "args": {"key": "a"}}], tool_timeout=5)
+    assert timeouts == ["SlowAgent_instant_lookup"]
+    assert actions[0]["tool_called"]["result"]["timeout"] == 0
+
+
+def test_runner_default_timeout_cancels_async_tools(scripted_provider):
+    """Test that the runner's default deadline applies to tools without one and cancels coroutines."""
+    SlowAgent.cancelled = False
+    actions, timeouts = run_slow_agent(
+        scripted_provider,
+        [
+            {"name": "SlowAgent_fast_lookup", "args": {"key": "a"}},
+            {"name": "SlowAgent_async_lookup", "args": {"key": "b"}},
+        ],
+        tool_timeout=0.05,
+    )
+    assert actions[0]["tool_called"]["result"] == "A"
+    assert actions[1]["tool_called"]["result"]["error"] == "timeout"
+    assert timeouts == ["SlowAgent_async_lookup"]
+    assert SlowAgent.cancelled
+
+
+def test_async_tool_without_timeout(scripted_provider):
+    """Test that async tools run to completion when no deadline applies."""
+    actions, timeouts = run_slow_agent(scripted_provider, [{"name": "SlowAgent_async_echo", "args": {"key": "x"}}])
+    assert actions[0]["tool_called"]["result"] == "x"
+    assert timeouts == []
+
+
+def test_async_tool_inside_running_loop(scripted_provider):
+    """Test that async tools still run when the agent is called from a thread with a running event loop."""
+    async def main():
+        return run_slow_agent(scripted_provider, [{"name": "SlowAgent_async_echo", "args": {"key": "x"}}])
+
+    actions, timeouts = asyncio.run(main())
+    assert actions[0]["tool_called"]["result"] == "x"
+
+
+def test_every_call_of_a_step_is_logged(scripted_provider):
+    """Test that the step log lists every tool call of a turn with its result."""
+    actions, _ = run_slow_agent(scripted_provider, [[
+        {"name": "SlowAgent_fast_lookup", "args": {"key": "a"}},
+        {"name": "SlowAgent_fast_lookup", "args": {"key": "b"}},
+    ]])
+    calls = actions[0]["tool_calls"]
+    assert [(call["name"], call["arguments"], call["result"]) for call in calls] == [
+        ("SlowAgent_fast_lookup", {"key": "a"}, "A"),
+        ("SlowAgent_fast_lookup", {"key": "b"}, "B"),
+    ]
+    assert actions[0]["tool_called"]["result"] == "A"
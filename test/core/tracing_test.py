@@ -0,0 +1,105 @@
+from dopus.core import Agent, tool, Tracer, InMemorySink, JsonlSink
+from dopus.core.tracing import NOOP_SPAN, span
+
+import json
+import pytest
+
+
+class CountingAgent(Agent):
+
+    def prompt(self):
+        return "Count to two."
+
+    @tool
+    def count(self, n: int):
+        """
+        Record a number.
+
+        Args:
+            n (int): The number to record.
+        """
+        if n >= 2:
+            self.stop(n)
+        return f"counted {n}"
+
+
+@pytest.fixture
+def collector() -> InMemorySink:
+    """Fixture for an in-memory span collector."""
+    return InMemorySink()
+
+
+def run_agent(scripted_provider, tracer):
+    provider = scripted_provider([
+        {"name": "CountingAgent_count", "args": {"n": 1}},
+        {"name": "CountingAgent_count", "args": {"n": 2}},
+    ])
+    agent = CountingAgent(provider, tracer=tracer)
+    agent.run("go")
+
+
+def test_disabled_tracer_returns_noop():
+    """Test that a tracer without sinks creates no spans."""
+    tracer = Tracer()
+    assert not tracer.enabled
+    assert tracer.span("anything") is NOOP_SPAN
+    assert span("orphan") is NOOP_SPAN
+
+
+def test_agent_run_spans(scripted_provider, collector: InMemorySink):
+    """Test that every stage of the loop is recorded with the right nesting."""
+    run_agent(scripted_provider, Tracer([collector]))
+    by_name = {}
+    for s in collector.spans:
+        by_name.setdefault(s.name, []).append(s)
+
+    assert len(by_name["agent.run"]) == 1
+    assert len(by_name["tool_runner.execute"]) == 2
+    assert len(by_name["provider.request"]) == 2
+    assert len(by_name["provider.format_messages"]) == 2
+    assert len(by_name["tool.call"]) == 2
+
+    root = by_name["agent.run"][0]
+    assert root.parent_id is None
+    assert all(s.trace_id == root.trace_id for s in collector.spans)
+    assert all(s.parent_id == root.span_id for s in by_name["tool_runner.execute"])
+
+    request = by_name["provider.request"][0]
+    assert request.attributes["total_tokens"] == 12
+    assert request.attributes["model"] == "scripted"
+    assert by_name["tool.call"][0].attributes["tool"] == "CountingAgent_count"
+    assert by_name["tool.call"][0].attributes["result_size"] == len("counted 1")
+
+
+def test_error_status(collector: InMemorySink):
+    """Test that exceptions mark the span as failed and propagate."""
+    tracer = Tracer([collector])
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+    assert collector.spans[0].status == "error"
+    assert "boom" in collector.spans[0].error
+
+
+def test_jsonl_sink(tmp_path, scripted_provider):
+    """Test that the JSONL sink writes one line per span."""
+    path = tmp_path / "spans.jsonl"
+    sink = JsonlSink(str(path))
+    tracer = Tracer([sink])
+    run_agent(scripted_provider, tracer)
+    tracer.remove_sink(sink)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[-1]["name"] == "agent.run"
+    assert all(line["duration"] >= 0 for line in lines)
+
+
+def test_summary(collector: InMemorySink):
+    """Test aggregating spans by name."""
+    tracer = Tracer([collector])
+    for _ in range(3):
+        with tracer.span("step"):
+            pass
+    summary = collector.summary()
+    assert summary["step"]["count"] == 3
+    assert summary["step"]["mean"] <= summary["step"]["max"]
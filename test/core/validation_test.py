@@ -0,0 +1,80 @@
+from dopus.core import Agent, ToolRunner, tool
+from dopus.core.validation import validate_arguments, compile_validator
+from enum import Enum
+
+
+class Unit(Enum):
+    CELSIUS = "celsius"
+    FAHRENHEIT = "fahrenheit"
+
+
+class ThermoAgent(Agent):
+    calls = 0
+
+    def prompt(self):
+        return "Convert temperatures."
+
+    @tool
+    def convert(self, value: float, unit: Unit, digits: int):
+        """
+        Convert a temperature.
+
+        Args:
+            value (float): The temperature.
+            unit (Unit): The unit to convert to.
+            digits (int): Digits to round to.
+        """
+        ThermoAgent.calls += 1
+        self.stop(value)
+        return value
+
+
+def entry():
+    from dopus.core import tool_registry
+    return tool_registry["ThermoAgent_convert"]
+
+
+def test_valid_arguments():
+    """Test that arguments matching the schema produce no errors."""
+    assert validate_arguments(entry(), {"value": 20, "unit": "celsius", "digits": 1}) == []
+
+
+def test_invalid_arguments():
+    """Test that every schema violation is reported in one pass."""
+    errors = validate_arguments(entry(), {"value": "hot", "unit": "kelvin", "digits": True, "extra": 1})
+    assert errors == [
+        "args.value: expected number, got str",
+        "args.unit: 'kelvin' is not one of ['celsius', 'fahrenheit']",
+        "args.digits: expected integer, got boolean",
+        "args.extra: unexpected field",
+    ]
+    assert validate_arguments(entry(), {}) == [f"args.{name}: missing required field" for name in ("value", "unit", "digits")]
+    assert validate_arguments(entry(), None) == ["args: expected object, got NoneType"]
+
+
+def test_validator_is_cached():
+    """Test that a tool's schema is compiled once and kept on its registry entry."""
+    info = {key: value for key, value in entry().items() if key != "validator"}
+    validator = compile_validator(info)
+    assert info["validator"] is validator
+    assert compile_validator(info) is validator
+    assert compile_validator({key: value for key, value in info.items() if key != "validator"}) is not validator
+
+
+def test_invalid_call_is_not_run(scripted_provider):
+    """Test that ToolRunner returns validation errors to the model instead of running the tool."""
+    invalid = []
+    runner = ToolRunner()
+    runner.on_event(ToolRunner.Event.TOOL_INVALID_ARGS, lambda name, args, msg: invalid.append(name))
+    agent = ThermoAgent(scripted_provider([
+        {"name": "ThermoAgent_convert", "args": {"value": 20, "unit": "kelvin", "digits": 1}},
+        {"name": "ThermoAgent_convert", "args": {"value": 20, "unit": "celsius", "digits": 1}},
+    ]), tool_manager=runner)
+    ThermoAgent.calls = 0
+    ret, actions = agent.run("convert")
+
+    assert ThermoAgent.calls == 1
+    assert invalid == ["ThermoAgent_convert"]
+    first = actions[0]["tool_called"]["result"]
+    assert first["error"] == "invalid_arguments"
+    assert first["errors"] == ["args.unit: 'kelvin' is not one of ['celsius', 'fahrenheit']"]
@@ -0,0 +1,96 @@
+from dopus.core import Agent, tool
+from dopus.test import DopusTest, test, test_multi
+
+import json
+import pytest
+import re
+from xml.etree import ElementTree
+
+
+class GreeterAgent(Agent):
+
+    def prompt(self):
+        return "Greet the user."
+
+    @tool
+    def greet(self, name: str):
+        """
+        Greet someone.
+
+        Args:
+            name (str): Who to greet.
+        """
+        self.stop(f"Hello {name}")
+
+
+@pytest.fixture
+def judge(scripted_provider):
+    """Fixture for a judge that holds every assertion containing 'Hello' to be true."""
+    class Judge(scripted_provider):
+        def request(self, messages, registry, tools=None, system_prompt=""):
+            text = messages[-1]["content"]
+            verdicts = [
+                {"index": int(index), "result": "Hello" in line, "message": line.strip()}
+                for index, line in re.findall(r"^(\d+)\. (.*DATA: .*)$", text.replace("\n   DATA", " DATA"), re.M)
+            ]
+            self.script = [{"name": "judge", "args": {"verdicts": verdicts}}]
+            return super().request(messages, registry, tools, system_prompt)
+    return Judge([])
+
+
+@pytest.fixture
+def suite(tmp_path, scripted_provider):
+    """Fixture for an evaluation suite of a greeter agent."""
+    cases = tmp_path / "cases.json"
+    cases.write_text(json.dumps({"ada": "Ada", "bob": "Bob", "cy": "Cy"}))
+
+    class GreeterSuite(DopusTest):
+        @test
+        def exact_greeting(self):
+            ret, actions = GreeterAgent(scripted_provider([{"name": "GreeterAgent_greet", "args": {"name": "Eve"}}])).run("hi")
+            self.AssertEqual(ret[0], "Hello Eve")
+
+        @test
+        def failing(self):
+            self.AssertIn("Bye", "Hello")
+
+        @test_multi(str(cases))
+        def judged_greeting(self, name, data):
+            ret, actions = GreeterAgent(scripted_provider([{"name": "GreeterAgent_greet", "args": {"name": data}}])).run("hi")
+            self.LLMAssertTrue(f"the agent greets {data}", ret[0])
+
+    return GreeterSuite
+
+
+def test_concurrent_run_and_reports(tmp_path, suite, judge):
+    """Test that cases run, LLM assertions are batched, and JSON and JUnit reports are written."""
+    report = tmp_path / "report.xml"
+    run = suite(judge_provider=judge, workers=5, report_path=str(report), argv=[])
+
+    statuses = {r.name: r.status for r in run.results}
+    assert statuses == {"exact_greeting": "passed", "failing": "failed", "ada": "passed", "bob": "passed", "cy": "passed"}
+    assert len(judge.requests) < 3
+    assert run.report()["cases"][0]["usage"]["total_tokens"] > 0
+
+    root = ElementTree.parse(report).getroot()
+    assert (root.get("tests"), root.get("failures")) == ("5", "1")
+    assert root.find("testcase[@name='failing']/failure") is not None
+
+
+def test_judge_cache(tmp_path, suite, judge):
+    """Test that unchanged assertions are answered from the cache on the next run."""
+    cache = str(tmp_path / "verdicts.json")
+    suite(judge_provider=judge, cache_path=cache, argv=[])
+    requests = len(judge.requests)
+    run = suite(judge_provider=judge, cache_path=cache, argv=["--report", str(tmp_path / "report.json")])
+
+    assert len(judge.requests) == requests
+    assert sum(r.cached for r in run.results) == 3
+    assert json.loads((tmp_path / "report.json").read_text())["passed"] == 4
+
+
+def test_select_case(suite, judge, capsys):
+    """Test that --test runs a single case and prints its outcome."""
+    run = suite(judge_provider=judge, argv=["--test", "bob"])
+    assert [r.name for r in run.results] == ["bob"]
+    assert capsys.readouterr().out.splitlines()[0] == "✅ Test Passed - bob"
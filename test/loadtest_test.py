@@ -0,0 +1,54 @@
+from dopus.loadtest import FakeProvider, InjectedError, latency_sampler, main, run_load_test
+
+import json
+import pytest
+import random
+
+
+def test_latency_specs():
+    """Test that latency specs produce samples in the expected range."""
+    rng = random.Random(0)
+    assert latency_sampler(0.25)(rng) == 0.25
+    assert latency_sampler("const:0.1")(rng) == 0.1
+    assert all(0.1 <= latency_sampler("uniform:0.1,0.2")(rng) <= 0.2 for _ in range(100))
+    assert latency_sampler("exp:0.1")(rng) >= 0
+    assert latency_sampler("lognormal:0.1,0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        latency_sampler("gamma:1")
+
+
+def test_error_injection():
+    """Test that FakeProvider fails with the configured status code."""
+    provider = FakeProvider(lambda messages: None, error_rate=1.0, error_status=429)
+    with pytest.raises(InjectedError) as error:
+        provider.request([], {}, [], "")
+    assert error.value.status_code == 429
+
+
+def test_report():
+    """Test that the report counts every step and run of the sessions."""
+    report = run_load_test(sessions=4, runs=2, steps=3, provider_options={"latency": "const:0.001", "prompt_tokens": 100, "tokens_per_message": 0})
+    assert report["runs"] == {"completed": 8, "failed": 0, "failures": {}}
+    assert report["steps"] == {"total": 24, "failed": 0}
+    assert report["step_latency"]["count"] == 24
+    assert report["step_latency"]["p50"] >= 0.001
+    assert report["throughput"]["steps_per_second"] > 0
+    assert report["cpu"]["per_step_ms"] > 0
+    assert report["tokens"]["prompt_tokens"] == 2400
+
+
+def test_failed_runs_are_counted():
+    """Test that runs failing on injected errors are reported without stopping the session."""
+    report = run_load_test(sessions=2, runs=3, steps=2, provider_options={"error_rate": 1.0})
+    assert report["runs"]["completed"] == 0
+    assert report["runs"]["failures"] == {"InjectedError": 6}
+    assert report["steps"]["failed"] == 6
+
+
+def test_cli(tmp_path):
+    """Test that the command line writes a JSON report."""
+    output = tmp_path / "report.json"
+    main(["--sessions", "2", "--runs", "1", "--latency", "const:0", "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert report["runs"]["completed"] == 2
+    assert report["peak_rss_mb"]["after"] > 0
@@ -0,0 +1,108 @@
+from dopus.core import Agent, Budget, tool, tool_registry
+from dopus.provider import CascadeProvider
+
+import pytest
+
+
+class SearchAgent(Agent):
+
+    def prompt(self):
+        return "Search."
+
+    @tool
+    def search(self, query: str, limit: int):
+        """
+        Search for records.
+
+        Args:
+            query (str): The search query.
+            limit (int): Maximum number of records.
+        """
+        return [query] * limit
+
+    @tool
+    def finish(self):
+        """Stop the run."""
+        self.stop("finished")
+
+
+def test_cascade_escalates_invalid_calls(scripted_provider):
+    """Test that only rejected fast results are escalated, with per-tool rates."""
+    fast = scripted_provider([
+        {"name": "SearchAgent_search", "args": {"query": "a", "limit": 1}},
+        {"name": "SearchAgent_search", "args": {"query": "a", "limit": 1}},
+        {"name": "SearchAgent_search", "args": {"query": "b", "limit": "many"}},
+        {"name": "SearchAgent_missing"},
+        {"name": "SearchAgent_finish"},
+    ], model="fast")
+    strong = scripted_provider([
+        {"name": "SearchAgent_search", "args": {"query": "c", "limit": 1}},
+        {"name": "SearchAgent_search", "args": {"query": "d", "limit": 2}},
+        {"name": "SearchAgent_search", "args": {"query": "e", "limit": 1}},
+    ], model="strong")
+    cascade = CascadeProvider(fast, strong)
+    agent = SearchAgent(cascade)
+    agent.run("go")
+
+    results = [action["tool_called"]["result"] for action in agent.get_actions()]
+    assert results == [["a"], ["c"], ["d", "d"], ["e"], ""]
+    assert len(strong.requests) == 3
+    stats = cascade.stats()
+    assert stats["SearchAgent_search"] == {"attempts": 3, "escalations": 2, "rate": 2 / 3}
+    assert stats["SearchAgent_missing"]["rate"] == 1.0
+    assert stats["SearchAgent_finish"]["escalations"] == 0
+
+
+def test_custom_validators(scripted_provider):
+    """Test that validators are pluggable."""
+    fast = scripted_provider([{"name": "SearchAgent_finish"}], model="fast")
+    strong = scripted_provider([{"name": "SearchAgent_finish"}], model="strong")
+    cascade = CascadeProvider(fast, strong, validators=[lambda data, registry, tools, messages: "always"])
+    response = cascade.request([], {}, [], "")
+    assert response.provider is strong
+
+
+def test_cascade_validates_every_call(scripted_provider):
+    """Test that an invalid call after a valid one in the same turn is escalated."""
+    fast = scripted_provider([[
+        {"name": "SearchAgent_search", "args": {"query": "a", "limit": 1}},
+        {"name": "SearchAgent_search", "args": {"query": "b", "limit": "many"}},
+    ]], model="fast")
+    strong = scripted_provider([{"name": "SearchAgent_finish"}], model="strong")
+    cascade = CascadeProvider(fast, strong)
+    response = cascade.request([], tool_registry, None, "")
+    assert response.provider is strong
+    assert cascade.stats()["SearchAgent_search"]["escalations"] == 1
+
+
+def test_escalated_step_is_priced_per_model(scripted_provider):
+    """Test that an escalated step counts the rejected fast attempt at the fast model's price."""
+    fast = scripted_provider([{"name": "SearchAgent_search", "args": {"query": "a", "limit": "many"}}], model="fast")
+    strong = scripted_provider([{"name": "SearchAgent_finish"}], model="strong")
+    prices = {"fast": {"prompt": 1.0, "completion": 1.0}, "strong": {"prompt": 10.0, "completion": 10.0}}
+    agent = SearchAgent(CascadeProvider(fast, strong), budget=Budget(prices=prices))
+    agent.run("go")
+    usage = agent.get_usage()
+    assert usage["total_tokens"] == 24
+    assert usage["cost"] == pytest.approx((12 + 120) / 1_000_000)
+
+
+def test_accepted_calls_are_parsed_once(scripted_provider):
+    """Test that the runner reuses the tool call data the cascade checked instead of parsing it again."""
+    class CountingProvider(scripted_provider):
+        parsed = 0
+
+        def extract_tool_call_data(self, tool_call):
+            CountingProvider.parsed += 1
+            return super().extract_tool_call_data(tool_call)
+
+    fast = CountingProvider([
+        [{"name": "SearchAgent_search", "args": {"query": "a", "limit": 1}}, {"name": "SearchAgent_search", "args": {"query": "b", "limit": 1}}],
+        {"name": "SearchAgent_finish"},
+    ], model="fast")
+    strong = scripted_provider([], model="strong")
+    agent = SearchAgent(CascadeProvider(fast, strong))
+    agent.run("go")
+
+    assert [action["tool_called"]["result"] for action in agent.get_actions()] == [["a"], ""]
+    assert CountingProvider.parsed == 3
@@ -0,0 +1,69 @@
+from dopus.core import Agent, tool
+from dopus.provider import CascadeProvider, Groq
+
+import pytest
+
+
+class TriageAgent(Agent):
+
+    def prompt(self):
+        return "Triage tickets."
+
+    @tool
+    def label(self, ticket: str, priority: int):
+        """
+        Label a ticket.
+
+        Args:
+            ticket (str): The ticket id.
+            priority (int): The priority from 1 to 3.
+        """
+        self.stop(f"{ticket}:{priority}")
+
+
+def stream(tool_call_id, name, arguments):
+    def chunk(delta, **extra):
+        return {"id": "req_1", "created": 0, "model": "llama", "choices": [{"index": 0, "delta": delta, "finish_reason": None}], **extra}
+    return [
+        chunk({"tool_calls": [{"index": 0, "id": tool_call_id, "function": {"name": name, "arguments": arguments[:5]}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": arguments[5:]}}]}),
+        chunk({}, x_groq={"usage": {"prompt_tokens": 20, "completion_tokens": 4, "total_tokens": 24}}),
+    ]
+
+
+def test_requires_api_key(monkeypatch):
+    """Test that a missing API key is reported at construction."""
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        Groq()
+
+
+def test_streamed_tool_call(monkeypatch, openai_stub):
+    """Test a streamed tool call, with usage read from Groq's extension field."""
+    monkeypatch.setenv("GROQ_API_KEY", "gsk_test")
+    openai_stub.replies = [stream("call_1", "TriageAgent_label", '{"ticket": "T-1", "priority": 2}')]
+    provider = Groq(base_url=openai_stub.base_url)
+    ret, actions = TriageAgent(provider).run("T-1 is down")
+
+    assert ret[0] == "T-1:2"
+    assert actions[0]["usage"]["total_tokens"] == 24
+    request = openai_stub.requests[0]
+    assert request["headers"]["Authorization"] == "Bearer gsk_test"
+    assert request["body"]["stream"] is True
+    assert request["body"]["model"] == "llama-3.1-8b-instant"
+
+
+def test_shared_connection(openai_stub, scripted_provider):
+    """Test that Groq providers share one keep-alive connection, also as the fast model of a cascade."""
+    openai_stub.replies = [
+        stream("call_1", "TriageAgent_label", '{"ticket": "T-1", "priority": 1}'),
+        stream("call_2", "TriageAgent_label", '{"ticket": "T-2", "priority": 3}'),
+    ]
+    strong = scripted_provider([])
+    for ticket in ("T-1", "T-2"):
+        provider = CascadeProvider(Groq(api_key="gsk_test", base_url=openai_stub.base_url), strong)
+        TriageAgent(provider).run(ticket)
+
+    assert len(openai_stub.requests) == 2
+    assert len(openai_stub.connections) == 1
+    assert strong.requests == []
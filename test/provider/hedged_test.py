@@ -0,0 +1,90 @@
+from dopus.provider import HedgedProvider
+
+import pytest
+import threading
+import time
+
+
+@pytest.fixture
+def slow_provider(scripted_provider):
+    """Fixture for a factory of scripted providers that sleep before answering."""
+    class SlowProvider(scripted_provider):
+        def __init__(self, delays, model):
+            super().__init__([{"name": "lookup"}] * len(delays), model=model)
+            self.delays = list(delays)
+            self.__lock = threading.Lock()
+
+        def request(self, messages, registry, tools=None, system_prompt=""):
+            with self.__lock:
+                delay = self.delays.pop(0)
+            time.sleep(max(delay, 0))
+            if delay < 0:
+                raise RuntimeError("backend error")
+            return super().request(messages, registry, tools, system_prompt)
+
+    return SlowProvider
+
+
+def request(provider):
+    return provider.request([], {}, [], "")
+
+
+def test_fast_primary_is_not_hedged(slow_provider):
+    """Test that requests faster than the hedge delay are sent once."""
+    primary = slow_provider([0, 0], "primary")
+    hedged = HedgedProvider(primary, initial_delay=0.2)
+    response = request(hedged)
+    assert hedged.get_tool_calls(response)[0].name == "lookup"
+    assert hedged.hedged == 0
+    assert len(primary.requests) == 1
+
+
+def test_slow_primary_is_hedged(slow_provider):
+    """Test that a slow primary triggers a hedge and the first response wins."""
+    primary = slow_provider([0.5], "primary")
+    backup = slow_provider([0], "backup")
+    hedged = HedgedProvider(primary, backup, initial_delay=0.05)
+    start = time.perf_counter()
+    response = request(hedged)
+    assert time.perf_counter() - start < 0.4
+    assert response.provider is backup
+    assert hedged.hedged == 1
+    assert hedged.hedge_wins == 1
+    tool_call = hedged.get_tool_calls(response)[0]
+    assert hedged.extract_tool_call_data(tool_call)["name"] == "lookup"
+    assert hedged.get_usage(response)["total_tokens"] == 12
+
+
+def test_late_losing_request_is_not_charged_to_others(slow_provider):
+    """Test that a hedge loser finishing after the winner is counted apart, not with the next request."""
+    primary = slow_provider([0.1, 0], "primary")
+    backup = slow_provider([0], "backup")
+    hedged = HedgedProvider(primary, backup, initial_delay=0.05)
+    first = request(hedged)
+    assert hedged.get_model(first) == "backup"
+    assert hedged.get_usage(first)["total_tokens"] == 12
+    time.sleep(0.2)
+    assert hedged.late_responses == 1 and hedged.late_usage["total_tokens"] == 12
+    second = request(hedged)
+    assert [model for model, _ in hedged.get_charges(second)] == ["primary"]
+    assert hedged.get_usage(second)["total_tokens"] == 12
+    hedged.close()
+
+
+def test_failed_response_falls_back(slow_provider):
+    """Test that an error from one request waits for the other."""
+    primary = slow_provider([0.1], "primary")
+    backup = slow_provider([-0.0001], "backup")
+    hedged = HedgedProvider(primary, backup, initial_delay=0.01)
+    assert request(hedged).provider is primary
+
+
+def test_delay_adapts_to_latency(slow_provider):
+    """Test that the hedge delay follows the latency percentile once enough samples exist."""
+    primary = slow_provider([0.02] * 5, "primary")
+    hedged = HedgedProvider(primary, initial_delay=1.0, min_delay=0.001, min_samples=5)
+    assert hedged.hedge_delay() == 1.0
+    for _ in range(5):
+        request(hedged)
+    time.sleep(0.05)
+    assert 0.02 <= hedged.hedge_delay() < 0.1
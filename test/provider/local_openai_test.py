@@ -0,0 +1,96 @@
+from dopus.core import Agent, tool
+from dopus.provider import LocalOpenAICompatible
+
+import json
+import pytest
+
+
+class NoteAgent(Agent):
+
+    def prompt(self):
+        return "Take notes."
+
+    @tool
+    def write_note(self, text: str):
+        """
+        Write a note.
+
+        Args:
+            text (str): The note.
+        """
+        return f"saved {text}"
+
+    @tool
+    def done(self):
+        """Finish taking notes."""
+        self.stop("done")
+
+
+def test_agent_run_reuses_connection(openai_stub, make_completion):
+    """Test that an agent run goes to base_url and reuses one keep-alive connection."""
+    openai_stub.replies = [
+        make_completion([("call_1", "NoteAgent_write_note", '{"text": "milk"}')]),
+        make_completion([("call_2", "NoteAgent_done", "{}")]),
+    ]
+    provider = LocalOpenAICompatible("qwen", base_url=openai_stub.base_url, api_key="secret")
+    ret, actions = NoteAgent(provider).run("remember milk")
+
+    assert ret[0] == "done"
+    assert actions[0]["tool_called"]["result"] == "saved milk"
+    assert actions[0]["usage"]["total_tokens"] == 12
+    assert actions[0]["available_tools"] == ["NoteAgent_done", "NoteAgent_write_note"]
+    assert actions[0]["tool_called"]["arguments"] == {"text": "milk"}
+    assert json.loads(json.dumps(actions.to_list())) == actions.to_list()
+    assert [r["path"] for r in openai_stub.requests] == ["/v1/chat/completions"] * 2
+    assert openai_stub.requests[0]["headers"]["Authorization"] == "Bearer secret"
+    assert len(openai_stub.connections) == 1
+    second = openai_stub.requests[1]["body"]["messages"]
+    assert second[-1] == {"role": "tool", "content": "saved milk", "tool_call_id": "call_1"}
+
+
+def test_constrained_decoding_flags(openai_stub, make_completion):
+    """Test that strict schemas, grammars and extra fields are sent with the request."""
+    openai_stub.replies = [make_completion([("call_1", "NoteAgent_done", "{}")])]
+    provider = LocalOpenAICompatible(
+        "qwen", base_url=openai_stub.base_url, strict=True, grammar="root ::= \"{}\"",
+        extra_body={"guided_decoding_backend": "xgrammar"},
+    )
+    NoteAgent(provider).run("go")
+
+    body = openai_stub.requests[0]["body"]
+    assert body["grammar"] == "root ::= \"{}\""
+    assert body["guided_decoding_backend"] == "xgrammar"
+    assert body["tool_choice"] == "required"
+    assert all(t["function"]["strict"] for t in body["tools"])
+
+
+def test_streaming(openai_stub):
+    """Test that streamed tool call fragments are assembled into one response."""
+    def chunk(delta, finish_reason=None, usage=None):
+        return {"id": "chatcmpl-2", "created": 0, "model": "stub", "usage": usage,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+    openai_stub.replies = [[
+        chunk({"role": "assistant", "tool_calls": [{"index": 0, "id": "call_1", "function": {"name": "NoteAgent_write_note", "arguments": ""}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": '{"text": '}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"eggs"}'}}]}),
+        chunk({}, finish_reason="tool_calls", usage={"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8}),
+    ]]
+    deltas = []
+    provider = LocalOpenAICompatible("qwen", base_url=openai_stub.base_url, stream=True, on_chunk=deltas.append)
+    response = provider.request([], {}, None, "")
+
+    assert openai_stub.requests[0]["body"]["stream"] is True
+    assert len(deltas) == 4
+    tool_calls = provider.get_tool_calls(response)
+    assert provider.extract_tool_call_data(tool_calls[0]) == {"id": "call_1", "name": "NoteAgent_write_note", "args": {"text": "eggs"}}
+    assert provider.get_usage(response)["total_tokens"] == 8
+
+
+def test_error_status(openai_stub):
+    """Test that error responses raise with their status code, so routers can react to rate limits."""
+    openai_stub.replies = [(429, {"error": "rate limited"})]
+    provider = LocalOpenAICompatible("qwen", base_url=openai_stub.base_url)
+    with pytest.raises(Exception) as error:
+        provider.request([], {}, None, "")
+    assert error.value.status_code == 429
@@ -0,0 +1,129 @@
+import json
+
+from dopus.core import Agent, tool, tool_registry
+from dopus.provider import OpenAIResponses
+
+import pytest
+
+
+class ChainAgent(Agent):
+
+    def prompt(self):
+        return "Count."
+
+    @tool
+    def count(self, n: int):
+        """
+        Count a number.
+
+        Args:
+            n (int): The number.
+        """
+        return f"counted {n}"
+
+    @tool
+    def done(self):
+        """Finish counting."""
+        self.stop("done")
+
+
+def response(id, call_id, name, arguments="{}"):
+    return {
+        "id": id,
+        "model": "stub",
+        "output": [{"type": "function_call", "call_id": call_id, "name": name, "arguments": arguments}],
+        "usage": {"input_tokens": 10, "output_tokens": 2, "total_tokens": 12, "input_tokens_details": {"cached_tokens": 4}},
+    }
+
+
+@pytest.fixture
+def provider(openai_stub):
+    return OpenAIResponses("gpt-4o-mini", base_url=openai_stub.base_url, api_key="secret")
+
+
+def test_sends_only_new_messages(openai_stub, provider):
+    """Test that chained requests send only the tool results appended since the previous response."""
+    openai_stub.replies = [
+        response("resp_1", "call_1", "ChainAgent_count", '{"n": 1}'),
+        response("resp_2", "call_2", "ChainAgent_count", '{"n": 2}'),
+        response("resp_3", "call_3", "ChainAgent_done"),
+    ]
+    ret, actions = ChainAgent(provider).run("count to two")
+
+    assert ret[0] == "done"
+    assert actions[0]["usage"] == {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12, "cached_tokens": 4}
+    bodies = [r["body"] for r in openai_stub.requests]
+    assert [r["path"] for r in openai_stub.requests] == ["/v1/responses"] * 3
+    assert "previous_response_id" not in bodies[0]
+    assert bodies[0]["input"] == [{"role": "user", "content": "count to two"}]
+    assert bodies[1]["previous_response_id"] == "resp_1"
+    assert bodies[1]["input"] == [{"type": "function_call_output", "call_id": "call_1", "output": "counted 1"}]
+    assert bodies[2]["previous_response_id"] == "resp_2"
+    assert len(bodies[2]["input"]) == 1
+    assert provider.session_stats == {"requests": 3, "full": 1, "incremental": 2, "items_sent": 3, "fallbacks": 0}
+
+
+def test_full_resend_when_history_changes(openai_stub, provider):
+    """Test that a history that no longer starts with what the server holds is sent in full."""
+    openai_stub.replies = [response("resp_1", "call_1", "ChainAgent_done"), response("resp_2", "call_2", "ChainAgent_done")]
+    ChainAgent(provider).run("first")
+    ChainAgent(provider).run("second")
+
+    second = openai_stub.requests[1]["body"]
+    assert "previous_response_id" not in second
+    assert second["input"] == [{"role": "user", "content": "second"}]
+    assert provider.session_stats["full"] == 2
+
+
+def test_conversations_chain_separately(openai_stub, provider):
+    """Test that interleaved conversations sharing the provider each chain to their own response."""
+    openai_stub.replies = [
+        response("resp_a1", "call_a", "ChainAgent_count", '{"n": 1}'),
+        response("resp_b1", "call_b", "ChainAgent_count", '{"n": 2}'),
+        response("resp_a2", "call_a2", "ChainAgent_done"),
+        response("resp_b2", "call_b2", "ChainAgent_done"),
+    ]
+
+    def history(text, call_id=None, n=None):
+        messages = [{"role": "user", "content": text}]
+        if call_id:
+            messages.append({"type": "tool_call", "content": {"id": call_id, "name": "ChainAgent_count", "args": {"n": n}}})
+            messages.append({"type": "tool_result", "content": {"id": call_id, "result": f"counted {n}"}})
+        return messages
+
+    tools = {"ChainAgent_count", "ChainAgent_done"}
+    for messages in (history("a"), history("b"), history("a", "call_a", 1), history("b", "call_b", 2)):
+        provider.request(messages, tool_registry, tools, "Count.")
+
+    bodies = [r["body"] for r in openai_stub.requests]
+    assert [body.get("previous_response_id") for body in bodies] == [None, None, "resp_a1", "resp_b1"]
+    assert bodies[3]["input"] == [{"type": "function_call_output", "call_id": "call_b", "output": "counted 2"}]
+    assert provider.session_stats["incremental"] == 2
+
+
+def test_fallback_when_state_is_gone(openai_stub, provider):
+    """Test that a rejected chained request is retried with the full history."""
+    openai_stub.replies = [
+        response("resp_1", "call_1", "ChainAgent_count", '{"n": 1}'),
+        (404, {"error": {"code": "previous_response_not_found"}}),
+        response("resp_2", "call_2", "ChainAgent_done"),
+    ]
+    ret, actions = ChainAgent(provider).run("count")
+
+    assert ret[0] == "done"
+    retry = openai_stub.requests[2]["body"]
+    assert "previous_response_id" not in retry
+    assert [item.get("type", item.get("role")) for item in retry["input"]] == ["user", "function_call", "function_call_output"]
+    assert json.loads(retry["input"][1]["arguments"]) == {"n": 1}
+    assert provider.session_stats["fallbacks"] == 1
+
+
+def test_stateless_mode(openai_stub):
+    """Test that stateless mode does not store responses and always sends the full history."""
+    provider = OpenAIResponses("gpt-4o-mini", base_url=openai_stub.base_url, stateful=False)
+    openai_stub.replies = [response("resp_1", "call_1", "ChainAgent_count", '{"n": 1}'), response("resp_2", "call_2", "ChainAgent_done")]
+    ChainAgent(provider).run("count")
+
+    bodies = [r["body"] for r in openai_stub.requests]
+    assert all(body["store"] is False and "previous_response_id" not in body for body in bodies)
+    assert len(bodies[1]["input"]) == 3
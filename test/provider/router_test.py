@@ -0,0 +1,100 @@
+from dopus.provider import RouterProvider, Backend
+
+import pytest
+import time
+
+
+class BackendError(Exception):
+    def __init__(self, status_code=500):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def flaky_provider(scripted_provider):
+    """Fixture for a factory of scripted providers with a fixed latency that can be made to fail."""
+    class FlakyProvider(scripted_provider):
+        def __init__(self, model, latency=0.0, error=None):
+            super().__init__([], model=model)
+            self.latency = latency
+            self.error = error
+            self.calls = 0
+
+        def request(self, messages, registry, tools=None, system_prompt=""):
+            self.calls += 1
+            time.sleep(self.latency)
+            if self.error is not None:
+                raise self.error
+            self.script.append({"name": "lookup"})
+            return super().request(messages, registry, tools, system_prompt)
+
+    return FlakyProvider
+
+
+def request(provider):
+    return provider.request([], {}, [], "")
+
+
+def test_prefers_faster_backend(flaky_provider):
+    """Test that traffic shifts to the backend with lower observed latency."""
+    slow = flaky_provider("slow", latency=0.02)
+    fast = flaky_provider("fast", latency=0.0)
+    router = RouterProvider([slow, fast])
+    for _ in range(10):
+        request(router)
+    assert fast.calls > slow.calls
+    assert slow.calls >= 1
+
+
+def test_failover_and_ejection(flaky_provider):
+    """Test that failures fail over to another backend and eject the failing one."""
+    broken = flaky_provider("broken", error=BackendError())
+    healthy = flaky_provider("healthy", latency=0.001)
+    router = RouterProvider([broken, healthy], eject_after=1, cooldown=60)
+    for _ in range(5):
+        response = request(router)
+        assert response.provider is healthy
+        assert router.extract_tool_call_data(router.get_tool_calls(response)[0])["name"] == "lookup"
+    assert broken.calls == 1
+    assert router.stats()[0]["ejected"]
+
+
+def test_rate_limit_ejects_immediately(flaky_provider):
+    """Test that a 429 ejects the backend on the first failure."""
+    limited = flaky_provider("limited", error=BackendError(429))
+    other = flaky_provider("other")
+    router = RouterProvider([limited, other], eject_after=5)
+    request(router)
+    request(router)
+    assert limited.calls == 1
+
+
+def test_readmitted_after_cooldown(flaky_provider):
+    """Test that an ejected backend is tried again once the cooldown passes."""
+    primary = flaky_provider("primary", error=BackendError())
+    secondary = flaky_provider("secondary", latency=0.01)
+    router = RouterProvider([primary, secondary], eject_after=1, cooldown=0.05)
+    request(router)
+    primary.error = None
+    time.sleep(0.06)
+    for _ in range(3):
+        request(router)
+    assert primary.calls >= 2
+
+
+def test_request_budget(flaky_provider):
+    """Test that a backend out of request budget is skipped."""
+    capped = flaky_provider("capped")
+    spare = flaky_provider("spare", latency=0.005)
+    router = RouterProvider([Backend(capped, requests_per_minute=2, weight=100), spare])
+    for _ in range(5):
+        request(router)
+    assert capped.calls == 2
+    assert spare.calls == 3
+
+
+def test_all_backends_failing(flaky_provider):
+    """Test that the last error is raised when every backend fails."""
+    router = RouterProvider([flaky_provider("a", error=BackendError()), flaky_provider("b", error=BackendError())])
+    with pytest.raises(BackendError):
+        request(router)